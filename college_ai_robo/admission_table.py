@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+CATEGORICAL_FEATURES = ['Branch', 'Gender', 'Category']
+
+
+class AdmissionTable:
+    """
+    The fitted admission pipeline (OneHotEncoder on Branch/Gender/Category,
+    Rank passed through, LogisticRegression) compiled into plain tables.
+
+    For one-hot inputs the logistic regression's decision value is
+        intercept + w[Branch] + w[Gender] + w[Category] + w_rank * Rank
+    so every (Branch, Gender, Category) combination gets one precomputed
+    intercept and a prediction is a dict lookup plus one sigmoid.
+    Values the encoder never saw contribute 0, as with handle_unknown='ignore'.
+    """
+    def __init__(self, intercept, rank_coef, weights):
+        self.intercept = float(intercept)
+        self.rank_coef = float(rank_coef)
+        self.weights = weights # feature -> {value: coefficient}
+        self.table = {}
+        for b, wb in weights['Branch'].items():
+            for g, wg in weights['Gender'].items():
+                for c, wc in weights['Category'].items():
+                    self.table[(b, g, c)] = self._combine(wb, wg, wc)
+
+    def _combine(self, wb, wg, wc):
+        # Same summation order as the dense dot product in the pipeline.
+        return ((wb + wg) + wc) + self.intercept
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        column_trans = pipeline.steps[0][1]
+        logreg = pipeline.steps[-1][1]
+        coef = logreg.coef_[0]
+
+        ohe, ohe_columns = None, None
+        for name, transformer, columns in column_trans.transformers_:
+            if name != 'remainder':
+                ohe, ohe_columns = transformer, list(columns)
+        if ohe_columns != CATEGORICAL_FEATURES:
+            raise ValueError(f"Unexpected admission pipeline columns: {ohe_columns}")
+
+        weights = {}
+        pos = 0
+        for feature, categories in zip(ohe_columns, ohe.categories_):
+            weights[feature] = {str(v): float(coef[pos + i]) for i, v in enumerate(categories)}
+            pos += len(categories)
+        # The passthrough Rank column comes after the one-hot block.
+        rank_coef = coef[pos]
+        return cls(logreg.intercept_[0], rank_coef, weights)
+
+    def intercept_for(self, branch, gender, category):
+        key = (branch, gender, category)
+        if key in self.table:
+            return self.table[key]
+        return self._combine(self.weights['Branch'].get(branch, 0.0),
+                             self.weights['Gender'].get(gender, 0.0),
+                             self.weights['Category'].get(category, 0.0))
+
+    def predict_proba(self, rank, branch, gender, category):
+        """Probability of admission (class 1)."""
+        z = self.intercept_for(branch, gender, category) + self.rank_coef * rank
+        return 1.0 / (1.0 + math.exp(-z)) if z >= -700 else 0.0
+
+    def predict_many(self, rows):
+        """Vectorized predict_proba for dicts with Rank/Branch/Gender/Category."""
+        if not rows:
+            return np.zeros(0)
+        base = np.array([self.intercept_for(r['Branch'], r['Gender'], r['Category']) for r in rows])
+        ranks = np.array([r['Rank'] for r in rows], dtype=np.float64)
+        z = base + self.rank_coef * ranks
+        # Clipped so far-out ranks give 0.0 / 1.0 instead of overflowing
+        return 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+
+    def to_dict(self):
+        return {"intercept": self.intercept, "rank_coef": self.rank_coef, "weights": self.weights}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["intercept"], data["rank_coef"], data["weights"])
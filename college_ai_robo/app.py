@@ -1,120 +1,514 @@
-import pandas as pd
-import joblib
+import importlib.util
+import json
 import os
+import glob
 import re
 import platform
 import subprocess
+import sys
+import threading
 import time
 import speech_recognition as sr
 import pyttsx3
 import logging
-from vector_store import CollegeKnowledgeBase
-import train_intent
-import train_admission
-from data_loader import load_placement_data
+import numpy_runtime
+from cutoff_index import CUTOFF_INDEX_PATH, CutoffIndex
+from data_loader import get_placement_files
+from runtime_snapshot import get_snapshot
+from query_router import QueryRouter
+from response_cache import ResponseCache, normalize_query
+from subsystems import SubsystemRegistry
+
+# "sklearn": the pickled pipelines and the fitted knowledge base, retrained
+# and hot-reloaded as described below. "numpy": only the plain files
+# `python app.py export` writes (numpy_runtime.py); sklearn, scipy and
+# pandas are never imported, which is what the Pi should run.
+# "auto": sklearn when it is installed, else numpy.
+INFERENCE_RUNTIME = "auto"
+if INFERENCE_RUNTIME == "auto":
+    INFERENCE_RUNTIME = "sklearn" if importlib.util.find_spec("sklearn") else "numpy"
+if INFERENCE_RUNTIME == "sklearn":
+    import joblib
+    import train_intent
+    import train_admission
+    from admission_table import AdmissionTable
+    from artifacts import (ADOPT, CONVERT, LOAD, REBUILD, adopt_artifact, check_artifact, load_table,
+                           manifest_path, read_manifest)
+    from intent_table import compile_pipeline, table_from_dict
+    from vector_store import CollegeKnowledgeBase
 
-#new code with 617 lines
 # ==========================
 # SETUP & MODEL LOADING
 # ==========================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INTENT_MODEL_PATH = os.path.join(BASE_DIR, "intent_model.pkl")
+# "tfidf": intent_model.pkl, retrained from scratch by train_intent.py.
+# "online": the hashed model that `python train_intent.py fold` updates
+# in place with labeled query-log lines (train_intent.ONLINE_MODEL_PATH).
+INTENT_BACKEND = "tfidf"
 ADMISSION_MODEL_PATH = os.path.join(BASE_DIR, "admission_model.pkl")
 
 print("--- AI ROBO STARTUP ---")
 
+# Every subsystem is initialized lazily and warmed in its own background
+# thread, so importing this module (voice_bot.py does) returns immediately.
+# respond() only blocks on the subsystem a query actually needs.
+
+# A model that is missing (or in a legacy format) is trained by a
+# background process: the script writes a temp file and renames it into
+# place, and the next model refresh (see _get_model) loads it. Until then
+# the loader returns None and respond() answers from keyword routing alone;
+# rank questions report PREDICTION_WARMING_UP.
+PREDICTION_WARMING_UP = ("Admission prediction is warming up (the model is still being trained). "
+                         "Please ask again in a minute.")
+_training = {} # model path -> Popen of the process training it
+_training_lock = threading.Lock() # loaders warm in parallel threads
+
+def _train_in_background(path, args):
+    with _training_lock:
+        proc = _training.get(path)
+        if proc is not None and proc.poll() is None:
+            return
+        print(f"Training {os.path.basename(path)} in a background process...")
+        try:
+            _training[path] = subprocess.Popen([sys.executable] + args, cwd=BASE_DIR)
+        except OSError as e:
+            print(f"Could not start training: {e}")
+
+def _reap_training():
+    """
+    Forgets background trainings whose process has exited, successful or
+    not. After a success the next model lookup re-checks the files at
+    once (see _get_model) instead of waiting out MODEL_REFRESH_SECONDS.
+    """
+    succeeded = False
+    for path, proc in list(_training.items()):
+        code = proc.poll()
+        if code is None or _training.pop(path, None) is None:
+            continue # still running, or another thread got here first
+        if code == 0:
+            succeeded = True
+        else:
+            print(f"Background training of {os.path.basename(path)} failed (exit code {code}).")
+    if succeeded:
+        _last_model_refresh.clear()
+
+def is_training(path=None):
+    """True while a background training process is running (for path, or any)."""
+    _reap_training()
+    if path is None:
+        return bool(_training)
+    return path in _training
+
+# Before anything is unpickled the artifact's manifest (artifacts.py) picks
+# the fastest valid path: load the pickle (built by these library versions),
+# convert (other versions: use the compiled table saved with it, no
+# unpickling), or rebuild in the background. A model whose training data
+# changed is served while its replacement trains. Pickles saved before
+# manifests are loaded as before and adopted: the manifest and table
+# written for them make the next start take the convert path.
+_model_actions = {} # model subsystem -> action check_artifact() chose
+_model_data_hashes = {} # model subsystem -> hash of its training data at that check
+
+def _check_model(name, path, kind, data_hash, train_args):
+    _model_versions[name] = _model_version(path)
+    action, stale, reason = check_artifact(path, data_hash, kind)
+    _model_actions[name] = action
+    _model_data_hashes[name] = data_hash
+    if action not in (LOAD, ADOPT) or stale:
+        print(f"{os.path.basename(path)}: {action}{' and rebuild' if stale else ''} ({reason})")
+    if action == REBUILD or stale:
+        _train_in_background(path, train_args)
+    return action
+
 # 1. Intent Model
-if not os.path.exists(INTENT_MODEL_PATH):
-    print("Intent model not found. Training now...")
+def _intent_model_path():
+    return train_intent.ONLINE_MODEL_PATH if INTENT_BACKEND == "online" else INTENT_MODEL_PATH
+
+def _load_intent_model():
+    path = _intent_model_path()
+    online = INTENT_BACKEND == "online"
+    action = _check_model("intent_model", path, "intent-online" if online else "intent",
+                          _hash_or_none(train_intent.examples_hash),
+                          ["train_intent.py"] + (["online"] if online else []))
+    if action not in (LOAD, ADOPT):
+        return None
+
     try:
-        train_intent.train_intent_model()
+        print("Loading Intent Model...")
+        if online:
+            return train_intent.load_online_model(path)[0]
+        return joblib.load(path)
     except Exception as e:
-        print(f"Error training intent model: {e}")
+        print(f"Failed to load intent model: {e}")
+        return None
 
-try:
-    print("Loading Intent Model...")
-    intent_model = joblib.load(INTENT_MODEL_PATH)
-except Exception as e:
-    print(f"Failed to load intent model: {e}")
-    intent_model = None
+# Compiled once from the pipeline: a prediction is a regex tokenize, a few
+# dict lookups and one small dot product instead of sklearn validation and
+# a sparse matrix per message.
+def _load_intent_table():
+    model = SUBSYSTEMS.get("intent_model")
+    action = _model_actions.get("intent_model")
+    if action == CONVERT:
+        return table_from_dict(load_table(_intent_model_path()))
+    if model is None:
+        return None
+    table = compile_pipeline(model)
+    if action == ADOPT:
+        kind = "intent-online" if INTENT_BACKEND == "online" else "intent"
+        _adopt("intent_model", _intent_model_path(), kind, train_intent.model_schema(model), table)
+    return table
+
+def _adopt(name, path, kind, schema, table):
+    try:
+        adopt_artifact(path, kind, schema, table.to_dict(), _model_data_hashes.get(name))
+        # Our own write: not a new model for the refresh to pick up
+        _model_versions[name] = _model_version(path)
+    except OSError as e:
+        print(f"Could not write a manifest for {os.path.basename(path)}: {e}")
+
+def _hash_or_none(data_hash):
+    # The training data may be missing on a deployed box; then it cannot go stale.
+    try:
+        return data_hash()
+    except OSError:
+        return None
+
+# Model files are re-checked at most this often; a retrained, folded or
+# background-trained model is swapped in without a restart.
+MODEL_REFRESH_SECONDS = 5.0
+_model_versions = {} # model subsystem -> _model_version() of the file it loaded
+_last_model_refresh = {}
+
+def _stat_file(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _model_version(path):
+    # The manifest is written after the pickle and its table, so it changes
+    # only once the new artifact is complete. Legacy pickles have none.
+    return _stat_file(manifest_path(path)) or _stat_file(path)
+
+def _get_model(name, path, compiled):
+    """
+    The compiled table of model subsystem name (loaded from path). When the
+    file changed since it was loaded, both are reloaded in place first.
+    """
+    table = SUBSYSTEMS.get(compiled)
+    _reap_training()
+    now = time.monotonic()
+    if now - _last_model_refresh.get(name, 0.0) < MODEL_REFRESH_SECONDS:
+        return table
+    _last_model_refresh[name] = now
+
+    version = _model_version(path)
+    if version is not None and version != _model_versions.get(name):
+        print(f"{os.path.basename(path)} changed on disk, reloading...")
+        # Reloading re-runs the manifest check
+        if SUBSYSTEMS.reload(name) | SUBSYSTEMS.reload(compiled):
+            table = SUBSYSTEMS.get(compiled)
+        if name == "admission_model":
+            # The training run that wrote the model rewrote the cutoffs first
+            SUBSYSTEMS.reload("cutoff_index")
+    return table
+
+def _get_intent_table():
+    if INFERENCE_RUNTIME == "numpy":
+        return SUBSYSTEMS.get("intent_table")
+    return _get_model("intent_model", _intent_model_path(), "intent_table")
+
+def _get_admission_table():
+    if INFERENCE_RUNTIME == "numpy":
+        return SUBSYSTEMS.get("admission_table")
+    return _get_model("admission_model", ADMISSION_MODEL_PATH, "admission_table")
 
 # 2. Admission Model
-if not os.path.exists(ADMISSION_MODEL_PATH):
-    print("Admission model not found. Training now...")
+def _admission_data_hash():
+    return train_admission.data_hash(train_admission.get_admission_files())
+
+def _load_admission_model():
+    action = _check_model("admission_model", ADMISSION_MODEL_PATH, "admission",
+                          _hash_or_none(_admission_data_hash), ["train_admission.py"])
+    if action not in (LOAD, ADOPT):
+        return None
+
     try:
-        train_admission.train_and_save()
+        print("Loading Admission Model...")
+        # Loads the full pipeline (ColumnTransformer + LogReg)
+        model = joblib.load(ADMISSION_MODEL_PATH)
+
+        # Check if we loaded a legacy/wrong format (dict instead of pipeline)
+        if isinstance(model, dict):
+            print("Detected legacy admission model format. Re-training for compatibility...")
+            _train_in_background(ADMISSION_MODEL_PATH, ["train_admission.py"])
+            return None
+        return model
     except Exception as e:
-        print(f"Error training admission model: {e}")
+        print(f"Failed to load admission model: {e}")
+        return None
 
-try:
-    print("Loading Admission Model...")
-    # Loads the full pipeline (ColumnTransformer + LogReg)
-    admission_model = joblib.load(ADMISSION_MODEL_PATH)
-    
-    # Check if we loaded a legacy/wrong format (dict instead of pipeline)
-    if isinstance(admission_model, dict):
-        print("Detected legacy admission model format. Re-training for compatibility...")
-        try:
-            train_admission.train_and_save()
-            admission_model = joblib.load(ADMISSION_MODEL_PATH)
-            print("Admission model re-trained and re-loaded successfully.")
-        except Exception as te:
-            print(f"Failed to auto-fix admission model: {te}")
-            admission_model = None
-except Exception as e:
-    print(f"Failed to load admission model: {e}")
-    admission_model = None
-
-# 3. Knowledge Base (FAQ)
-print("Initializing Knowledge Base...")
-kb = CollegeKnowledgeBase()
-
-# 4. Placement Data (Load Data Only)
-PLACEMENT_DF = load_placement_data(BASE_DIR)
-
-# 5. People Data (Rule-based Lookup)
-people_file = os.path.join(BASE_DIR, "people_data.txt")
-PEOPLE_DICT = {} 
-if os.path.exists(people_file):
-    with open(people_file, "r", encoding="utf-8") as f:
-        for line in f:
-             if ":" in line:
-                 parts = line.split(":", 1)
-                 role = parts[0].strip().lower()
-                 name = parts[1].strip()
-                 # Store both ways for lookup
-                 PEOPLE_DICT[role] = name
-                 PEOPLE_DICT[name.lower()] = role
+# Compiled once from the pipeline: predictions become a dict lookup plus
+# one sigmoid instead of a DataFrame through ColumnTransformer + LogReg.
+def _load_admission_table():
+    model = SUBSYSTEMS.get("admission_model")
+    action = _model_actions.get("admission_model")
+    if action == CONVERT:
+        return AdmissionTable.from_dict(load_table(ADMISSION_MODEL_PATH))
+    if model is None:
+        return None
+    table = AdmissionTable.from_pipeline(model)
+    if action == ADOPT:
+        _adopt("admission_model", ADMISSION_MODEL_PATH, "admission", train_admission.model_schema(table), table)
+    return table
+
+# Empirical cutoffs from the approval list (built alongside the model, and
+# reloaded with it). The approval list is never parsed here: a missing
+# index, or one built from other approval lists, is rebuilt by the
+# background admission training and rank questions report
+# PREDICTION_WARMING_UP until then.
+def _load_cutoff_index():
+    index = CutoffIndex.load(CUTOFF_INDEX_PATH) if os.path.exists(CUTOFF_INDEX_PATH) else None
+    current = _hash_or_none(_admission_data_hash)
+    if index is not None and (current is None or index.data_hash == current):
+        return index
+    print(f"Cutoff index {'is stale (the approval list changed)' if index else 'not found'}.")
+    if current is not None:
+        _train_in_background(ADMISSION_MODEL_PATH, ["train_admission.py"])
+    return None
+
+# 3. Knowledge Base: college_data.txt plus any handbook dropped into
+# handbooks/ (fitted vectors cached on disk per handbook version).
+# Edits to college_data.txt are picked up by a watcher thread; answers
+# cached from the old index are dropped once the new one is swapped in.
+KB_SOURCES = ["college_data.txt", "handbooks"]
+# Misheard / misspelled words ("aim", "secuirty") are matched to their
+# closest handbook term by character n-grams and that match adds this share
+# to the score. Higher weights also pull "fee structure" onto "Structural
+# Engineering" (see bench_kb_fuzzy.py).
+KB_FUZZY_WEIGHT = 0.3
+# Scoring backend (vector_store.SCORING_BACKENDS). KB actions leave the
+# threshold to the backend's default; eval_kb_backends.py compares them.
+# KB_FUZZY_WEIGHT was tuned on "tfidf".
+KB_SCORING = "tfidf"
+
+def _load_kb():
+    print("Initializing Knowledge Base...")
+    kb = CollegeKnowledgeBase(KB_SOURCES, fuzzy_weight=KB_FUZZY_WEIGHT, scoring=KB_SCORING)
+    # respond()'s fixed searches are answered from a table rebuilt with
+    # every reload; pin() warns about any that no longer find a chunk.
+    kb.pin(KB_PINNED_QUERIES)
+    kb.start_watching(on_reload=lambda _kb: RESPONSE_CACHE.clear())
+    return kb
+
+# 4-5. Placement Data and People Data come from the prebuilt runtime
+# snapshot (rebuilt automatically when a source changed).
+def _load_snapshot():
+    return get_snapshot(BASE_DIR)
+
+def _load_placements():
+    return SUBSYSTEMS.get("snapshot")["placements"]
+
+def _load_people():
+    return SUBSYSTEMS.get("snapshot")["people"]
+
+# Placement CSVs are re-checked at most this often; only changed files
+# are re-summarized. One request does the check, the others answer from
+# the current table meanwhile.
+PLACEMENT_REFRESH_SECONDS = 5.0
+_last_placement_refresh = time.monotonic()
+_placement_refresh_lock = threading.Lock()
+
+# 6. Numpy runtime (INFERENCE_RUNTIME = "numpy"): the intent and admission
+# tables, cutoff index and knowledge base all come from one export, which
+# is fixed until the next start.
+def _load_runtime():
+    runtime = numpy_runtime.load_runtime()
+    if runtime is None:
+        print(f"No runtime export in {numpy_runtime.RUNTIME_DIR}. "
+              "Run `python app.py export` where scikit-learn is installed.")
+    return runtime
+
+def _runtime_part(part):
+    def load():
+        runtime = SUBSYSTEMS.get("runtime")
+        return getattr(runtime, part) if runtime is not None else None
+    return load
+
+SUBSYSTEMS = SubsystemRegistry()
+if INFERENCE_RUNTIME == "numpy":
+    SUBSYSTEMS.register("runtime", _load_runtime)
+    for part in ("intent_table", "admission_table", "cutoff_index", "kb"):
+        SUBSYSTEMS.register(part, _runtime_part(part))
+else:
+    SUBSYSTEMS.register("intent_model", _load_intent_model)
+    SUBSYSTEMS.register("intent_table", _load_intent_table)
+    SUBSYSTEMS.register("admission_model", _load_admission_model)
+    SUBSYSTEMS.register("admission_table", _load_admission_table)
+    SUBSYSTEMS.register("cutoff_index", _load_cutoff_index)
+    SUBSYSTEMS.register("kb", _load_kb)
+SUBSYSTEMS.register("snapshot", _load_snapshot)
+SUBSYSTEMS.register("placements", _load_placements)
+SUBSYSTEMS.register("people", _load_people)
+
+def startup_report():
+    """Returns when each subsystem became ready, relative to import time."""
+    return SUBSYSTEMS.timing_report()
+
+# ==========================
+# QUERY ROUTING TABLES
+# ==========================
+INTAKE_DATA = {
+    "CSE": 180,
+    "AIML": 180,
+    "ECE": 300,
+    "EEE": 120,
+    "MECH": 120,
+    "CIVIL": 60,
+    "IT": 60,
+    "DS": 60,
+    "AI": 60,
+    "CYBER": 60
+}
+# Added "cyber" to the list
+INTAKE_CODES = ["cse", "aiml", "ece", "eee", "mech", "civil", "it", "ds", "ai", "cyber"]
+
+PLACEMENT_BRANCH_MAP = {
+    "aiml": "AIML", "ai": "AIML", "artificial intelligence": "AIML",
+    "cse": "CSE", "computer": "CSE",
+    "ece": "ECE", "electronics": "ECE",
+    "eee": "EEE", "electrical": "EEE",
+    "mech": "MECH", "mechanical": "MECH",
+    "civil": "CIVIL",
+    "it": "IT", "information technology": "IT",
+    "ds": "DS", "data science": "DS",
+    "cyber": "CSC" # Assuming Cyber placement code is CSC or CYBER, checking DF later if needed. For now mapping to key.
+}
+
+ADMISSION_BRANCH_MAP = {
+    "cse": "CSE", "computer": "CSE",
+    "aiml": "CAI", "ai": "CAI",
+    "ece": "ECE", "electronics": "ECE",
+    "eee": "EEE", "electrical": "EEE",
+    "mech": "MEC", "mechanical": "MEC",
+    "civil": "CIV",
+    "it": "INF", "inf": "INF",
+    "ds": "CSD", "data science": "CSD",
+    "csm": "CSM"
+}
+
+# Branch Info Override (Fix for "tell me about ds in pragati..." noise)
+# Maps branch keywords to the KB heading that describes that branch
+KB_BRANCH_LOOKUP = {
+    "aiml": "B.Tech AIML",
+    "aim": "B.Tech AIML",
+    "ami": "B.Tech AIML",  # Speech recognition often misses the 'l'
+    "human": "B.Tech AIML",
+    "cse(aiml)": "B.Tech AIML", # Context aware if needed
+    "cse(ai&ml)":"B.Tech AIML",
+    "artificial intelligence": "B.Tech CSE (Artificial Intelligence)",
+    "ai": "B.Tech CSE (Artificial Intelligence)",
+    "cyber": "B.Tech CSE (Cyber Security)",
+    "security": "B.Tech CSE (Cyber Security)",
+    "data science": "B.Tech CSE (Data Science)",
+    "ds": "B.Tech CSE (Data Science)",
+    "cse": "B.Tech CSE (Computer Science & Engineering – Core)",
+    "computer science": "B.Tech CSE (Computer Science & Engineering – Core)",
+    "it": "B.Tech IT (Information Technology)",
+    "information technology": "B.Tech IT (Information Technology)",
+    "ece": "B.Tech ECE",
+    "electronics": "B.Tech ECE",
+    "eee": "B.Tech EEE",
+    "electrical": "B.Tech EEE",
+    "mech": "B.Tech ME",
+    "mechanical": "B.Tech ME",
+    "civil": "B.Tech CE"
+}
+
+# Every keyword respond() and the handlers look for, compiled once into a
+# single-pass scanner. Handlers receive the scan result instead of running
+# their own substring / regex checks.
+ROUTER = QueryRouter()
+ROUTER.add("intake", ["intake", "seats", "capacity"])
+ROUTER.add("identity", ["who are you", "about yourself"])
+ROUTER.add("greeting", ["hi ", "hi", "hello", "hey", "hai"])
+ROUTER.add("bye", ["bye", "goodbye", "exit", "quit"])
+ROUTER.add("history_aiml", ["history of aiml"])
+ROUTER.add("faculty", ["hod", "principal", "dean", "chairman", "director", "coordinator", "incharge"])
+ROUTER.add("placement", ["placement"])
+ROUTER.add("admission", ["admission"])
+ROUTER.add("process", ["process", "procedure"])
+ROUTER.add("admission_direct", ["how to join", "eligibility"])
+ROUTER.add("mtech", ["mtech", "m.tech"])
+ROUTER.add("btech", ["btech", "b.tech"])
+ROUTER.add("about", ["about", "explain", "tell me"])
+# Sort keys by length so "data science" matches before "ds" or "cse"
+ROUTER.add("kb_branch", sorted(KB_BRANCH_LOOKUP.keys(), key=len, reverse=True))
+# Typo tolerance for branches query
+ROUTER.add_pattern("branches", r"bra[a]*nch|cours|program")
+ROUTER.add("admission_info", ["process", "how to", "eligibility", "join", "fee", "application"])
+ROUTER.add("intake_branch", INTAKE_CODES)
+ROUTER.add("placement_branch", PLACEMENT_BRANCH_MAP.keys())
+ROUTER.add("stat_highest", ["highest", "max"])
+ROUTER.add("stat_average", ["average"])
+ROUTER.add("stat_companies", ["companies", "recruiters", "company"])
+ROUTER.add("stat_count", ["count", "how many"])
+ROUTER.add("creator", ["creator", "who created", "made you"])
+ROUTER.add("gender_m", ["male", "boy"])
+ROUTER.add("gender_f", ["female", "girl"])
+ROUTER.add("ews", ["ews"])
+ROUTER.add("admission_branch", ADMISSION_BRANCH_MAP.keys())
+# Rank questions, for the intent cascade's disambiguation step
+ROUTER.add("rank", ["rank", "cutoff", "eligible"])
+ROUTER.add_pattern("rank", r"\d{4,}")
+ROUTER.compile()
+
+# Every file an answer can depend on; a change to any of them drops the
+# whole response cache.
+def _cache_watch_files():
+    files = [
+        os.path.join(BASE_DIR, "college_data.txt"),
+        os.path.join(BASE_DIR, "people_data.txt"),
+    ]
+    if INFERENCE_RUNTIME == "numpy":
+        files.append(numpy_runtime.manifest_path())
+    else:
+        files.extend([INTENT_MODEL_PATH, train_intent.ONLINE_MODEL_PATH, ADMISSION_MODEL_PATH, CUTOFF_INDEX_PATH])
+    files.extend(glob.glob(os.path.join(BASE_DIR, "*.csv")))
+    # Handbooks dropped into handbooks/ (see KB_SOURCES); new and removed
+    # files change the list itself.
+    files.extend(glob.glob(os.path.join(BASE_DIR, "handbooks", "*")))
+    return files
+
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE = ResponseCache(max_entries=RESPONSE_CACHE_SIZE, watch_files=_cache_watch_files)
+
+# Constant KB queries issued by _plan_keywords (see _load_kb).
+KB_PINNED_QUERIES = (["Admissions Process B.Tech M.Tech Eligibility", "available branches"]
+                     + sorted(set(KB_BRANCH_LOOKUP.values())))
+
+# Loaders read the tables above, so warming starts once they exist.
+SUBSYSTEMS.warm_all()
+
+def route_query(message):
+    """Scans the message once; the result is shared by every handler."""
+    return ROUTER.route(message)
 
 # ==========================
 # DATA LOADING & HELPER
 # ==========================
-def get_intake_info(message):
-    intake_data = {
-        "CSE": 180,
-        "AIML": 180,
-        "ECE": 300,
-        "EEE": 120,
-        "MECH": 120,
-        "CIVIL": 60,
-        "IT": 60,
-        "DS": 60,
-        "AI": 60,
-        "CYBER": 60
-    }
-    
-    msg = message.lower()
-    
+def get_intake_info(message, routed=None):
+    intake_data = INTAKE_DATA
+    routed = routed or route_query(message)
+
     # 1. Check for specific branch using Regex Word Boundaries
     # Prevents "details" matching "ai", "place" matching "ce" etc.
-    target_branch = None
-    # Added "cyber" to the list
-    for code in ["cse", "aiml", "ece", "eee", "mech", "civil", "it", "ds", "ai", "cyber"]:
-        # \b ensures we match " ai " or "ai" at end, but not "avail" or "details"
-        if re.search(r"\b" + re.escape(code) + r"\b", msg):
-            target_branch = code.upper()
-            break
-            
+    # (word=True: " ai " or "ai" at end match, but not "avail" or "details")
+    code = routed.first("intake_branch", word=True)
+    target_branch = code.upper() if code else None
+
     if target_branch:
         count = intake_data.get(target_branch, "Data Unavailable")
         return f"The intake (seats) for **{target_branch}** is **{count}**."
@@ -125,93 +519,69 @@ def get_intake_info(message):
         lines.append(f"- {branch}: {count}")
     return "\n".join(lines)
 
-def get_placement_info(message):
-    if PLACEMENT_DF is None or PLACEMENT_DF.empty:
+def _get_placement_aggregates():
+    """Placement aggregates, re-summarizing any CSV that changed on disk."""
+    global _last_placement_refresh
+    placements = SUBSYSTEMS.get("placements")
+    if placements is None or not _placement_refresh_lock.acquire(blocking=False):
+        return placements
+    try:
+        now = time.monotonic()
+        if now - _last_placement_refresh >= PLACEMENT_REFRESH_SECONDS:
+            _last_placement_refresh = now
+            placements.refresh(get_placement_files(BASE_DIR))
+    finally:
+        _placement_refresh_lock.release()
+    return placements
+
+def get_placement_info(message, routed=None):
+    placements = _get_placement_aggregates()
+    overall = placements.overall() if placements else None
+    if not overall or not overall["count"]:
         return "Placement data unavailable."
     
-    msg = message.lower()
+    routed = routed or route_query(message)
     
     # 1. Detect Branch
-    target_branch = None
-    branch_map = {
-        "aiml": "AIML", "ai": "AIML", "artificial intelligence": "AIML",
-        "cse": "CSE", "computer": "CSE",
-        "ece": "ECE", "electronics": "ECE",
-        "eee": "EEE", "electrical": "EEE",
-        "mech": "MECH", "mechanical": "MECH",
-        "civil": "CIVIL", 
-        "it": "IT", "information technology": "IT",
-        "ds": "DS", "data science": "DS",
-        "cyber": "CSC" # Assuming Cyber placement code is CSC or CYBER, checking DF later if needed. For now mapping to key.
-    }
-    
-    for k, v in branch_map.items():
-        if re.search(r"\b" + re.escape(k) + r"\b", msg):
-            target_branch = v
-            break
+    key = routed.first("placement_branch", word=True)
+    target_branch = PLACEMENT_BRANCH_MAP[key] if key else None
             
-    # Filter Data
-    df = PLACEMENT_DF
+    # Look up precomputed stats (falls back to college-wide numbers)
+    stats = None
     if target_branch:
-        if 'Branch' in df.columns:
-            # Check if target_branch exists in DF, if not try aliases if needed?
-            # For Cyber, it might be listed as 'CYBER' or 'CSC'.
-            # Let's try flexible filtering if strict match fails?
-            df_filtered = df[df['Branch'] == target_branch]
-            if df_filtered.empty and target_branch == "CSC":
-                 # Try fallback
-                 df_filtered = df[df['Branch'] == "CYBER"]
-            if not df_filtered.empty:
-                df = df_filtered
-            
-    if df.empty:
-        return f"No placement records found for {target_branch if target_branch else 'this query'}."
+        stats = placements.get(target_branch)
+        if stats is None and target_branch == "CSC":
+             # For Cyber, it might be listed as 'CYBER' or 'CSC'.
+             stats = placements.get("CYBER")
+    if stats is None:
+        stats = overall
 
     # 2. Stats
-    count = len(df)
-    high_pkg = 0.0
-    avg_pkg = 0.0
-    
-    if 'Package_Val' in df.columns:
-        valid_pkgs = df[df['Package_Val'] > 0]['Package_Val']
-        if not valid_pkgs.empty:
-            high_pkg = valid_pkgs.max() / 100000
-            avg_pkg = valid_pkgs.mean() / 100000
+    count = stats["count"]
+    high_pkg = stats["highest"] / 100000
+    avg_pkg = stats["average"] / 100000
             
     # 3. Top Companies
-    top_companies = []
-    if 'Company' in df.columns:
-        companies_raw = df['Company'].astype(str).tolist()
-        all_companies = []
-        for c in companies_raw:
-             # Handle comma separated
-             for sub_c in c.replace(',', ';').split(';'):
-                 clean_c = sub_c.strip().title()
-                 if clean_c and clean_c.lower() != 'nan' and len(clean_c) > 2:
-                     all_companies.append(clean_c)
-        
-        from collections import Counter
-        c_counts = Counter(all_companies)
-        # Top 30 unique (User asked for "all", providing a comprehensive list)
-        top_companies = [c for c, _ in c_counts.most_common(30)]
+    # Top 30 unique (User asked for "all", providing a comprehensive list)
+    top_companies = stats["companies"][:30]
         
     # Response
-    if "highest" in msg or "max" in msg:
+    if routed.has("stat_highest"):
         if high_pkg > 0:
             return f"The highest package for **{target_branch if target_branch else 'College'}** is **{high_pkg:.2f} LPA**."
         else:
             return f"Highest package info is not available for **{target_branch if target_branch else 'this query'}**."
     
-    if "average" in msg:
+    if routed.has("stat_average"):
         if avg_pkg > 0:
             return f"The average package for **{target_branch if target_branch else 'College'}** is **{avg_pkg:.2f} LPA**."
         else:
             return f"Average package info is not available for **{target_branch if target_branch else 'this query'}**."
         
-    if "companies" in msg or "recruiters" in msg or "company" in msg:
+    if routed.has("stat_companies"):
         return f"**Companies for {target_branch if target_branch else 'College'}**:\n{', '.join(top_companies)}"
         
-    if "count" in msg or "how many" in msg:
+    if routed.has("stat_count"):
         return f"Total students placed: **{count}**."
 
     # Default Summary
@@ -226,11 +596,12 @@ def get_placement_info(message):
     summary += f"- Top Recruiters: {', '.join(top_companies[:10])} and many more."
     return summary
 
-def get_people_info(message):
+def get_people_info(message, routed=None):
     msg = message.lower()
+    routed = routed or route_query(message)
     
     # Creator Info
-    if "creator" in msg or "who created" in msg or "made you" in msg:
+    if routed.has("creator"):
         return ("I am created by the students of AIML in 2026 on the occasion of Strides 2026 by "
                 "Tharak Ram, Alisha, Rohit, Ashis, Vijay, Mahesh in the guidance of "
                 "Dr. Radha Krishna Sir, V. Ananthalaksmi Mam, Janardhan Rao Sir.")
@@ -240,8 +611,9 @@ def get_people_info(message):
     
     found_role = None
     best_len = 0
+    people = SUBSYSTEMS.get("people")
     
-    for role, name in PEOPLE_DICT.items():
+    for role, name in people.items():
         if role in clean_msg:
              if len(role) > best_len:
                  best_len = len(role)
@@ -253,7 +625,7 @@ def get_people_info(message):
     # 2. Reverse Lookup (Name Match)
     ignore_TITLES = ["dr", "dr.", "mr", "mr.", "mrs", "mrs.", "sir", "mam", "prof", "prof."]
     
-    for role, name in PEOPLE_DICT.items():
+    for role, name in people.items():
         name_lower = name.lower()
         name_parts = name_lower.replace('.', ' ').split()
         for part in name_parts:
@@ -262,219 +634,440 @@ def get_people_info(message):
                 
     return "I couldn't find that person in my database."
 
-def predict_admission(message):
-    if not admission_model:
-        return "Admission prediction model is unavailable."
-
+def _parse_admission_query(message, routed):
+    """
+    Extracts (rank, branch, gender, category) from a rank question.
+    Returns (features, None), or (None, reply) when something is missing.
+    """
     msg = message.lower()
+
+    # Rank
+    match_rank = re.search(r'rank\s*[:=]?\s*(\d+)', msg)
+    rank = int(match_rank.group(1)) if match_rank else 0
+    if rank == 0:
+        nums = [int(s) for s in msg.split() if s.isdigit()]
+        for n in nums:
+            if n > 1000: rank = n; break
+    
+    if rank == 0:
+        return None, "Please provide your Rank to predict admission chances."
+
+    # Gender
+    gender = "M" if routed.has("gender_m") else ("F" if routed.has("gender_f") else None)
+    
+    # Category
+    category = "OC"
+    cats = ['oc_ews', 'bc_a', 'bc_b', 'bc_c', 'bc_d', 'bc_e', 'oc', 'sc', 'st']
+    for c in cats:
+        if c in msg.replace('-', '_'):
+            category = c.upper()
+            break
+    if routed.has("ews") and category == "OC": category = "OC_EWS"
+
+    # Branch
+    key = routed.first("admission_branch")
+    found_branch = ADMISSION_BRANCH_MAP[key] if key else None
+    
+    if not found_branch:
+         return None, f"Please specify the branch (e.g., CSE, ECE, AIML). I understood Rank: {rank}"
+         
+    if not gender:
+         return None, f"Please specify your gender (Male/Female)."
+
+    return {'Rank': rank, 'Branch': found_branch, 'Gender': gender, 'Category': category}, None
+
+def _format_admission(features, prob, cutoffs=None):
+    percent = prob * 100
+    
+    status = "High Chance" if percent > 70 else ("Moderate Chance" if percent > 40 else "Low Chance")
+    
+    answer = (f"**Admission Prediction** (Logistic Regression)\n"
+              f"Details: Rank {features['Rank']}, {features['Branch']}, {features['Gender']}, {features['Category']}\n"
+              f"Probability of Admission: **{percent:.1f}%**\n"
+              f"Status: **{status}**")
+
+    # Hard facts from the approval list next to the model estimate
+    if cutoffs is not None:
+        rank, branch, gender, category = features['Rank'], features['Branch'], features['Gender'], features['Category']
+        last = cutoffs.last_admitted(branch, gender, category)
+        group = f"{branch} / {category} / {gender}"
+        if last is None:
+            answer += f"\nNo admissions recorded for {group} in the approval list."
+        else:
+            worse = cutoffs.admitted_worse_than(rank, branch, gender, category)
+            answer += (f"\nLast admitted rank for {group}: **{last}**\n"
+                       f"Students admitted with a worse rank than yours: **{worse}**")
+    return answer
+
+def _admission_unavailable():
+    if is_training(ADMISSION_MODEL_PATH):
+        return PREDICTION_WARMING_UP
+    return "Admission prediction model is unavailable."
+
+def _admission_ready(admission_table):
+    # Wait for a cutoff index that is being rebuilt; with no approval list
+    # to build one from, answers go without it.
+    if SUBSYSTEMS.get("cutoff_index") is None and is_training(ADMISSION_MODEL_PATH):
+        return False
+    return bool(admission_table)
+
+def predict_admission(message, routed=None):
+    admission_table = _get_admission_table()
+    if not _admission_ready(admission_table):
+        return _admission_unavailable()
+
+    routed = routed or route_query(message)
     
     try:
-        # Rank
-        match_rank = re.search(r'rank\s*[:=]?\s*(\d+)', msg)
-        rank = int(match_rank.group(1)) if match_rank else 0
-        if rank == 0:
-            nums = [int(s) for s in msg.split() if s.isdigit()]
-            for n in nums:
-                if n > 1000: rank = n; break
-        
-        if rank == 0:
-            return "Please provide your Rank to predict admission chances."
+        features, reply = _parse_admission_query(message, routed)
+        if reply:
+            return reply
 
-        # Gender
-        gender = "M" if "male" in msg or "boy" in msg else ("F" if "female" in msg or "girl" in msg else None)
-        
-        # Category
-        category = "OC"
-        cats = ['oc_ews', 'bc_a', 'bc_b', 'bc_c', 'bc_d', 'bc_e', 'oc', 'sc', 'st']
-        for c in cats:
-            if c in msg.replace('-', '_'):
-                category = c.upper()
-                break
-        if "ews" in msg and category == "OC": category = "OC_EWS"
-
-        # Branch
-        branch = "CSE" 
-        branch_map = {
-            "cse": "CSE", "computer": "CSE",
-            "aiml": "CAI", "ai": "CAI", 
-            "ece": "ECE", "electronics": "ECE",
-            "eee": "EEE", "electrical": "EEE",
-            "mech": "MEC", "mechanical": "MEC",
-            "civil": "CIV", 
-            "it": "INF", "inf": "INF",
-            "ds": "CSD", "data science": "CSD",
-            "csm": "CSM"
-        }
-        found_branch = None
-        for k, v in branch_map.items():
-            if k in msg:
-                found_branch = v
-                break
-        
-        if not found_branch:
-             return f"Please specify the branch (e.g., CSE, ECE, AIML). I understood Rank: {rank}"
-             
-        if not gender:
-             return f"Please specify your gender (Male/Female)."
-
-        # Predict using Pipeline (DataFrame Input)
-        input_df = pd.DataFrame([{
-            'Rank': rank,
-            'Branch': found_branch,
-            'Gender': gender,
-            'Category': category
-        }])
-        
-        prob = admission_model.predict_proba(input_df)[0][1]
-        percent = prob * 100
-        
-        status = "High Chance" if percent > 70 else ("Moderate Chance" if percent > 40 else "Low Chance")
-        
-        return (f"**Admission Prediction** (Logistic Regression)\n"
-                f"Details: Rank {rank}, {found_branch}, {gender}, {category}\n"
-                f"Probability of Admission: **{percent:.1f}%**\n"
-                f"Status: **{status}**")
+        prob = admission_table.predict_proba(
+            features['Rank'], features['Branch'], features['Gender'], features['Category'])
+        return _format_admission(features, prob, SUBSYSTEMS.get("cutoff_index"))
 
     except Exception as e:
         return f"Error in prediction: {e}"
 
+def predict_admission_many(messages, routeds):
+    """predict_admission for many queries with one vectorized table lookup."""
+    admission_table = _get_admission_table()
+    if not _admission_ready(admission_table):
+        return [_admission_unavailable()] * len(messages)
+
+    answers = [None] * len(messages)
+    rows, row_idx = [], []
+    for i, (message, routed) in enumerate(zip(messages, routeds)):
+        try:
+            features, reply = _parse_admission_query(message, routed)
+        except Exception as e:
+            answers[i] = f"Error in prediction: {e}"
+            continue
+        if reply:
+            answers[i] = reply
+        else:
+            rows.append(features)
+            row_idx.append(i)
+
+    if rows:
+        probs = admission_table.predict_many(rows)
+        cutoffs = SUBSYSTEMS.get("cutoff_index")
+        for i, features, prob in zip(row_idx, rows, probs):
+            answers[i] = _format_admission(features, prob, cutoffs)
+    return answers
+
 def get_intent(message):
-    if not intent_model:
+    intent_table = _get_intent_table()
+    if not intent_table:
         return "UNKNOWN"
-    return intent_model.predict([message])[0]
+    return intent_table.predict(message)
+
+def get_intents(messages):
+    """get_intent for a batch."""
+    intent_table = _get_intent_table()
+    if not intent_table:
+        return ["UNKNOWN"] * len(messages)
+    return intent_table.predict_many(messages)
+
+# ==========================
+# INTENT CASCADE
+# ==========================
+# Queries no keyword override catches are routed on how sure the intent
+# model is (IntentGuess):
+#   - no known n-gram, or confidence below INTENT_REJECT_FLOOR: the model's
+#     guess is rejected and the query is treated as an unknown intent. Only a
+#     handbook chunk clearing the unknown-intent bar (0.15) is offered,
+#     otherwise the fallback reply.
+#   - confidence >= INTENT_DIRECT_CONFIDENCE, or a margin of at least
+#     INTENT_MIN_MARGIN over the runner-up: the top intent
+#   - otherwise the top two are too close to call and the router's
+#     keyword cues (INTENT_CUES) pick between them
+# With six classes an unsure prediction sits near 1/6, so the thresholds
+# are on that scale. Every decision is appended to INTENT_LOG_PATH (one
+# JSON object per line) for tuning them; None disables the log.
+INTENT_DIRECT_CONFIDENCE = 0.3
+INTENT_MIN_MARGIN = 0.05
+INTENT_REJECT_FLOOR = 0.18
+INTENT_LOG_PATH = os.path.join(BASE_DIR, "intent_log.jsonl")
+INTENT_CUES = {
+    "RANK_PREDICTION": ["rank", "gender_m", "gender_f", "ews"],
+    "ADMISSION": ["intake", "admission", "admission_info"],
+    "PLACEMENT": ["placement", "stat_highest", "stat_average", "stat_companies"],
+    "PEOPLE": ["faculty", "creator"],
+    "COLLEGE_INFO": ["about", "branches"],
+    "GREETING": ["greeting", "bye"],
+}
+
+def get_intent_guess(message):
+    """IntentGuess for the message, or None while there is no intent model."""
+    intent_table = _get_intent_table()
+    if not intent_table:
+        return None
+    return intent_table.guess(message)
+
+def get_intent_guesses(messages):
+    intent_table = _get_intent_table()
+    if not intent_table:
+        return [None] * len(messages)
+    return intent_table.guess_many(messages)
+
+def route_intent(guess, routed):
+    """(intent, decision) for an IntentGuess; intent is None when rejected."""
+    if guess.evidence == 0 or guess.confidence < INTENT_REJECT_FLOOR:
+        return None, "rejected"
+    if guess.confidence >= INTENT_DIRECT_CONFIDENCE:
+        return guess.intent, "confident"
+    if guess.margin >= INTENT_MIN_MARGIN or guess.runner_up is None:
+        return guess.intent, "clear"
+    return _disambiguate(guess, routed)
+
+def _disambiguate(guess, routed):
+    # Cheap: the router already scanned the query. Switch only when the
+    # runner-up alone has a cue; otherwise keep the model's choice.
+    cued = [intent for intent in (guess.intent, guess.runner_up)
+            if any(routed.has(c) for c in INTENT_CUES.get(intent, []))]
+    if cued == [guess.runner_up]:
+        return guess.runner_up, "disambiguated"
+    return guess.intent, "close"
+
+def _log_intent(message, guess, intent, decision):
+    if guess is None:
+        print(f"Query: {message} -> Detected Intent: {intent} (no intent model)")
+        return
+    print(f"Query: {message} -> Detected Intent: {intent} ({decision}, "
+          f"{guess.intent} {guess.confidence:.2f}, runner-up {guess.runner_up} margin {guess.margin:.2f})")
+    if not INTENT_LOG_PATH:
+        return
+    record = {"time": round(time.time(), 3), "query": message, "intent": intent,
+              "decision": decision, "top": guess.intent, "confidence": round(guess.confidence, 4),
+              "runner_up": guess.runner_up, "margin": round(guess.margin, 4),
+              "evidence": guess.evidence}
+    try:
+        with open(INTENT_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"Could not write intent log: {e}")
+
+def _plan_cascade(message, routed, guess):
+    if guess is None:
+        # No intent model (missing, or still training): rank questions are
+        # recognized by keyword, everything else goes to the handbook.
+        intent, decision = ("RANK_PREDICTION" if routed.has("rank") else "UNKNOWN"), None
+    else:
+        intent, decision = route_intent(guess, routed)
+    _log_intent(message, guess, intent, decision)
+    return _plan_intent(message, routed, intent or "UNKNOWN")
 
 def respond(message, history=None):
     if not message:
         return ""
-    
+
+    # Repeated questions ("placements of cse") are answered from the cache;
+    # answers are computed from the normalized text so every phrasing that
+    # shares a key gets the same answer.
+    query = normalize_query(message)
+    answer = RESPONSE_CACHE.get(query)
+    if answer is None:
+        # Answers given while a model is warming up would outlive it; one
+        # that finished mid-request may not have been used for the answer.
+        warming = is_training()
+        answer = _respond_uncached(query)
+        if not (warming or is_training()):
+            RESPONSE_CACHE.put(query, answer)
+    return answer
+
+def respond_many(messages):
+    """
+    Answers a batch of queries (offline evaluation, multi-kiosk server).
+    Queries are routed first, then each route makes one call for the whole
+    batch: intent scoring, one KB similarity pass and one vectorized
+    admission table lookup. Answers are identical to calling respond() per query.
+    """
+    answers = [""] * len(messages)
+    pending = {} # normalized query -> indices in messages
+    for i, message in enumerate(messages):
+        if not message:
+            continue
+        query = normalize_query(message)
+        cached = RESPONSE_CACHE.get(query)
+        if cached is not None:
+            answers[i] = cached
+        else:
+            pending.setdefault(query, []).append(i)
+
+    queries = list(pending)
+    warming = is_training() # as in respond()
+    routeds = [route_query(q) for q in queries]
+    kb_memo = {}
+    actions = [_plan_keywords(q, r, kb_memo) for q, r in zip(queries, routeds)]
+
+    need_intent = [j for j, a in enumerate(actions) if a is None]
+    guesses = get_intent_guesses([queries[j] for j in need_intent])
+    for j, guess in zip(need_intent, guesses):
+        actions[j] = _plan_cascade(queries[j], routeds[j], guess)
+
+    results = _execute_many(queries, routeds, actions, kb_memo)
+    warming = warming or is_training()
+    for query, answer in zip(queries, results):
+        if not warming:
+            RESPONSE_CACHE.put(query, answer)
+        for i in pending[query]:
+            answers[i] = answer
+    return answers
+
+def cache_stats():
+    """Hit / miss / eviction counters of the response cache."""
+    return RESPONSE_CACHE.stats()
+
+def kb_stats():
+    """Hot reload metrics of the knowledge base (count, last duration and time)."""
+    return SUBSYSTEMS.get("kb").reload_stats()
+
+# Routing produces an action; the expensive ones are executed separately so
+# respond_many() can run each kind once for a whole batch:
+#   ("text", answer)
+#   ("kb", query, threshold, template, fallback)  -> template.format(hit) or fallback
+#                                                    (threshold None: the KB's default)
+#   ("admission",)                                 -> rank prediction for the message
+def _respond_uncached(message):
+    if not message:
+        return ""
+
+    routed = route_query(message)
+    kb_memo = {} # KB results by query text, for this request only
+    action = _plan_keywords(message, routed, kb_memo)
+    if action is None:
+        # 1. ML Intent Detection, gated on confidence (INTENT CASCADE)
+        action = _plan_cascade(message, routed, get_intent_guess(message))
+    return _execute(message, routed, action, kb_memo)
+
+def _execute(message, routed, action, kb_memo=None):
+    kind = action[0]
+    if kind == "text":
+        return action[1]
+    if kind == "kb":
+        _, query, threshold, template, fallback = action
+        hit = SUBSYSTEMS.get("kb").score(query, memo=kb_memo).best(threshold)
+        return template.format(hit.text) if hit else fallback
+    return predict_admission(message, routed)
+
+def _execute_many(messages, routeds, actions, kb_memo=None):
+    results = [None] * len(actions)
+    kb_jobs, admission_jobs = [], []
+    for j, action in enumerate(actions):
+        if action[0] == "text":
+            results[j] = action[1]
+        elif action[0] == "kb":
+            kb_jobs.append(j)
+        else:
+            admission_jobs.append(j)
+
+    if kb_jobs:
+        kb_results = SUBSYSTEMS.get("kb").score_many([actions[j][1] for j in kb_jobs], memo=kb_memo)
+        for j, kb_result in zip(kb_jobs, kb_results):
+            _, _, threshold, template, fallback = actions[j]
+            hit = kb_result.best(threshold)
+            results[j] = template.format(hit.text) if hit else fallback
+
+    if admission_jobs:
+        predictions = predict_admission_many(
+            [messages[j] for j in admission_jobs], [routeds[j] for j in admission_jobs])
+        for j, answer in zip(admission_jobs, predictions):
+            results[j] = answer
+    return results
+
+def _plan_keywords(message, routed, kb_memo=None):
+    """Keyword overrides. Returns an action, or None to fall through to intent."""
     msg_lower = message.lower()
     
-    if "intake" in msg_lower or "seats" in msg_lower or "capacity" in msg_lower:
-        return get_intake_info(message)
+    if routed.has("intake"):
+        return ("text", get_intake_info(message, routed))
     
     # NEW: Identity Override
-    if "who are you" in msg_lower or "about yourself" in msg_lower:
-        return "I am Pragati Engineering College AI Robo. I can help you with college details, admissions, placements, and faculty information."
+    if routed.has("identity"):
+        return ("text", "I am Pragati Engineering College AI Robo. I can help you with college details, admissions, placements, and faculty information.")
 
     # NEW: Greetings Overrides
-    if any(w in msg_lower for w in ["hi ", "hi", "hello", "hey", "hai"]):
+    if routed.has("greeting"):
         # Check if it's just a greeting or contains more. If just greeting:
         if len(msg_lower.strip().split()) <= 2:
-             return "Hello! How can I help you today regarding Pragati Engineering College?"
+             return ("text", "Hello! How can I help you today regarding Pragati Engineering College?")
 
-    if any(w in msg_lower for w in ["bye", "goodbye", "exit", "quit"]):
-         return "Goodbye! Have a great day!"
+    if routed.has("bye"):
+         return ("text", "Goodbye! Have a great day!")
 
     # History of AIML -> HOD AIML Override
-    if "history of aiml" in msg_lower:
-        return get_people_info("hod of aiml")
+    if routed.has("history_aiml"):
+        return ("text", get_people_info("hod of aiml"))
         
     # NEW: Faculty Role Override (Prioritize over KB)
-    if any(w in msg_lower for w in ["hod", "principal", "dean", "chairman", "director", "coordinator", "incharge"]):
-         return get_people_info(message)
+    if routed.has("faculty"):
+         return ("text", get_people_info(message, routed))
 
     # NEW: Placement Priority Routing
-    if "placement" in msg_lower:
-         return get_placement_info(message)
+    if routed.has("placement"):
+         return ("text", get_placement_info(message, routed))
 
     # Admission Process Override (Fix for intent misclassification)
     # Force search for "Admissions Process" to get the right KB chunk
-    if ("admission" in msg_lower and ("process" in msg_lower or "procedure" in msg_lower)) or "how to join" in msg_lower or "eligibility" in msg_lower:
-         answer = kb.search("Admissions Process B.Tech M.Tech Eligibility") 
-         return answer if answer else "Admission is determined by EAPCET rank for B.Tech and GATE/PGECET for M.Tech."
+    if (routed.has("admission") and routed.has("process")) or routed.has("admission_direct"):
+         return ("kb", "Admissions Process B.Tech M.Tech Eligibility", None, "{}",
+                 "Admission is determined by EAPCET rank for B.Tech and GATE/PGECET for M.Tech.")
          
     # Course Info Override (Fix for M.Tech/B.Tech lookup issues)
-    if "mtech" in msg_lower or "m.tech" in msg_lower:
-         return ("**M.Tech Program (Master of Technology)**:\n"
+    if routed.has("mtech"):
+         return ("text", "**M.Tech Program (Master of Technology)**:\n"
                  "Pragati Engineering College offers a 2-year M.Tech (MTech) postgraduate program in specialized engineering fields. "
                  "The program is AICTE-approved and affiliated with JNTU Kakinada, focusing on advanced technical knowledge, research skills, "
                  "and industry-oriented expertise. Branches: CSE, VLSI Design, Power Electronics, Structural Engineering.")
          
-    if "btech" in msg_lower or "b.tech" in msg_lower:
-         return ("**About B.Tech (Bachelor of Technology)**:\n"
+    if routed.has("btech"):
+         return ("text", "**About B.Tech (Bachelor of Technology)**:\n"
                  "Pragati Engineering College offers a 4-year B.Tech (BTech) program in multiple engineering disciplines. "
                  "The curriculum is AICTE-approved and affiliated with JNTU Kakinada. It focuses on technical foundations, practical skills, and industry readiness. "
                  "Available branches: CSE, AIML, Data Science, AI, Cyber Security, IT, ECE, EEE, Mechanical, Civil.")
     
-    # Branch Info Override (Fix for "tell me about ds in pragati..." noise)
-    # Detects branch keywords and searches specifically for that branch description
-    branch_lookup = {
-        "aiml": "B.Tech AIML",
-        "aim": "B.Tech AIML",
-        "ami": "B.Tech AIML",  # Speech recognition often misses the 'l'
-        "human": "B.Tech AIML",
-        "cse(aiml)": "B.Tech AIML", # Context aware if needed
-        "cse(ai&ml)":"B.Tech AIML",
-        "artificial intelligence": "B.Tech CSE (Artificial Intelligence)",
-        "ai": "B.Tech CSE (Artificial Intelligence)",
-        "cyber": "B.Tech CSE (Cyber Security)",
-        "security": "B.Tech CSE (Cyber Security)",
-        "data science": "B.Tech CSE (Data Science)",
-        "ds": "B.Tech CSE (Data Science)",
-        "cse": "B.Tech CSE (Computer Science & Engineering – Core)",
-        "computer science": "B.Tech CSE (Computer Science & Engineering – Core)",
-        "it": "B.Tech IT (Information Technology)",
-        "information technology": "B.Tech IT (Information Technology)",
-        "ece": "B.Tech ECE",
-        "electronics": "B.Tech ECE",
-        "eee": "B.Tech EEE",
-        "electrical": "B.Tech EEE",
-        "mech": "B.Tech ME",
-        "mechanical": "B.Tech ME",
-        "civil": "B.Tech CE"
-    }
-    
-    # Check if user is asking "about" a branch
-    if "about" in msg_lower or "explain" in msg_lower or "tell me" in msg_lower:
-        # Sort keys by length so "data science" matches before "ds" or "cse"
-        sorted_branches = sorted(branch_lookup.keys(), key=len, reverse=True)
-        found_target = None
-        detected_key = None
+    # Branch Info Override: check if user is asking "about" a branch
+    if routed.has("about"):
+        # Longest branch keyword first; word boundary check avoids partial
+        # matches like 'it' in 'with'
+        detected_key = routed.first("kb_branch", word=True)
         
-        for k in sorted_branches:
-            # Word boundary check to avoid partial matches like 'it' in 'with'
-            if re.search(r"\b" + re.escape(k) + r"\b", msg_lower):
-                found_target = branch_lookup[k]
-                detected_key = k
-                break
-        
-        if found_target:
-             answer = kb.search(found_target)
-             if answer:
-                 return answer
+        if detected_key:
+             # Whether this answers the query decides the routing, so the
+             # search runs here (memoized across the request / batch).
+             target = KB_BRANCH_LOOKUP[detected_key]
+             hit = SUBSYSTEMS.get("kb").score(target, memo=kb_memo).best()
+             if hit:
+                 return ("text", hit.text)
 
     # Typo tolerance for branches query
-    if re.search(r"bra[a]*nch|cours|program", msg_lower):
+    if routed.has("branches"):
          # Route to "Available Branches" in KB or Intent
-         return kb.search("available branches") or "We offer CSE, AIML, DS, IT, ECE, EEE, MECH, CIVIL, CYBER SECURITY."
+         return ("kb", "available branches", None, "{}", "We offer CSE, AIML, DS, IT, ECE, EEE, MECH, CIVIL, CYBER SECURITY.")
 
-    # 1. ML Intent Detection
-    intent = get_intent(message)
-    print(f"Query: {message} -> Detected Intent: {intent}")
-    
+    return None
+
+def _plan_intent(message, routed, intent):
     if intent == "ADMISSION":
         # Split Admission Intent: Intake vs Process
-        if any(w in msg_lower for w in ["process", "how to", "eligibility", "join", "fee", "application"]):
+        if routed.has("admission_info"):
              # KB Search
-             return kb.search(message) or "Admission is via EAPCET/ECET. Check website for details."
+             return ("kb", message, None, "{}", "Admission is via EAPCET/ECET. Check website for details.")
         else:
-             return get_intake_info(message)
+             return ("text", get_intake_info(message, routed))
              
-    elif intent == "RANK_PREDICTION": return predict_admission(message)
-    elif intent == "PLACEMENT": return get_placement_info(message)
-    elif intent == "PEOPLE": return get_people_info(message)
+    elif intent == "RANK_PREDICTION": return ("admission",)
+    elif intent == "PLACEMENT": return ("text", get_placement_info(message, routed))
+    elif intent == "PEOPLE": return ("text", get_people_info(message, routed))
     elif intent == "COLLEGE_INFO":
-        answer = kb.search(message)
-        if answer: 
-            return f"{answer}"
-            
-        return "I couldn't find specific information in the college handbook."
+        return ("kb", message, None, "{}", "I couldn't find specific information in the college handbook.")
     elif intent == "GREETING":
-        return "Hello! I am your College AI Assistant. Ask me about Admissions, Placements, or Faculty."
+        return ("text", "Hello! I am your College AI Assistant. Ask me about Admissions, Placements, or Faculty.")
     else:
-        answer = kb.search(message, threshold=0.15)
-        if answer: return f"I think this might help:\n{answer}"
-        return "I'm not sure how to answer that."
+        # Unknown intent: a handbook guess has to clear a higher bar
+        return ("kb", message, 0.15, "I think this might help:\n{}", "I'm not sure how to answer that.")
 
 # ==========================
 # VOICE INTERFACE (Raspberry Pi & PC)
@@ -613,5 +1206,28 @@ def main_voice_loop():
     except KeyboardInterrupt:
         print("\nStopping Voice Bot...")
 
+def export_runtime(runtime_dir=numpy_runtime.RUNTIME_DIR):
+    """
+    Writes the models and knowledge base loaded here as the numpy runtime's
+    plain files (INFERENCE_RUNTIME = "numpy" serves them). Returns the manifest.
+    """
+    if INFERENCE_RUNTIME != "sklearn":
+        raise RuntimeError("Exporting needs scikit-learn (INFERENCE_RUNTIME = \"sklearn\")")
+    if is_training():
+        raise RuntimeError("A model is still being trained; export once it is done")
+    parts = {name: SUBSYSTEMS.get(name) for name in ("intent_table", "admission_table", "kb")}
+    missing = [name for name, value in parts.items() if value is None]
+    if missing:
+        raise RuntimeError(f"Nothing to export for: {', '.join(missing)}")
+    sources = {"intent_model": read_manifest(_intent_model_path()),
+               "admission_model": read_manifest(ADMISSION_MODEL_PATH)}
+    manifest = numpy_runtime.export_runtime(runtime_dir, parts["intent_table"], parts["admission_table"],
+                                            parts["kb"], SUBSYSTEMS.get("cutoff_index"), sources)
+    print(f"Exported the numpy runtime to {runtime_dir} ({manifest['chunks']} KB chunks).")
+    return manifest
+
 if __name__ == "__main__":
-    main_voice_loop()
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        export_runtime()
+    else:
+        main_voice_loop()
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import platform
+import time
+from importlib import metadata
+
+import joblib
+
+# Every saved model carries a sidecar manifest, <artifact>.manifest.json:
+#   kind        "intent", "intent-online", "admission"
+#   libraries   versions of the libraries the pickle depends on
+#   data_hash   hash of the training data it was fitted on
+#   schema      what the model consumes and produces (classes, features, inputs)
+#   built_at    UTC build time
+#   size        byte size of the artifact, to catch a file replaced without its manifest
+#   table       file name of the compiled table (plain JSON, see IntentTable /
+#               AdmissionTable.to_dict), usable whatever the library versions
+# The manifest is written last, so a complete manifest means a complete artifact.
+MANIFEST_VERSION = 1
+LIBRARIES = ["scikit-learn", "numpy", "scipy", "joblib"]
+
+# check_artifact() outcomes
+LOAD = "load"         # unpickle: built with these library versions
+CONVERT = "convert"   # do not unpickle; load the compiled table instead
+ADOPT = "adopt"       # no manifest: unpickle as before, then adopt_artifact()
+REBUILD = "rebuild"   # nothing usable; retrain
+
+
+def manifest_path(path):
+    return path + ".manifest.json"
+
+
+def table_path(path):
+    return os.path.splitext(path)[0] + ".table.json"
+
+
+def library_versions():
+    """Installed versions, read from package metadata (nothing is imported)."""
+    versions = {"python": platform.python_version()}
+    for name in LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def hash_files(paths, extra=None):
+    """sha256 over the file names and contents (plus any JSON-able extra)."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    if extra is not None:
+        h.update(json.dumps(extra, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _write_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def save_artifact(path, obj, kind, data_hash, schema, table=None, **extra):
+    """
+    Pickles obj to path, writes the compiled table (a to_dict() result) next
+    to it and the manifest last, each through a temp file and a rename.
+    """
+    tmp = path + ".tmp"
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+    return write_manifest(path, kind, library_versions(), data_hash, schema, table, **extra)
+
+
+def adopt_artifact(path, kind, schema, table=None, data_hash=None):
+    """
+    Writes a manifest (and compiled table) for a pickle saved before there
+    were manifests. The libraries that built it are unknown (None): from
+    then on its table is used instead of unpickling it blind again. It is
+    taken to be fitted on the current training data (data_hash), so it is
+    retrained once that changes.
+    """
+    unknown = {name: None for name in ["python"] + LIBRARIES}
+    return write_manifest(path, kind, unknown, data_hash, schema, table, adopted=True)
+
+
+def write_manifest(path, kind, libraries, data_hash, schema, table=None, **extra):
+    if table is not None:
+        _write_json(table_path(path), table)
+    manifest = {
+        "manifest_version": MANIFEST_VERSION,
+        "kind": kind,
+        "artifact": os.path.basename(path),
+        "libraries": libraries,
+        "data_hash": data_hash,
+        "schema": schema,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "size": os.path.getsize(path),
+        "table": os.path.basename(table_path(path)) if table is not None else None,
+    }
+    manifest.update(extra)
+    _write_json(manifest_path(path), manifest)
+    return manifest
+
+
+def read_manifest(path):
+    """The manifest of the artifact at path, or None if missing or unreadable."""
+    try:
+        with open(manifest_path(path), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("manifest_version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _incompatible(built, installed):
+    """Reasons a pickle from `built` versions cannot be trusted with `installed`."""
+    reasons = []
+    # sklearn only supports unpickling with the exact version that pickled
+    if built.get("scikit-learn") != installed.get("scikit-learn"):
+        reasons.append(f"scikit-learn {built.get('scikit-learn')} != {installed.get('scikit-learn')}")
+    for name in ("numpy", "scipy"):
+        b, i = built.get(name), installed.get(name)
+        if (b or "").split(".")[0] != (i or "").split(".")[0]:
+            reasons.append(f"{name} {b} != {i}")
+    return reasons
+
+
+def check_artifact(path, data_hash=None, kind=None):
+    """
+    Picks the fastest valid way to get a model out of path, from the manifest
+    alone. Returns (action, stale, reason):
+      LOAD     the pickle was built by the installed library versions
+      CONVERT  it was not, but its compiled table is there: use that
+      ADOPT    no manifest (saved before manifests): nothing to check, so
+               it is unpickled as before and adopted
+      REBUILD  missing, replaced without its manifest (the size differs:
+               it is not unpickled unchecked), or neither can be used
+    stale is True when the training data changed since the model was built
+    (data_hash differs): it is served while a new one is trained.
+    """
+    if not os.path.exists(path):
+        return REBUILD, False, "missing"
+    manifest = read_manifest(path)
+    if manifest is None:
+        return ADOPT, False, "no manifest"
+    if manifest.get("size") != os.path.getsize(path):
+        return REBUILD, False, "artifact does not match its manifest"
+    if kind is not None and manifest.get("kind") != kind:
+        return REBUILD, False, f"artifact is a {manifest.get('kind')} model, expected {kind}"
+
+    built_on = manifest.get("data_hash")
+    stale = data_hash is not None and built_on is not None and built_on != data_hash
+    reasons = _incompatible(manifest.get("libraries", {}), library_versions())
+    if not reasons:
+        return LOAD, stale, "training data changed" if stale else "ok"
+    table = manifest.get("table")
+    if table and os.path.exists(os.path.join(os.path.dirname(path), table)):
+        return CONVERT, stale, "; ".join(reasons)
+    return REBUILD, False, "; ".join(reasons)
+
+
+def load_table(path):
+    with open(table_path(path), "r", encoding="utf-8") as f:
+        return json.load(f)
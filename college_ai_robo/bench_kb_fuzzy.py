@@ -0,0 +1,88 @@
+"""
+Benchmark: the character n-gram fuzzy channel (fuzzy_weight) against
+word-only CollegeKnowledgeBase.search.
+
+Prints which section misheard / misspelled queries land on with and
+without the channel, then the per-query latency of both on the real
+handbook and on synthetic corpora of 1k and 10k chunks (where "auto"
+switches to the inverted index). The fused search on the real handbook
+must stay inside LATENCY_BUDGET_MS; the script fails otherwise.
+
+    python bench_kb_fuzzy.py
+"""
+import time
+
+import numpy as np
+
+from bench_kb_search import build_corpus, load_kb
+from vector_store import CollegeKnowledgeBase
+
+FUZZY_WEIGHT = 0.3 # app.KB_FUZZY_WEIGHT
+THRESHOLD = 0.1
+# Per query, fused search over college_data.txt. Run this on the Pi: that
+# is the machine the budget is for.
+LATENCY_BUDGET_MS = 5.0
+SIZES = [1_000, 10_000]
+SEED = 0
+REPEAT = 200
+MISHEARD = [
+    "mechanicle engineering",
+    "civill branch",
+    "cyber secuirty",
+    "data sience",
+    "electrnics and communication",
+    "admision process",
+    "aim branch",
+]
+UNRELATED = [
+    "what is the weather on mars",
+    "who is the president of usa",
+    "pizza recipe",
+    "fee structure",
+    "vision and mission",
+]
+
+
+def best_title(kb, query):
+    index = kb._index
+    fuzzy_vec = kb._fuzzy_vectors(index, [query])[0]
+    ids, scores = kb._scores(index, index.vectorizer.transform([query]), THRESHOLD, fuzzy_vec)
+    best = np.argmax(scores)
+    if scores[best] < THRESHOLD:
+        return f"-  ({scores[best]:.3f})"
+    return f"{index.metadata[ids[best]]['title'][:32]}  ({scores[best]:.3f})"
+
+
+def per_query_ms(kb, queries, repeat):
+    kb.search(queries[0]) # build lazy postings / n-gram matrix outside the timing
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            kb.search(q)
+    return (time.perf_counter() - start) * 1e3 / (repeat * len(queries))
+
+
+if __name__ == "__main__":
+    word = CollegeKnowledgeBase(cache_dir=None)
+    fused = CollegeKnowledgeBase(cache_dir=None, fuzzy_weight=FUZZY_WEIGHT)
+
+    print(f"\n{'query':<32} {'word only':<42} {'fused':<42}")
+    for q in MISHEARD + UNRELATED:
+        print(f"{q:<32} {best_title(word, q):<42} {best_title(fused, q):<42}")
+
+    queries = MISHEARD + UNRELATED
+    print(f"\n{'chunks':>8} {'word only':>10} {'fused':>10}")
+    slow = per_query_ms(fused, queries, REPEAT)
+    print(f"{len(fused.chunks):>8,} {per_query_ms(word, queries, REPEAT):>8.3f}ms {slow:>8.3f}ms")
+
+    rng = np.random.default_rng(SEED)
+    for n in SIZES:
+        corpus = load_kb(build_corpus(n, rng), "auto")
+        repeat = max(1, 20_000 // n)
+        plain = per_query_ms(corpus, queries, repeat)
+        corpus.fuzzy_weight = FUZZY_WEIGHT
+        print(f"{n:>8,} {plain:>8.3f}ms {per_query_ms(corpus, queries, repeat):>8.3f}ms")
+
+    status = "within" if slow <= LATENCY_BUDGET_MS else "OVER"
+    print(f"\nFused search on the handbook: {slow:.3f}ms per query, {status} the {LATENCY_BUDGET_MS}ms budget.")
+    assert slow <= LATENCY_BUDGET_MS
@@ -0,0 +1,64 @@
+"""
+Benchmark: LSA scoring (float16 latent vectors, memory-mapped from the KB
+cache) next to the sparse TF-IDF and BM25 backends, on synthetic corpora of
+1k, 10k and 100k chunks (see bench_kb_search.build_corpus).
+
+For each size prints the bytes each backend scores from, per-query search
+latency, and the one-off LSA fit time. The LSA vectors are written to a
+temporary cache directory and reloaded, so the timed searches run on the
+memory-mapped copy, as they do on the Pi.
+
+    python bench_kb_lsa.py
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from bench_kb_search import QUERIES, build_corpus
+from eval_kb_backends import index_bytes
+from vector_store import SCORING_BACKENDS, CollegeKnowledgeBase
+
+SIZES = [1_000, 10_000, 100_000]
+SEED = 0
+
+
+def per_query_ms(kb, repeat):
+    kb.search(QUERIES[0]) # lazy postings / LSA load outside the timing
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in QUERIES:
+            kb.search(q)
+    return (time.perf_counter() - start) * 1e3 / (repeat * len(QUERIES))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    rows = []
+    for n in SIZES:
+        cache_dir = tempfile.mkdtemp()
+        path = os.path.join(cache_dir, "handbook.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(build_corpus(n, rng)))
+        try:
+            kb = CollegeKnowledgeBase(data_file=path, cache_dir=cache_dir)
+            kb.set_scoring("lsa")
+            start = time.perf_counter()
+            kb.search(QUERIES[0]) # fits and caches the latent space
+            fit = time.perf_counter() - start
+
+            # A second instance reads everything back memory-mapped
+            kb = CollegeKnowledgeBase(data_file=path, cache_dir=cache_dir)
+            repeat = max(1, 20_000 // n)
+            for scoring in SCORING_BACKENDS:
+                kb.set_scoring(scoring)
+                rows.append((n, scoring, index_bytes(kb), per_query_ms(kb, repeat), fit if scoring == "lsa" else None))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"\n{'chunks':>8} {'backend':<7} {'memory':>10} {'latency':>10} {'fit':>8}")
+    for n, scoring, size, ms, fit in rows:
+        fit = f"{fit:.2f}s" if fit is not None else ""
+        print(f"{n:>8,} {scoring:<7} {size / 2**20:>8.2f}MB {ms:>8.3f}ms {fit:>8}")
@@ -0,0 +1,87 @@
+"""
+Benchmark: CollegeKnowledgeBase.search in dense mode (cosine against every
+chunk) versus inverted mode (score only chunks sharing a query term), on
+corpora of 100, 10k and 100k chunks.
+
+Corpora are built from the handbook's own vocabulary: each synthetic chunk
+is a headed section of random handbook words, so term frequencies look
+like a multi-handbook corpus. Both modes are checked for identical top-1 and
+top-5 results before timing.
+
+    python bench_kb_search.py
+"""
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+
+from vector_store import CollegeKnowledgeBase
+
+SIZES = [100, 10_000, 100_000]
+TOP_K = 5
+SEED = 0
+QUERIES = [
+    "who is the principal",
+    "tell me about data science branch",
+    "hostel facility for girls",
+    "admission process and eligibility",
+    "placements in computer science",
+    "library timings",
+    "transport bus routes",
+    "fee structure for btech",
+]
+
+
+def build_corpus(n_chunks, rng):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(base_dir, "college_data.txt"), "r", encoding="utf-8") as f:
+        words = re.findall(r"[a-z]+", f.read().lower())
+    words = np.array(words)
+    lengths = rng.integers(20, 80, size=n_chunks)
+    picks = rng.integers(0, len(words), size=lengths.sum())
+    chunks, pos = [], 0
+    for i, length in enumerate(lengths):
+        # A heading per chunk so the section chunker keeps them apart
+        chunks.append(f"Section {i}:\n" + " ".join(words[picks[pos:pos + length]]))
+        pos += length
+    return chunks
+
+
+def load_kb(chunks, mode):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+        f.write("\n\n".join(chunks))
+        path = f.name
+    try:
+        return CollegeKnowledgeBase(data_file=path, search_mode=mode, cache_dir=None)
+    finally:
+        os.remove(path)
+
+
+def per_query(kb, top_k, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in QUERIES:
+            kb.search(q, top_k=top_k)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    print(f"{'chunks':>8} {'top_k':>5} {'dense':>10} {'inverted':>10} {'speedup':>8}")
+    for n in SIZES:
+        dense = load_kb(build_corpus(n, rng), "dense")
+        inverted = CollegeKnowledgeBase.from_arrays(*dense.export_arrays())
+        inverted.set_search_mode("inverted")
+
+        for q in QUERIES:
+            assert dense.search(q) == inverted.search(q), q
+            assert dense.search(q, top_k=TOP_K) == inverted.search(q, top_k=TOP_K), q
+        inverted.search(QUERIES[0]) # build the postings outside the timing
+
+        repeat = max(1, 2000 // n)
+        for top_k in (1, TOP_K):
+            slow = per_query(dense, top_k, repeat)
+            fast = per_query(inverted, top_k, repeat)
+            print(f"{n:>8,} {top_k:>5} {slow * 1e3:>8.2f}ms {fast * 1e3:>8.2f}ms {slow / fast:>7.1f}x")
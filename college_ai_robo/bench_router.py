@@ -0,0 +1,124 @@
+"""
+Micro-benchmark: per-query routing cost of the old respond() keyword chain
+versus the compiled single-pass QueryRouter.
+
+Both sides only make routing decisions (which handler, which branch, which
+stat); no model, KB or placement work is done. The decisions are compared
+first so the timing is between equivalent code paths.
+
+    python bench_router.py
+"""
+import re
+import timeit
+
+from app import (ADMISSION_BRANCH_MAP, INTAKE_CODES, KB_BRANCH_LOOKUP,
+                 PLACEMENT_BRANCH_MAP, route_query)
+
+QUERIES = [
+    "who is the principal",
+    "placements of cse",
+    "highest package in it",
+    "tell me about data science branch in pragati",
+    "what is the intake of aiml",
+    "rank 45000 female bc_d ece can i get a seat",
+    "explain about information technology",
+    "hi",
+    "what courses are offered",
+    "is there a hostel facility for girls",
+    "how to join for btech",
+    "companies visiting the college for mechanical students",
+]
+
+
+def legacy_route(message):
+    """The checks respond() and the handlers used to run on every call."""
+    msg_lower = message.lower()
+    decision = {}
+
+    decision["intake"] = "intake" in msg_lower or "seats" in msg_lower or "capacity" in msg_lower
+    decision["identity"] = "who are you" in msg_lower or "about yourself" in msg_lower
+    decision["greeting"] = any(w in msg_lower for w in ["hi ", "hi", "hello", "hey", "hai"])
+    decision["bye"] = any(w in msg_lower for w in ["bye", "goodbye", "exit", "quit"])
+    decision["history_aiml"] = "history of aiml" in msg_lower
+    decision["faculty"] = any(w in msg_lower for w in ["hod", "principal", "dean", "chairman", "director", "coordinator", "incharge"])
+    decision["placement"] = "placement" in msg_lower
+    decision["admission_process"] = (("admission" in msg_lower and ("process" in msg_lower or "procedure" in msg_lower))
+                                     or "how to join" in msg_lower or "eligibility" in msg_lower)
+    decision["mtech"] = "mtech" in msg_lower or "m.tech" in msg_lower
+    decision["btech"] = "btech" in msg_lower or "b.tech" in msg_lower
+    decision["about"] = "about" in msg_lower or "explain" in msg_lower or "tell me" in msg_lower
+
+    kb_branch = None
+    for k in sorted(KB_BRANCH_LOOKUP.keys(), key=len, reverse=True):
+        if re.search(r"\b" + re.escape(k) + r"\b", msg_lower):
+            kb_branch = k
+            break
+    decision["kb_branch"] = kb_branch
+    decision["branches"] = bool(re.search(r"bra[a]*nch|cours|program", msg_lower))
+    decision["admission_info"] = any(w in msg_lower for w in ["process", "how to", "eligibility", "join", "fee", "application"])
+
+    intake_branch = None
+    for code in INTAKE_CODES:
+        if re.search(r"\b" + re.escape(code) + r"\b", msg_lower):
+            intake_branch = code
+            break
+    decision["intake_branch"] = intake_branch
+
+    placement_branch = None
+    for k in PLACEMENT_BRANCH_MAP:
+        if re.search(r"\b" + re.escape(k) + r"\b", msg_lower):
+            placement_branch = k
+            break
+    decision["placement_branch"] = placement_branch
+    decision["stats"] = ("highest" in msg_lower or "max" in msg_lower, "average" in msg_lower,
+                         "companies" in msg_lower or "recruiters" in msg_lower or "company" in msg_lower,
+                         "count" in msg_lower or "how many" in msg_lower)
+    decision["creator"] = "creator" in msg_lower or "who created" in msg_lower or "made you" in msg_lower
+    decision["gender"] = ("male" in msg_lower or "boy" in msg_lower, "female" in msg_lower or "girl" in msg_lower)
+    decision["ews"] = "ews" in msg_lower
+
+    admission_branch = None
+    for k in ADMISSION_BRANCH_MAP:
+        if k in msg_lower:
+            admission_branch = k
+            break
+    decision["admission_branch"] = admission_branch
+    return decision
+
+
+def compiled_route(message):
+    """The same decisions, read off one QueryRouter scan."""
+    routed = route_query(message)
+    decision = {}
+    for c in ["intake", "identity", "greeting", "bye", "history_aiml", "faculty",
+              "placement", "mtech", "btech", "about", "branches", "admission_info",
+              "creator", "ews"]:
+        decision[c] = routed.has(c)
+    decision["admission_process"] = (routed.has("admission") and routed.has("process")) or routed.has("admission_direct")
+    decision["kb_branch"] = routed.first("kb_branch", word=True)
+    decision["intake_branch"] = routed.first("intake_branch", word=True)
+    decision["placement_branch"] = routed.first("placement_branch", word=True)
+    decision["stats"] = (routed.has("stat_highest"), routed.has("stat_average"),
+                         routed.has("stat_companies"), routed.has("stat_count"))
+    decision["gender"] = (routed.has("gender_m"), routed.has("gender_f"))
+    decision["admission_branch"] = routed.first("admission_branch")
+    return decision
+
+
+def main():
+    for q in QUERIES:
+        old, new = legacy_route(q), compiled_route(q)
+        if old != new:
+            diff = {k: (old[k], new[k]) for k in old if old[k] != new[k]}
+            raise SystemExit(f"Routing mismatch for {q!r}: {diff}")
+    print(f"Routing decisions identical on {len(QUERIES)} queries.")
+
+    number = 2000
+    for name, fn in [("legacy chain", legacy_route), ("compiled router", compiled_route)]:
+        best = min(timeit.repeat(lambda: [fn(q) for q in QUERIES], number=number // 10, repeat=5))
+        per_query = best / (number // 10) / len(QUERIES) * 1e6
+        print(f"{name:>16}: {per_query:8.2f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: cold start of the numpy runtime (numpy_runtime.py) next to the
+sklearn stack app.py uses otherwise.
+
+Exports the runtime from the current models and knowledge base (as
+`python app.py export` does) to a temporary directory, then starts a fresh
+interpreter per runtime that imports it, loads the intent table and the
+knowledge base, and answers QUERIES. Prints the time from its first import
+to the last answer, peak RSS (Linux) and which heavy libraries ended up
+imported.
+
+    python bench_runtime.py
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUERIES = ["what is the admission process", "placement details for cse", "who is the principal",
+           "available branches", "hostel fees", "mechanicle department labs"]
+# As app.py loads them
+KB_SOURCES = ["college_data.txt", "handbooks"]
+KB_FUZZY_WEIGHT = 0.3
+HEAVY_MODULES = ["sklearn", "scipy", "pandas", "joblib"]
+
+CHILD_PROLOGUE = """
+import json, sys, time
+start = time.perf_counter()
+"""
+CHILD_EPILOGUE = """
+for q in QUERIES:
+    intent.guess(q)
+    kb.score(q).best()
+seconds = time.perf_counter() - start
+# VmHWM: peak RSS of this image (ru_maxrss would include the forking parent's)
+with open("/proc/self/status") as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+print(json.dumps({"seconds": seconds, "rss_mb": peak_kb / 1024, "modules": [m for m in HEAVY if m in sys.modules]}))
+"""
+SKLEARN_CHILD = """
+import joblib
+import train_intent
+import train_admission
+from artifacts import CONVERT, check_artifact, load_table
+from intent_table import compile_pipeline, table_from_dict
+from vector_store import CollegeKnowledgeBase
+if check_artifact(train_intent.MODEL_PATH)[0] == CONVERT:
+    intent = table_from_dict(load_table(train_intent.MODEL_PATH))
+else:
+    intent = compile_pipeline(joblib.load(train_intent.MODEL_PATH))
+kb = CollegeKnowledgeBase(KB_SOURCES, fuzzy_weight=KB_FUZZY_WEIGHT)
+"""
+NUMPY_CHILD = """
+import numpy_runtime
+runtime = numpy_runtime.load_runtime(RUNTIME_DIR)
+intent, kb = runtime.intent_table, runtime.kb
+"""
+
+
+def run_child(body, runtime_dir):
+    setup = (f"QUERIES = {QUERIES!r}\nKB_SOURCES = {KB_SOURCES!r}\nKB_FUZZY_WEIGHT = {KB_FUZZY_WEIGHT!r}\n"
+             f"HEAVY = {HEAVY_MODULES!r}\nRUNTIME_DIR = {runtime_dir!r}\n")
+    code = CHILD_PROLOGUE + setup + body + CHILD_EPILOGUE
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=BASE_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    import app # sklearn runtime: loads everything the export needs
+
+    runtime_dir = tempfile.mkdtemp()
+    try:
+        app.export_runtime(runtime_dir)
+        rows = []
+        for name, body in [("sklearn", SKLEARN_CHILD), ("numpy", NUMPY_CHILD)]:
+            # Second run: the OS file cache is warm for both
+            run_child(body, runtime_dir)
+            rows.append((name, run_child(body, runtime_dir)))
+    finally:
+        shutil.rmtree(runtime_dir, ignore_errors=True)
+
+    print(f"\n{'runtime':<8} {'to answers':>13} {'peak RSS':>10}  imported")
+    for name, r in rows:
+        print(f"{name:<8} {r['seconds'] * 1000:>11.0f}ms {r['rss_mb']:>8.1f}MB  {', '.join(r['modules']) or '-'}")
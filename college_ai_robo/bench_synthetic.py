@@ -0,0 +1,82 @@
+"""
+Benchmark: train_admission.generate_synthetic_data (column-wise, seeded)
+versus the old per-group iterrows() loop, at 10k, 100k and 1M positive rows.
+
+Positives are resampled from the real approval list with jittered ranks so
+the group structure (branches x genders x categories) stays realistic. The
+old loop is only timed up to LEGACY_MAX_ROWS; at 1M rows it takes minutes.
+
+    python bench_synthetic.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+import train_admission
+
+SIZES = [10_000, 100_000, 1_000_000]
+LEGACY_MAX_ROWS = 100_000
+SEED = 0
+
+
+def legacy_generate(df):
+    """The per-group loop generate_synthetic_data used to run."""
+    final_data = []
+    for (branch, gender, category), group in df.groupby(['Branch', 'Gender', 'Category']):
+        ranks = sorted(group['Rank'])
+        percentile_idx = int(len(ranks) * 0.85)
+        cutoff_rank = ranks[percentile_idx] if ranks else 0
+
+        valid_positives = group[group['Rank'] <= cutoff_rank]
+        for _, row in valid_positives.iterrows():
+            final_data.append(row.to_dict())
+
+        n_neg = len(valid_positives) + 5
+        start_rank = cutoff_rank + 100
+        end_rank = min(start_rank + 40000, 250000)
+        if start_rank >= end_rank:
+            start_rank = cutoff_rank + 50
+            end_rank = start_rank + 10000
+
+        fake_ranks = np.random.randint(start_rank, end_rank, size=n_neg)
+        for r in fake_ranks:
+            final_data.append({'Rank': r, 'Branch': branch, 'Gender': gender,
+                               'Category': category, 'Eligible': 0})
+    return pd.DataFrame(final_data)
+
+
+def make_positives(raw_df, n, rng):
+    sample = raw_df.iloc[rng.integers(0, len(raw_df), size=n)].reset_index(drop=True)
+    jitter = rng.integers(-2000, 2000, size=n)
+    sample['Rank'] = np.clip(sample['Rank'].to_numpy() + jitter, 2, 199999)
+    return sample
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    raw_df = train_admission.parse_data()
+    rng = np.random.default_rng(SEED)
+
+    print(f"{'positives':>10} {'output rows':>12} {'vectorized':>12} {'legacy':>12} {'speedup':>8}")
+    for n in SIZES:
+        positives = make_positives(raw_df, n, rng)
+
+        out, fast = timed(train_admission.generate_synthetic_data, positives, seed=SEED)
+        again = train_admission.generate_synthetic_data(positives, seed=SEED)
+        assert out.equals(again), "same seed must give the same data"
+
+        if n <= LEGACY_MAX_ROWS:
+            legacy, slow = timed(legacy_generate, positives)
+            assert len(legacy) == len(out)
+            assert (legacy['Eligible'].to_numpy() == out['Eligible'].to_numpy()).all()
+            legacy_col, speedup = f"{slow:.3f}s", f"{slow / fast:.0f}x"
+        else:
+            legacy_col, speedup = "skipped", "-"
+
+        print(f"{n:>10,} {len(out):>12,} {fast:>11.3f}s {legacy_col:>12} {speedup:>8}")
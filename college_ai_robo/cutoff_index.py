@@ -0,0 +1,59 @@
+import json
+import os
+from bisect import bisect_right
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Persisted next to admission_model.pkl so runtime never re-parses the
+# approval list. The file records the hash of the approval lists it was
+# built from (train_admission.data_hash), so a stale one can be detected.
+CUTOFF_INDEX_PATH = os.path.join(BASE_DIR, "admission_cutoffs.json")
+
+
+class CutoffIndex:
+    """
+    Admitted ranks from the convener approval list, one sorted list per
+    (Branch, Gender, Category). Answers are binary searches, so they take
+    microseconds and are facts from the list rather than model estimates.
+    """
+    def __init__(self, ranks, data_hash=None):
+        self.ranks = {key: sorted(values) for key, values in ranks.items()}
+        self.data_hash = data_hash
+
+    @classmethod
+    def from_frame(cls, df, data_hash=None):
+        """Builds the index from train_admission.parse_data() output."""
+        ranks = {}
+        if df is not None and not df.empty:
+            for branch, gender, category, rank in zip(df['Branch'], df['Gender'], df['Category'], df['Rank']):
+                ranks.setdefault((branch, gender, category), []).append(int(rank))
+        return cls(ranks, data_hash)
+
+    def group(self, branch, gender, category):
+        return self.ranks.get((branch, gender, category), [])
+
+    def last_admitted(self, branch, gender, category):
+        """Highest (worst) rank admitted for the group, or None."""
+        ranks = self.group(branch, gender, category)
+        return ranks[-1] if ranks else None
+
+    def admitted_worse_than(self, rank, branch, gender, category):
+        """How many students with a worse (higher) rank were admitted."""
+        ranks = self.group(branch, gender, category)
+        return len(ranks) - bisect_right(ranks, rank)
+
+    def save(self, path=CUTOFF_INDEX_PATH):
+        data = {"data_hash": self.data_hash,
+                "ranks": {"|".join(key): values for key, values in sorted(self.ranks.items())}}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=CUTOFF_INDEX_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls({}, data["data_hash"])
+        # Saved lists are already sorted.
+        index.ranks = {tuple(key.split("|")): values for key, values in data["ranks"].items()}
+        return index
@@ -1,7 +1,13 @@
-import pandas as pd
 import glob
+import hashlib
 import os
 import re
+import threading
+from collections import Counter
+
+# pandas is imported only where CSVs are parsed: the runtime snapshot and
+# PlacementAggregates.from_dict() do not need it (see numpy_runtime.py).
+# Without pandas a changed placement CSV keeps its previous summary.
 
 def clean_money_string(val):
     """
@@ -11,6 +17,7 @@ def clean_money_string(val):
       '50K PM' -> 50000 * 12 = 600000.0
       '4-6 LPA' -> 600000.0 (Taking max for highest/cutoff checks)
     """
+    import pandas as pd
     if pd.isna(val):
         return 0.0
     s = str(val).upper().replace(',', '').strip()
@@ -51,158 +58,176 @@ def clean_money_string(val):
     except:
         return 0.0
 
+def get_placement_files(base_dir):
+    """Placement CSVs are recognised by having "placement" in the file name."""
+    csv_files = glob.glob(os.path.join(base_dir, "*.csv"))
+    return [f for f in csv_files if "PLACEMENT" in os.path.basename(f).upper()]
+
+# Column identification keywords
+PLACEMENT_COLUMN_KEYWORDS = {
+    "Roll No": ["roll no", "rank", "ht no", "reg no"],
+    "Name": ["student name", "name of the student", "full name", "name of student"],
+    "Company": ["company", "name of the company", "company selected", "recruiter"],
+    "Branch": ["branch"],
+    "Package": ["package", "ctc", "salary"]
+}
+
+def load_placement_file(f):
+    """
+    Loads one placement CSV, skipping metadata rows to find the real header.
+    Returns the normalized DataFrame, or None if the file is not usable.
+    """
+    import pandas as pd
+    col_keywords = PLACEMENT_COLUMN_KEYWORDS
+    try:
+        filename = os.path.basename(f).upper()
+        
+        # Skip non-placement files (like the admission ones)
+        if "PLACEMENT" not in filename and "PLACEMENTS" not in filename:
+            # Heuristic: if it doesn't say placement, check content later? 
+            # For now, let's assume valid files have "placement" or we rely on content.
+            # The user said "5 files of placements data". Let's check matching filenames.
+            # Actually, the file list had: placement_AI.csv, placement_IT.csv etc.
+            if not filename.startswith("PLACEMENT"):
+                return None
+
+        print(f"Processing {filename}...")
+        
+        # 1. Read file as lines to find the header
+        with open(f, "r", encoding="utf-8-sig", errors="ignore") as file:
+            lines = file.readlines()
+        
+        header_index = -1
+        header_line = ""
+        
+        for i, line in enumerate(lines):
+            # Check if this line looks like a header
+            lower_line = line.lower()
+            # Must contain at least Roll No or Name AND Company
+            has_student = any(k in lower_line for k in col_keywords["Roll No"] + col_keywords["Name"])
+            has_company = any(k in lower_line for k in col_keywords["Company"])
+            
+            if has_student and has_company:
+                header_index = i
+                header_line = line
+                break
+        
+        if header_index == -1:
+            print(f"  Skipping {filename}: Could not find a valid header row.")
+            return None
+            
+        # 2. Read CSV starting from header_index
+        # We use the detected line to infer column names, but better to let pandas read it
+        try:
+            # Re-read using pandas skipping rows
+            df = pd.read_csv(f, skiprows=header_index, encoding="utf-8-sig")
+        except:
+            return None
+
+        # 3. Normalize Columns
+        renamed = {}
+        for col in df.columns:
+            c_lower = str(col).lower().strip()
+            for standard_name, keywords in col_keywords.items():
+                for kw in keywords:
+                    if kw in c_lower:
+                        renamed[col] = standard_name
+                        break
+                if col in renamed: break
+        
+        df.rename(columns=renamed, inplace=True)
+        
+        # 4. Standardize Branch
+        # If Branch column is missing, infer from filename
+        if "Branch" not in df.columns:
+            inferred_branch = "UNKNOWN"
+            if "_IT" in filename: inferred_branch = "IT"
+            elif "_AI_ML" in filename: inferred_branch = "AIML"
+            elif "_AI" in filename: inferred_branch = "AI" # Distinct from AIML?
+            elif "_DS" in filename: inferred_branch = "DS"
+            elif "_CIVIL" in filename: inferred_branch = "CIVIL"
+            elif "MECH" in filename: inferred_branch = "MECH"
+            elif "ECE" in filename: inferred_branch = "ECE"
+            elif "EEE" in filename: inferred_branch = "EEE"
+            elif "CSE" in filename: inferred_branch = "CSE"
+            
+            df["Branch"] = inferred_branch
+        else:
+            # Clean existing branch
+            df["Branch"] = df["Branch"].astype(str).str.upper().str.strip()
+            # Map complex names
+            branch_map = {
+                "CSE(AI)": "AI",
+                "CSE(AIML)": "AIML",
+                "CSE(DS)": "DS",
+                "CSE(AI&ML)": "AIML",
+                "CSM": "AIML",
+                "CSD": "DS",
+                "CSC": "CYBER",
+                "CAI": "AI"
+            }
+            df["Branch"] = df["Branch"].replace(branch_map)
+
+        # 5. Clean Company Name
+        if "Company" in df.columns:
+            df["Company"] = df["Company"].astype(str).str.strip()
+            # Remove quotes or extra spaces
+            df["Company"] = df["Company"].str.replace('"', '', regex=False)
+        
+        # 6. Clean Package if exists
+        if "Package" in df.columns:
+            df["Package_Val"] = df["Package"].apply(clean_money_string)
+        else:
+            df["Package_Val"] = 0.0
+
+        # 7. Drop summary rows (often at bottom)
+        # Check if "Roll No" or "Name" is valid
+        if "Roll No" in df.columns:
+            df = df[df["Roll No"].astype(str).str.len() > 5] # Valid Roll No usually long
+        elif "Name" in df.columns:
+            df = df[df["Name"].notna()]
+        
+        # Normalization Map for Data Loading
+        # This ensures keys in app.py (AI, AIML, DS) match values in DF
+        if 'Branch' in df.columns:
+            def norm_branch(b):
+                b = str(b).upper().strip()
+                if "CSE" in b and "AI" in b and "ML" in b: return "AIML"
+                if "AI" in b and "ML" in b: return "AIML"
+                if "CSE" in b and "AI" in b: return "AI" # CSE(AI) -> AI
+                if "CSE" in b and ("DS" in b or "DATA" in b): return "DS"
+                if "CSE" in b and "IT" in b: return "IT" # CSE(IT) -> IT? Maybe just IT
+                if "INFORMATION" in b: return "IT"
+                if "CIVIL" in b: return "CIVIL"
+                if "MECH" in b: return "MECH"
+                if "ECE" in b: return "ECE"
+                if "EEE" in b: return "EEE"
+                return b
+            
+            df['Branch'] = df['Branch'].apply(norm_branch)
+        
+        return df
+
+    except Exception as e:
+        print(f"Error processing {f}: {e}")
+        return None
+
 def load_placement_data(base_dir):
     """
     Loads all placement CSV files, skipping metadata rows to find the real header.
     Normalizes columns and returns a combined DataFrame.
     """
+    import pandas as pd
     csv_files = glob.glob(os.path.join(base_dir, "*.csv"))
     print(f"Found {len(csv_files)} files to scan for placement data.")
     
     dfs = []
-    
-    # Column identification keywords
-    col_keywords = {
-        "Roll No": ["roll no", "rank", "ht no", "reg no"],
-        "Name": ["student name", "name of the student", "full name", "name of student"],
-        "Company": ["company", "name of the company", "company selected", "recruiter"],
-        "Branch": ["branch"],
-        "Package": ["package", "ctc", "salary"]
-    }
 
     for f in csv_files:
-        try:
-            filename = os.path.basename(f).upper()
-            
-            # Skip non-placement files (like the admission ones)
-            if "PLACEMENT" not in filename and "PLACEMENTS" not in filename:
-                # Heuristic: if it doesn't say placement, check content later? 
-                # For now, let's assume valid files have "placement" or we rely on content.
-                # The user said "5 files of placements data". Let's check matching filenames.
-                # Actually, the file list had: placement_AI.csv, placement_IT.csv etc.
-                if not filename.startswith("PLACEMENT"):
-                    continue
-
-            print(f"Processing {filename}...")
-            
-            # 1. Read file as lines to find the header
-            with open(f, "r", encoding="utf-8-sig", errors="ignore") as file:
-                lines = file.readlines()
-            
-            header_index = -1
-            header_line = ""
-            
-            for i, line in enumerate(lines):
-                # Check if this line looks like a header
-                lower_line = line.lower()
-                # Must contain at least Roll No or Name AND Company
-                has_student = any(k in lower_line for k in col_keywords["Roll No"] + col_keywords["Name"])
-                has_company = any(k in lower_line for k in col_keywords["Company"])
-                
-                if has_student and has_company:
-                    header_index = i
-                    header_line = line
-                    break
-            
-            if header_index == -1:
-                print(f"  Skipping {filename}: Could not find a valid header row.")
-                continue
-                
-            # 2. Read CSV starting from header_index
-            # We use the detected line to infer column names, but better to let pandas read it
-            try:
-                # Re-read using pandas skipping rows
-                df = pd.read_csv(f, skiprows=header_index, encoding="utf-8-sig")
-            except:
-                continue
-
-            # 3. Normalize Columns
-            renamed = {}
-            for col in df.columns:
-                c_lower = str(col).lower().strip()
-                for standard_name, keywords in col_keywords.items():
-                    for kw in keywords:
-                        if kw in c_lower:
-                            renamed[col] = standard_name
-                            break
-                    if col in renamed: break
-            
-            df.rename(columns=renamed, inplace=True)
-            
-            # 4. Standardize Branch
-            # If Branch column is missing, infer from filename
-            if "Branch" not in df.columns:
-                inferred_branch = "UNKNOWN"
-                if "_IT" in filename: inferred_branch = "IT"
-                elif "_AI_ML" in filename: inferred_branch = "AIML"
-                elif "_AI" in filename: inferred_branch = "AI" # Distinct from AIML?
-                elif "_DS" in filename: inferred_branch = "DS"
-                elif "_CIVIL" in filename: inferred_branch = "CIVIL"
-                elif "MECH" in filename: inferred_branch = "MECH"
-                elif "ECE" in filename: inferred_branch = "ECE"
-                elif "EEE" in filename: inferred_branch = "EEE"
-                elif "CSE" in filename: inferred_branch = "CSE"
-                
-                df["Branch"] = inferred_branch
-            else:
-                # Clean existing branch
-                df["Branch"] = df["Branch"].astype(str).str.upper().str.strip()
-                # Map complex names
-                branch_map = {
-                    "CSE(AI)": "AI",
-                    "CSE(AIML)": "AIML",
-                    "CSE(DS)": "DS",
-                    "CSE(AI&ML)": "AIML",
-                    "CSM": "AIML",
-                    "CSD": "DS",
-                    "CSC": "CYBER",
-                    "CAI": "AI"
-                }
-                df["Branch"] = df["Branch"].replace(branch_map)
-
-            # 5. Clean Company Name
-            if "Company" in df.columns:
-                df["Company"] = df["Company"].astype(str).str.strip()
-                # Remove quotes or extra spaces
-                df["Company"] = df["Company"].str.replace('"', '', regex=False)
-            
-            # 6. Clean Package if exists
-            if "Package" in df.columns:
-                df["Package_Val"] = df["Package"].apply(clean_money_string)
-            else:
-                df["Package_Val"] = 0.0
-
-            # 7. Drop summary rows (often at bottom)
-            # Check if "Roll No" or "Name" is valid
-            if "Roll No" in df.columns:
-                df = df[df["Roll No"].astype(str).str.len() > 5] # Valid Roll No usually long
-            elif "Name" in df.columns:
-                df = df[df["Name"].notna()]
-            
-            # Normalization Map for Data Loading
-            # This ensures keys in app.py (AI, AIML, DS) match values in DF
-            if 'Branch' in df.columns:
-                def norm_branch(b):
-                    b = str(b).upper().strip()
-                    if "CSE" in b and "AI" in b and "ML" in b: return "AIML"
-                    if "AI" in b and "ML" in b: return "AIML"
-                    if "CSE" in b and "AI" in b: return "AI" # CSE(AI) -> AI
-                    if "CSE" in b and ("DS" in b or "DATA" in b): return "DS"
-                    if "CSE" in b and "IT" in b: return "IT" # CSE(IT) -> IT? Maybe just IT
-                    if "INFORMATION" in b: return "IT"
-                    if "CIVIL" in b: return "CIVIL"
-                    if "MECH" in b: return "MECH"
-                    if "ECE" in b: return "ECE"
-                    if "EEE" in b: return "EEE"
-                    return b
-                
-                df['Branch'] = df['Branch'].apply(norm_branch)
-            
+        df = load_placement_file(f)
+        if df is not None:
             dfs.append(df)
 
-        except Exception as e:
-            print(f"Error processing {f}: {e}")
-
     if not dfs:
         return pd.DataFrame()
         
@@ -210,6 +235,206 @@ def load_placement_data(base_dir):
     print(f"Total Placement Records: {len(final_df)}")
     return final_df
 
+ALL_BRANCHES = "ALL"
+
+def split_companies(value):
+    """Splits a Company cell ("TCS, Infosys; Wipro") into cleaned names."""
+    names = []
+    for sub_c in str(value).replace(',', ';').split(';'):
+        clean_c = sub_c.strip().title()
+        if clean_c and clean_c.lower() != 'nan' and len(clean_c) > 2:
+            names.append(clean_c)
+    return names
+
+def summarize_placement_frame(df):
+    """
+    Reduces one file's placement rows to mergeable per-branch partials:
+    row count, package sum/count/max (packages > 0 only) and company counts
+    in first-seen order. The ALL_BRANCHES entry covers every row.
+    """
+    partials = {}
+
+    def add(key, package, companies):
+        p = partials.setdefault(key, {"count": 0, "pkg_sum": 0.0, "pkg_n": 0, "pkg_max": 0.0, "companies": {}})
+        p["count"] += 1
+        if package > 0:
+            p["pkg_sum"] += package
+            p["pkg_n"] += 1
+            p["pkg_max"] = max(p["pkg_max"], package)
+        for c in companies:
+            p["companies"][c] = p["companies"].get(c, 0) + 1
+
+    if df is None or df.empty:
+        return partials
+
+    branches = df["Branch"].astype(str).tolist() if "Branch" in df.columns else [None] * len(df)
+    packages = df["Package_Val"].tolist() if "Package_Val" in df.columns else [0.0] * len(df)
+    company_cells = df["Company"].astype(str).tolist() if "Company" in df.columns else [""] * len(df)
+
+    for branch, package, cell in zip(branches, packages, company_cells):
+        package = float(package) if package == package else 0.0 # NaN -> 0
+        companies = split_companies(cell)
+        add(ALL_BRANCHES, package, companies)
+        if branch is not None:
+            add(branch, package, companies)
+    return partials
+
+def hash_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class PlacementAggregates:
+    """
+    Precomputed placement statistics per branch (and ALL_BRANCHES):
+    count, highest and average package (in Rupees) and companies ranked by
+    number of placements. Partials are kept per source file so a single
+    changed CSV can be re-summarized without reloading the others.
+    """
+    def __init__(self):
+        # file name -> {"hash": sha256 of the CSV, "partials": {...}} in load order.
+        # Keyed by name and content, so a snapshot built on another machine
+        # still matches the files it was built from.
+        self.files = {}
+        self.stale = set() # file names whose partials no longer match the file
+        self._mtimes = {} # file name -> mtime when last hashed, to skip unchanged files
+        self.table = {}
+        # Held by everything that changes self.files (and so by _merge(),
+        # which iterates it); readers only take self.table.
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_files(cls, files):
+        agg = cls()
+        for f in files:
+            agg._summarize_file(f)
+        agg._merge()
+        return agg
+
+    def _summarize_file(self, path, digest=None):
+        """
+        (Re-)summarizes one CSV. Without pandas the file cannot be parsed:
+        its previous partials are kept (and marked stale). Returns whether
+        the partials changed.
+        """
+        name = os.path.basename(path)
+        if digest is None and os.path.exists(path):
+            digest = hash_file(path)
+        try:
+            df = load_placement_file(path) if digest else None
+        except ImportError as e:
+            print(f"Cannot read {name} ({e}); keeping its previous placement summary.")
+            self.stale.add(name)
+            return False
+        self.files[name] = {"hash": digest, "partials": summarize_placement_frame(df)}
+        self.stale.discard(name)
+        return True
+
+    def _merge(self):
+        merged = {}
+        # Files are merged in load order so company ties rank exactly as
+        # they would in the concatenated DataFrame.
+        for entry in self.files.values():
+            for branch, p in entry["partials"].items():
+                m = merged.setdefault(branch, {"count": 0, "pkg_sum": 0.0, "pkg_n": 0, "pkg_max": 0.0, "companies": Counter()})
+                m["count"] += p["count"]
+                m["pkg_sum"] += p["pkg_sum"]
+                m["pkg_n"] += p["pkg_n"]
+                m["pkg_max"] = max(m["pkg_max"], p["pkg_max"])
+                m["companies"].update(p["companies"])
+
+        table = {}
+        for branch, m in merged.items():
+            table[branch] = {
+                "count": m["count"],
+                "highest": m["pkg_max"],
+                "average": m["pkg_sum"] / m["pkg_n"] if m["pkg_n"] else 0.0,
+                "companies": [c for c, _ in m["companies"].most_common()],
+            }
+        # Single reference assignment: readers never see a half-merged table.
+        self.table = table
+
+    def update_file(self, path):
+        """Re-summarizes one placement CSV and refreshes the merged table."""
+        with self._lock:
+            print(f"Updating placement aggregates for {os.path.basename(path)}...")
+            if self._summarize_file(path):
+                self._merge()
+
+    def remove_file(self, path):
+        with self._lock:
+            name = os.path.basename(path)
+            self.stale.discard(name)
+            self._mtimes.pop(name, None)
+            if self.files.pop(name, None) is not None:
+                self._merge()
+
+    def refresh(self, files):
+        """Applies incremental updates for added, changed or removed files."""
+        with self._lock:
+            changed = False
+            paths = {os.path.basename(path): path for path in files}
+            for name in list(self.files):
+                if name not in paths:
+                    del self.files[name]
+                    self.stale.discard(name)
+                    self._mtimes.pop(name, None)
+                    changed = True
+            for name, path in paths.items():
+                mtime = os.path.getmtime(path) if os.path.exists(path) else None
+                if name in self._mtimes and self._mtimes[name] == mtime:
+                    continue
+                # A new mtime (or a snapshot's first check) is only a change
+                # when the contents differ
+                self._mtimes[name] = mtime
+                digest = hash_file(path) if mtime is not None else None
+                entry = self.files.get(name)
+                if entry is not None and entry["hash"] == digest:
+                    continue
+                print(f"Updating placement aggregates for {name}...")
+                changed = self._summarize_file(path, digest) or changed
+            if changed:
+                self._merge()
+            return changed
+
+    def get(self, branch):
+        return self.table.get(branch)
+
+    def overall(self):
+        return self.table.get(ALL_BRANCHES)
+
+    def to_dict(self):
+        with self._lock:
+            return {name: {"hash": e["hash"], "partials": e["partials"]} for name, e in self.files.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        agg = cls()
+        agg.files = {name: {"hash": e["hash"], "partials": e["partials"]} for name, e in data.items()}
+        agg._merge()
+        return agg
+
+def load_people_data(base_dir):
+    """
+    Parses people_data.txt ("Role: Name" lines) into a two-way lookup dict:
+    role -> name and name -> role, both keys lowercased.
+    """
+    people_file = os.path.join(base_dir, "people_data.txt")
+    people = {}
+    if os.path.exists(people_file):
+        with open(people_file, "r", encoding="utf-8") as f:
+            for line in f:
+                 if ":" in line:
+                     parts = line.split(":", 1)
+                     role = parts[0].strip().lower()
+                     name = parts[1].strip()
+                     # Store both ways for lookup
+                     people[role] = name
+                     people[name.lower()] = role
+    return people
+
 if __name__ == "__main__":
     df = load_placement_data(os.path.dirname(os.path.abspath(__file__)))
     print(df.head())
@@ -0,0 +1,95 @@
+"""
+Evaluation: TF-IDF cosine versus BM25 scoring for CollegeKnowledgeBase,
+on the labeled queries in kb_eval_queries.csv (expected section title, or
+empty when the handbook has no answer and the fallback should be used).
+
+For each backend prints
+  - top-1: the best chunk is the labeled section (answerable queries only)
+  - accuracy at the backend's default threshold: right section above it,
+    or nothing above it for unanswerable queries
+  - the best accuracy any single threshold reaches on this set, and the
+    range of thresholds that reach it (wider = less tuning needed)
+  - per-query search latency and the size of the arrays the backend scores
+    from (TF-IDF matrix, BM25 postings, or the float16 LSA vectors)
+
+    python eval_kb_backends.py
+"""
+import csv
+import os
+import time
+
+import numpy as np
+
+from vector_store import DEFAULT_THRESHOLDS, SCORING_BACKENDS, CollegeKnowledgeBase
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EVAL_FILE = os.path.join(BASE_DIR, "kb_eval_queries.csv")
+SWEEP = np.round(np.arange(0.02, 1.0, 0.02), 2)
+REPEAT = 50
+
+
+def load_labeled(path=EVAL_FILE):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [(row["query"], row["expected"] or None) for row in csv.DictReader(f)]
+
+
+def best_match(kb, query):
+    """(section title, score) of the top chunk, ignoring any threshold."""
+    index = kb._index
+    fuzzy_vec = kb._fuzzy_vectors(index, [query])[0]
+    ids, scores = kb._scores(index, index.vectorizer.transform([query]), 0.0, fuzzy_vec)
+    if len(ids) == 0:
+        return None, 0.0
+    best = np.argmax(scores)
+    return index.metadata[ids[best]]["title"], float(scores[best])
+
+
+def accuracy(matches, labeled, threshold):
+    right = 0
+    for (title, score), (_, expected) in zip(matches, labeled):
+        answered = title if score >= threshold else None
+        right += answered == expected
+    return right / len(labeled)
+
+
+def index_bytes(kb):
+    index = kb._index
+    if kb.scoring == "lsa":
+        term_vectors, vectors = kb._lsa(index)
+        return term_vectors.nbytes + vectors.nbytes
+    matrix = index.bm25()[1] if kb.scoring == "bm25" else index.tfidf_matrix
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+
+def per_query_ms(kb, queries):
+    kb.search(queries[0])
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for q in queries:
+            kb.search(q)
+    return (time.perf_counter() - start) * 1e3 / (REPEAT * len(queries))
+
+
+if __name__ == "__main__":
+    labeled = load_labeled()
+    queries = [q for q, _ in labeled]
+    answerable = [i for i, (_, expected) in enumerate(labeled) if expected]
+    print(f"{len(labeled)} labeled queries ({len(answerable)} answerable)\n")
+    print(f"{'backend':<8} {'top-1':>6} {'default':>14} {'best':>20} {'latency':>9} {'memory':>9}")
+
+    for scoring in SCORING_BACKENDS:
+        kb = CollegeKnowledgeBase(cache_dir=None, scoring=scoring)
+        matches = [best_match(kb, q) for q in queries]
+        top1 = np.mean([matches[i][0] == labeled[i][1] for i in answerable])
+        default = DEFAULT_THRESHOLDS[scoring]
+        sweep = [accuracy(matches, labeled, t) for t in SWEEP]
+        best = max(sweep)
+        plateau = SWEEP[[i for i, acc in enumerate(sweep) if acc == best]]
+        print(f"{scoring:<8} {top1:>6.0%} {accuracy(matches, labeled, default):>6.0%} @ {default:<5} "
+              f"{best:>6.0%} @ {plateau.min():.2f}-{plateau.max():.2f} {per_query_ms(kb, queries):>7.3f}ms "
+              f"{index_bytes(kb) / 1024:>7.1f}KB")
+
+        for (query, expected), (title, score) in zip(labeled, matches):
+            answered = title if score >= default else None
+            if answered != expected:
+                print(f"    miss: {query!r} -> {answered or '-'} ({score:.2f}), expected {expected or '-'}")
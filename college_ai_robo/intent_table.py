@@ -0,0 +1,249 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+
+# The top intent for a message and how sure the model is about it.
+#   confidence  probability of intent (MultinomialNB.predict_proba)
+#   runner_up   second most likely intent (None with a single class)
+#   margin      confidence minus the runner-up's probability
+#   evidence    n-grams of the message the vectorizer knows; 0 means the
+#               prediction is the class priors alone
+IntentGuess = namedtuple("IntentGuess", ["intent", "confidence", "runner_up", "margin", "evidence"])
+
+
+def _check_params(vectorizer, extra):
+    # Only the settings train_intent.py uses are compiled; anything else
+    # would need its own preprocessing here.
+    params = vectorizer.get_params()
+    expected = {"analyzer": "word", "lowercase": True, "preprocessor": None,
+                "tokenizer": None, "stop_words": None, "strip_accents": None,
+                "binary": False, "norm": "l2", **extra}
+    unsupported = {k: params[k] for k, v in expected.items() if params[k] != v}
+    if unsupported:
+        raise ValueError(f"Unsupported intent vectorizer settings: {unsupported}")
+    return params
+
+
+def compile_pipeline(pipeline):
+    """IntentTable for a TF-IDF pipeline, HashedIntentTable for a hashed one."""
+    if hasattr(pipeline.steps[0][1], "n_features"):
+        return HashedIntentTable.from_pipeline(pipeline)
+    return IntentTable.from_pipeline(pipeline)
+
+
+def table_from_dict(data):
+    """Inverse of to_dict() for either table type."""
+    if "n_features" in data:
+        return HashedIntentTable.from_dict(data)
+    return IntentTable.from_dict(data)
+
+
+def _murmur_block(k):
+    k = (k * 0xCC9E2D51) & 0xFFFFFFFF
+    k = ((k << 15) | (k >> 17)) & 0xFFFFFFFF
+    return (k * 0x1B873593) & 0xFFFFFFFF
+
+
+def murmurhash3_32(key, seed=0):
+    """
+    32-bit MurmurHash3 (x86) of the utf-8 encoded key, as a signed int:
+    sklearn.utils.murmurhash3_32(key, seed) without importing sklearn.
+    """
+    data = key.encode("utf-8")
+    h = seed & 0xFFFFFFFF
+    end = len(data) & ~3
+    for i in range(0, end, 4):
+        h ^= _murmur_block(int.from_bytes(data[i:i + 4], "little"))
+        h = ((h << 13) | (h >> 19)) & 0xFFFFFFFF
+        h = (h * 5 + 0xE6546B64) & 0xFFFFFFFF
+    if end < len(data):
+        h ^= _murmur_block(int.from_bytes(data[end:], "little"))
+    h ^= len(data)
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    h ^= h >> 16
+    return h - (1 << 32) if h & 0x80000000 else h
+
+
+def _softmax(jll):
+    proba = np.exp(jll - jll.max())
+    return proba / proba.sum()
+
+
+class IntentTable:
+    """
+    The fitted intent pipeline (TfidfVectorizer(ngram_range=(1, 2)) +
+    MultinomialNB) compiled into plain tables.
+
+    The vectorizer becomes its token pattern, an n-gram -> column dict and
+    the idf array; the classifier becomes per-class log priors and the
+    per-column log-probabilities. A prediction tokenizes the message, counts
+    the known n-grams, l2-normalizes tf * idf and sums
+        class_log_prior + sum_j x_j * feature_log_prob[:, j]
+    over those few columns, exactly what the pipeline computes without
+    building a sparse matrix or validating input.
+    N-grams the vectorizer never saw are dropped, as in transform().
+    """
+    def __init__(self, token_pattern, ngram_range, vocabulary, idf, classes,
+                 class_log_prior, feature_log_prob):
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.vocabulary = vocabulary # n-gram -> column
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.classes = list(classes)
+        self.class_log_prior = np.asarray(class_log_prior, dtype=np.float64)
+        # Column-major so a message only gathers the rows it uses.
+        self.log_prob = np.ascontiguousarray(np.asarray(feature_log_prob, dtype=np.float64).T)
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        vectorizer = pipeline.steps[0][1]
+        nb = pipeline.steps[-1][1]
+
+        params = _check_params(vectorizer, {"use_idf": True, "sublinear_tf": False})
+        vocabulary = {str(ngram): int(col) for ngram, col in vectorizer.vocabulary_.items()}
+        return cls(params["token_pattern"], params["ngram_range"], vocabulary, vectorizer.idf_,
+                   [str(c) for c in nb.classes_], nb.class_log_prior_, nb.feature_log_prob_)
+
+    def _ngrams(self, message):
+        tokens = self._token_re.findall(message.lower())
+        low, high = self.ngram_range
+        if low == 1:
+            yield from tokens
+            low = 2
+        for n in range(low, min(high, len(tokens)) + 1):
+            for i in range(len(tokens) - n + 1):
+                yield " ".join(tokens[i:i + n])
+
+    def _vector(self, message):
+        """(columns, tf-idf weights, n-gram count) of the known n-grams, l2-normalized."""
+        counts = {}
+        for ngram in self._ngrams(message):
+            col = self.vocabulary.get(ngram)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        if not counts:
+            return None, None, 0
+        cols = np.fromiter(sorted(counts), dtype=np.intp, count=len(counts))
+        known = np.array([counts[c] for c in cols], dtype=np.float64)
+        weights = known * self.idf[cols]
+        return cols, weights / np.sqrt(np.dot(weights, weights)), int(known.sum())
+
+    def _joint_log_likelihood(self, cols, weights):
+        if cols is None:
+            return self.class_log_prior.copy()
+        return weights @ self.log_prob[cols] + self.class_log_prior
+
+    def scores(self, message):
+        """Joint log-likelihood per class, in self.classes order."""
+        cols, weights, _ = self._vector(message)
+        return self._joint_log_likelihood(cols, weights)
+
+    def predict(self, message):
+        return self.classes[int(np.argmax(self.scores(message)))]
+
+    def predict_many(self, messages):
+        return [self.predict(m) for m in messages]
+
+    def predict_proba(self, message):
+        """Class probabilities, in self.classes order."""
+        return _softmax(self.scores(message))
+
+    def guess(self, message):
+        """IntentGuess for the message; guess().intent == predict()."""
+        cols, weights, evidence = self._vector(message)
+        jll = self._joint_log_likelihood(cols, weights)
+        proba = _softmax(jll)
+        # Stable sort: ties go to the first class, as with argmax.
+        order = np.argsort(-jll, kind="stable")
+        best = float(proba[order[0]])
+        if len(order) < 2:
+            return IntentGuess(self.classes[order[0]], best, None, best, evidence)
+        second = float(proba[order[1]])
+        return IntentGuess(self.classes[order[0]], best, self.classes[order[1]], best - second, evidence)
+
+    def guess_many(self, messages):
+        return [self.guess(m) for m in messages]
+
+    def to_dict(self):
+        return {"token_pattern": self.token_pattern,
+                "ngram_range": list(self.ngram_range),
+                "vocabulary": self.vocabulary,
+                "idf": self.idf.tolist(),
+                "classes": self.classes,
+                "class_log_prior": self.class_log_prior.tolist(),
+                "feature_log_prob": self.log_prob.T.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["token_pattern"], data["ngram_range"], data["vocabulary"], data["idf"],
+                   data["classes"], data["class_log_prior"], data["feature_log_prob"])
+
+
+class HashedIntentTable(IntentTable):
+    """
+    IntentTable for the online model (HashingVectorizer(alternate_sign=False)
+    + MultinomialNB updated with partial_fit).
+
+    Each n-gram hashes to a column (murmurhash3, as HashingVectorizer does)
+    and every n-gram counts towards the l2 norm, seen in training or not.
+    Only columns with training counts get their own log-probability row;
+    the others all share the smoothed row of an empty column, which is
+    kept last. vocabulary maps hashed column -> row, and evidence counts
+    the n-grams landing on a trained column.
+    """
+    def __init__(self, token_pattern, ngram_range, n_features, vocabulary, classes,
+                 class_log_prior, feature_log_prob):
+        vocabulary = {int(col): row for col, row in vocabulary.items()}
+        super().__init__(token_pattern, ngram_range, vocabulary, np.ones(len(feature_log_prob[0])),
+                         classes, class_log_prior, feature_log_prob)
+        self.n_features = int(n_features)
+        self.unseen_row = len(self.log_prob) - 1
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        vectorizer = pipeline.steps[0][1]
+        nb = pipeline.steps[-1][1]
+        params = _check_params(vectorizer, {"alternate_sign": False})
+
+        trained = np.flatnonzero(nb.feature_count_.sum(axis=0))
+        empty = np.setdiff1d(np.arange(params["n_features"]), trained)
+        if len(empty) == 0:
+            raise ValueError("Every hashed column has counts; raise n_features")
+        rows = np.append(trained, empty[0])
+        vocabulary = {int(col): row for row, col in enumerate(trained)}
+        return cls(params["token_pattern"], params["ngram_range"], params["n_features"], vocabulary,
+                   [str(c) for c in nb.classes_], nb.class_log_prior_, nb.feature_log_prob_[:, rows])
+
+    def _column(self, ngram):
+        # abs(-2**31) % n_features, as HashingVectorizer defines it
+        return abs(murmurhash3_32(ngram, seed=0)) % self.n_features
+
+    def _vector(self, message):
+        counts = {}
+        for ngram in self._ngrams(message):
+            col = self._column(ngram)
+            counts[col] = counts.get(col, 0) + 1
+        if not counts:
+            return None, None, 0
+        cols = sorted(counts)
+        tf = np.array([counts[c] for c in cols], dtype=np.float64)
+        rows = np.array([self.vocabulary.get(c, self.unseen_row) for c in cols], dtype=np.intp)
+        evidence = sum(counts[c] for c in cols if c in self.vocabulary)
+        return rows, tf / np.sqrt(np.dot(tf, tf)), evidence
+
+    def to_dict(self):
+        data = super().to_dict()
+        del data["idf"]
+        data["n_features"] = self.n_features
+        data["vocabulary"] = {str(col): row for col, row in self.vocabulary.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["token_pattern"], data["ngram_range"], data["n_features"], data["vocabulary"],
+                   data["classes"], data["class_log_prior"], data["feature_log_prob"])
@@ -0,0 +1,64 @@
+import glob
+import hashlib
+import os
+
+# Which handbook files a knowledge base reads and the cache key of their
+# contents. Only the standard library, so the numpy runtime can tell
+# whether its export still matches the handbooks on disk.
+
+# Handbook sources: files, or directories whose handbook files are all loaded.
+HANDBOOK_EXTENSIONS = (".txt", ".md")
+
+
+def resolve_sources(base_dir, sources, warn=True):
+    """Handbook file paths for a file/directory (or a list of them), in load order."""
+    if isinstance(sources, str):
+        sources = [sources]
+    files = []
+    for source in sources:
+        path = os.path.join(base_dir, source)
+        if os.path.isdir(path):
+            found = [f for f in glob.glob(os.path.join(path, "*")) if f.lower().endswith(HANDBOOK_EXTENSIONS)]
+            files.extend(sorted(found))
+        elif os.path.exists(path):
+            files.append(path)
+        elif warn:
+            print(f"Warning: Knowledge base file not found at {path}")
+    return files
+
+
+def source_name(base_dir, path):
+    rel = os.path.relpath(path, base_dir)
+    return path if rel.startswith("..") else rel.replace(os.sep, "/")
+
+
+def read_sources(base_dir, sources, warn=True):
+    """[(source name, text)] for every handbook file, in load order."""
+    texts = []
+    for path in resolve_sources(base_dir, sources, warn):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append((source_name(base_dir, path), f.read()))
+    return texts
+
+
+def file_key(settings_digest, source, text):
+    """Hash of one handbook's name, text and everything that shapes its chunks."""
+    h = hashlib.sha256()
+    h.update(settings_digest.encode("utf-8"))
+    h.update(source.encode("utf-8") + b"\0")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def corpus_key(settings_digest, file_keys):
+    h = hashlib.sha256()
+    h.update(settings_digest.encode("utf-8"))
+    h.update("\n".join(file_keys).encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def cache_key(base_dir, sources, settings_digest, texts=None):
+    """The corpus key CollegeKnowledgeBase gives a build of these sources."""
+    if texts is None:
+        texts = read_sources(base_dir, sources)
+    return corpus_key(settings_digest, [file_key(settings_digest, name, text) for name, text in texts])
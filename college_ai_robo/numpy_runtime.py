@@ -0,0 +1,280 @@
+import json
+import os
+import re
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import kb_sources
+from admission_table import AdmissionTable
+from cutoff_index import CutoffIndex
+from intent_table import table_from_dict
+from search_results import SearchResult, add_channel, score_terms
+
+# Inference without sklearn, scipy or pandas: everything respond() scores
+# with, exported once to plain files (see app.export_runtime()) and served
+# with numpy and the compiled tables. Layout of RUNTIME_DIR:
+#   manifest.json    version, build time, manifests of the exported models,
+#                    knowledge-base cache key plus the handbook sources and
+#                    settings digest it was computed from (written last)
+#   intent.json      IntentTable / HashedIntentTable.to_dict()
+#   admission.json   AdmissionTable.to_dict()
+#   cutoffs.json     CutoffIndex (same format as admission_cutoffs.json)
+#   kb.json          chunks, metadata, vocabulary, stop words and search
+#                    settings (CollegeKnowledgeBase.export_search_state())
+#   kb.npz           idf and term -> chunk postings, plus the fuzzy
+#                    channel's character n-gram idf and postings
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNTIME_DIR = os.path.join(BASE_DIR, "runtime_model")
+RUNTIME_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+Runtime = namedtuple("Runtime", ["intent_table", "admission_table", "cutoff_index", "kb", "manifest"])
+Postings = namedtuple("Postings", ["data", "indices", "indptr"])
+
+
+def manifest_path(runtime_dir=RUNTIME_DIR):
+    return os.path.join(runtime_dir, MANIFEST_NAME)
+
+
+def _write_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def export_runtime(runtime_dir, intent_table, admission_table, kb, cutoff_index=None, sources=None):
+    """
+    Writes the runtime files for the given compiled tables and knowledge
+    base (a CollegeKnowledgeBase). sources is recorded in the manifest.
+    Returns the manifest.
+    """
+    os.makedirs(runtime_dir, exist_ok=True)
+    # Drop the manifest first so a crash mid-write never leaves a
+    # manifest pointing at a mix of old and new files.
+    if os.path.exists(manifest_path(runtime_dir)):
+        os.remove(manifest_path(runtime_dir))
+
+    settings, arrays = kb.export_search_state()
+    _write_json(os.path.join(runtime_dir, "intent.json"), intent_table.to_dict())
+    _write_json(os.path.join(runtime_dir, "admission.json"), admission_table.to_dict())
+    if cutoff_index is not None:
+        cutoff_index.save(os.path.join(runtime_dir, "cutoffs.json"))
+    _write_json(os.path.join(runtime_dir, "kb.json"), settings)
+    with open(os.path.join(runtime_dir, "kb.npz.tmp"), "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(os.path.join(runtime_dir, "kb.npz.tmp"), os.path.join(runtime_dir, "kb.npz"))
+
+    manifest = {
+        "version": RUNTIME_VERSION,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "kb_cache_key": settings.get("cache_key"),
+        "kb_sources": settings.get("sources"),
+        "kb_settings_digest": settings.get("settings_digest"),
+        "chunks": len(settings["chunks"]),
+        "cutoffs": cutoff_index is not None,
+        "sources": sources or {},
+    }
+    _write_json(manifest_path(runtime_dir), manifest)
+    return manifest
+
+
+def read_manifest(runtime_dir=RUNTIME_DIR):
+    """The export's manifest, or None if missing, unreadable or of another version."""
+    try:
+        manifest = _read_json(manifest_path(runtime_dir))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != RUNTIME_VERSION:
+        return None
+    return manifest
+
+
+def check_sources(manifest, base_dir=BASE_DIR):
+    """
+    True when the handbooks on disk still give the export's kb_cache_key,
+    False when they changed since, None when it cannot be told (an export
+    without sources, or no handbooks on this machine).
+    """
+    sources, digest = manifest.get("kb_sources"), manifest.get("kb_settings_digest")
+    if sources is None or digest is None:
+        return None
+    texts = kb_sources.read_sources(base_dir, sources, warn=False)
+    if not texts:
+        return None
+    return kb_sources.cache_key(base_dir, sources, digest, texts) == manifest.get("kb_cache_key")
+
+
+def load_runtime(runtime_dir=RUNTIME_DIR):
+    """Runtime loaded from runtime_dir, or None when there is no complete export."""
+    manifest = read_manifest(runtime_dir)
+    if manifest is None:
+        return None
+    start = time.perf_counter()
+    if check_sources(manifest) is False:
+        # Still served: stale answers beat none. A new export fixes it.
+        print("Warning: the handbooks changed since the numpy runtime was exported; its knowledge base "
+              "answers from the old text. Run `python app.py export` again.")
+    intent_table = table_from_dict(_read_json(os.path.join(runtime_dir, "intent.json")))
+    admission_table = AdmissionTable.from_dict(_read_json(os.path.join(runtime_dir, "admission.json")))
+    cutoff_index = None
+    if manifest["cutoffs"]:
+        cutoff_index = CutoffIndex.load(os.path.join(runtime_dir, "cutoffs.json"))
+    with np.load(os.path.join(runtime_dir, "kb.npz")) as arrays:
+        kb = RuntimeKnowledgeBase(_read_json(os.path.join(runtime_dir, "kb.json")), dict(arrays))
+    print(f"Numpy runtime loaded in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    return Runtime(intent_table, admission_table, cutoff_index, kb, manifest)
+
+
+class RuntimeKnowledgeBase:
+    """
+    Knowledge-base search over an exported "tfidf" build with numpy alone.
+
+    The query is tokenized like TfidfVectorizer (token pattern, lowercase,
+    stop words), its known terms weighted by idf, l2-normalized and scored
+    against the chunk postings; words the vocabulary does not know go
+    through the same fuzzy channel as CollegeKnowledgeBase. Scores match
+    CollegeKnowledgeBase.score() to float rounding. The build is fixed: a
+    new export replaces it on the next start (there is no hot reload).
+    """
+    def __init__(self, settings, arrays):
+        self.cache_key = settings.get("cache_key")
+        self.chunks = settings["chunks"]
+        self.metadata = settings["metadata"]
+        self.threshold = settings["threshold"]
+        self.fuzzy_weight = settings["fuzzy_weight"]
+        self.fuzzy_min_similarity = settings["fuzzy_min_similarity"]
+        self._empty = not self.chunks or "idf" not in arrays
+        if self._empty:
+            return
+
+        self.vocabulary = settings["vocabulary"]
+        self.stop_words = frozenset(settings["stop_words"])
+        self._token_re = re.compile(settings["token_pattern"])
+        self.idf = arrays["idf"]
+        self.postings = Postings(arrays["postings_data"], arrays["postings_indices"], arrays["postings_indptr"])
+        if self.fuzzy_weight:
+            self.char_ngram_range = tuple(settings["char_ngram_range"])
+            self.char_vocabulary = settings["char_vocabulary"]
+            self.char_idf = arrays["char_idf"]
+            self.term_postings = Postings(arrays["term_postings_data"], arrays["term_postings_indices"],
+                                          arrays["term_postings_indptr"])
+
+    def is_empty(self):
+        return self._empty
+
+    def _words(self, text):
+        return [w for w in self._token_re.findall(text.lower()) if w not in self.stop_words]
+
+    def _char_ngrams(self, word):
+        # analyzer="char_wb" on one token: n-grams of the word padded with spaces
+        low, high = self.char_ngram_range
+        word = " " + word + " "
+        grams = []
+        for n in range(low, high + 1):
+            offset = 0
+            grams.append(word[offset:offset + n])
+            while offset + n < len(word):
+                offset += 1
+                grams.append(word[offset:offset + n])
+            if offset == 0: # a word shorter than n counts once
+                break
+        return grams
+
+    @staticmethod
+    def _weigh(counts, idf):
+        """(columns ascending, unit-length count * idf weights) of a column -> count dict."""
+        cols = np.array(sorted(counts))
+        weights = np.array([counts[c] for c in cols]) * idf[cols]
+        return cols, weights / np.linalg.norm(weights)
+
+    def _scores(self, words):
+        counts = {}
+        for word in words:
+            col = self.vocabulary.get(word)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return score_terms(self.postings, *self._weigh(counts, self.idf))
+
+    def _fuzzy_vectors(self, words):
+        """CollegeKnowledgeBase._fuzzy_vectors() for already tokenized queries."""
+        rows = [None] * len(words)
+        if not self.fuzzy_weight:
+            return rows
+        unknown = [[word for word in query_words if word not in self.vocabulary] for query_words in words]
+        nearest = {}
+        for word in {word for query_words in unknown for word in query_words}:
+            counts = {}
+            for gram in self._char_ngrams(word):
+                col = self.char_vocabulary.get(gram)
+                if col is not None:
+                    counts[col] = counts.get(col, 0) + 1
+            if not counts:
+                continue
+            terms, similarity = score_terms(self.term_postings, *self._weigh(counts, self.char_idf))
+            best = np.argmax(similarity)
+            if similarity[best] >= self.fuzzy_min_similarity:
+                nearest[word] = (terms[best], similarity[best])
+
+        for i, query_words in enumerate(unknown):
+            weights = {}
+            for word in query_words:
+                if word in nearest:
+                    term, similarity = nearest[word]
+                    weights[term] = weights.get(term, 0.0) + similarity
+            if weights:
+                terms = np.array(sorted(weights))
+                rows[i] = (terms, np.array([weights[t] for t in terms]))
+        return rows
+
+    def _score_queries(self, queries):
+        if self._empty or not queries:
+            none = np.zeros(0, dtype=np.int64)
+            return [SearchResult(q, self, none, np.zeros(0), self.threshold) for q in queries]
+        words = [self._words(q) for q in queries]
+        results = []
+        for query, query_words, fuzzy_vec in zip(queries, words, self._fuzzy_vectors(words)):
+            ids, scores = self._scores(query_words)
+            if fuzzy_vec is not None:
+                terms, weights = fuzzy_vec
+                weights = weights * self.idf[terms] # as if each match were a query word
+                fuzzy_ids, fuzzy_scores = score_terms(self.postings, terms, weights / np.linalg.norm(weights))
+                ids, scores = add_channel(ids, scores, fuzzy_ids, fuzzy_scores, self.fuzzy_weight)
+            results.append(SearchResult(query, self, ids, scores, self.threshold))
+        return results
+
+    def score(self, query, memo=None):
+        """SearchResult for the query, as CollegeKnowledgeBase.score()."""
+        return self.score_many([query], memo)[0]
+
+    def score_many(self, queries, memo=None):
+        """score() for a batch; memo is an optional per-request dict of results by query."""
+        results = [None] * len(queries)
+        todo = {} # query -> positions still to score
+        for i, query in enumerate(queries):
+            if memo is not None and query in memo:
+                results[i] = memo[query]
+            else:
+                todo.setdefault(query, []).append(i)
+
+        for result in self._score_queries(list(todo)):
+            for i in todo[result.query]:
+                results[i] = result
+        if memo is not None:
+            for query, result in zip(queries, results):
+                memo[query] = result
+        return results
+
+    def reload_stats(self):
+        """Same keys as CollegeKnowledgeBase.reload_stats(); an export never reloads."""
+        return {"watching": False, "chunks": len(self.chunks), "reloads": 0, "failures": 0,
+                "last_reload_at": None, "last_reload_seconds": None, "last_error": None}
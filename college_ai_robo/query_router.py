@@ -0,0 +1,175 @@
+import re
+from collections import namedtuple
+
+# A keyword (or pattern) found in a query.
+#   keyword    the registered keyword, or the pattern source for patterns
+#   categories every category the keyword was registered under
+#   start/end  span in the lowercased query
+#   word       True when both ends sit on a regex word boundary (same as
+#              re.search(r"\b" + re.escape(keyword) + r"\b", text))
+KeywordMatch = namedtuple("KeywordMatch", ["keyword", "categories", "start", "end", "word"])
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+def _on_boundary(text, pos):
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+def _trie_regex(words):
+    """
+    Builds a regex alternation shaped like a trie, so the engine walks
+    shared prefixes once instead of trying every keyword in turn.
+    Longer continuations are tried first, giving the longest keyword.
+    """
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        alts = []
+        for ch in sorted(k for k in node if k):
+            alts.append(re.escape(ch) + build(node[ch]))
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class RoutedQuery:
+    """The result of one scan: every keyword/pattern match in the query."""
+    def __init__(self, router, text, matches):
+        self.router = router
+        self.text = text
+        self.matches = matches
+        self._by_category = {}
+        for m in matches:
+            for c in m.categories:
+                self._by_category.setdefault(c, []).append(m)
+
+    def get(self, category, word=False):
+        found = self._by_category.get(category, [])
+        if word:
+            found = [m for m in found if m.word]
+        return found
+
+    def has(self, category, word=False):
+        return bool(self.get(category, word))
+
+    def keywords(self, category, word=False):
+        return {m.keyword for m in self.get(category, word)}
+
+    def first(self, category, word=False):
+        """
+        The first keyword of the category, in registration order, that
+        occurs in the query (the old "for k in keys: if k in msg: break").
+        """
+        found = self.keywords(category, word)
+        if not found:
+            return None
+        for k in self.router.category_keywords(category):
+            if k in found:
+                return k
+        return None
+
+
+class QueryRouter:
+    """
+    Compiles every routing keyword (and a few regex patterns) into a single
+    regex once, then finds all matches - overlapping ones included - in one
+    left-to-right scan of the query.
+    """
+    def __init__(self):
+        self._keywords = {}        # keyword -> [categories]
+        self._category_order = {}  # category -> [keywords] in registration order
+        self._patterns = []        # (category, pattern source)
+        self._regex = None
+
+    def add(self, category, keywords):
+        for k in keywords:
+            k = k.lower()
+            cats = self._keywords.setdefault(k, [])
+            if category not in cats:
+                cats.append(category)
+            order = self._category_order.setdefault(category, [])
+            if k not in order:
+                order.append(k)
+        self._regex = None
+        return self
+
+    def add_pattern(self, category, pattern):
+        self._patterns.append((category, pattern))
+        self._category_order.setdefault(category, []).append(pattern)
+        self._regex = None
+        return self
+
+    def category_keywords(self, category):
+        return self._category_order.get(category, [])
+
+    def compile(self):
+        # Every keyword that is a prefix of another keyword: when the
+        # longest keyword starting at a position is found, its registered
+        # prefixes are known to match at the same position too.
+        keys = sorted(self._keywords)
+        self._prefixes = {
+            k: [p for p in keys if len(p) <= len(k) and k.startswith(p)]
+            for k in keys
+        }
+
+        # Items scanned at every position: the keyword trie first, then
+        # each pattern. Lookaheads keep matches zero-width so overlapping
+        # keywords are all reported. At a given position the first item
+        # that matches is required and the later ones are optional:
+        #   (?=(A))(?=(B))?(?=(C))? | (?=(B))(?=(C))? | (?=(C))
+        items = []
+        if keys:
+            items.append((None, _trie_regex(keys)))
+        items.extend(self._patterns)
+        self._group_items = {}
+        branches = []
+        for i in range(len(items)):
+            parts = []
+            for j in range(i, len(items)):
+                name = f"g{i}_{j}"
+                self._group_items[name] = j
+                look = f"(?=(?P<{name}>{items[j][1]}))"
+                parts.append(look if j == i else look + "?")
+            branches.append("".join(parts))
+        self._items = items
+        self._regex = re.compile("|".join(branches)) if branches else None
+        return self
+
+    def route(self, message):
+        """Scans the lowercased message once and returns a RoutedQuery."""
+        if self._regex is None:
+            self.compile()
+        text = message.lower()
+        matches = []
+        if self._regex is not None:
+            for m in self._regex.finditer(text):
+                pos = m.start()
+                for name, value in m.groupdict().items():
+                    if value is None:
+                        continue
+                    category, source = self._items[self._group_items[name]]
+                    if category is None:
+                        for k in self._prefixes[value]:
+                            end = pos + len(k)
+                            word = _on_boundary(text, pos) and _on_boundary(text, end)
+                            matches.append(KeywordMatch(k, tuple(self._keywords[k]), pos, end, word))
+                    else:
+                        end = pos + len(value)
+                        word = _on_boundary(text, pos) and _on_boundary(text, end)
+                        matches.append(KeywordMatch(source, (category,), pos, end, word))
+        return RoutedQuery(self, text, matches)
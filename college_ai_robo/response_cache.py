@@ -0,0 +1,114 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Wake words the voice front-ends listen for (voice_bot.py / app.py). A
+# query that still starts with one is the same question without it. Aliases
+# that are ordinary words ("city", "chilly") are left out: "city hostel" is
+# a question of its own, not "hostel" with a wake word in front.
+WAKE_WORDS = [
+    "hey chitti", "hey city", "hi chitti", "hi city", "hey chetty", "hey chinti", "hey shanti",
+    "chitti", "chiti", "chithi", "chetty", "giti", "shitti", "chinti", "chinki",
+]
+_WAKE_RE = re.compile(r"^(?:" + "|".join(re.escape(w) for w in sorted(WAKE_WORDS, key=len, reverse=True)) + r")\b\s*")
+
+# Punctuation that never changes an answer. Characters the handlers do
+# look at (". ( ) & - _ : =" as in "m.tech", "cse(ai&ml)", "bc-d", "rank: 5000")
+# are kept.
+_NOISE_RE = re.compile(r"[^\w\s.()&:=\-]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(message):
+    """
+    Lowercases, strips one leading wake word and collapses punctuation and
+    whitespace, so "Chitti, who is the Principal??" and "who is the principal"
+    share one cache entry.
+    """
+    text = _NOISE_RE.sub(" ", message.lower())
+    text = _SPACE_RE.sub(" ", text).strip(" .")
+    stripped = _WAKE_RE.sub("", text).strip(" .")
+    # A bare wake word ("hi chitti") is still a greeting, keep it.
+    return stripped or text
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of answers keyed by normalized query.
+
+    watch_files is a callable returning the paths whose contents the answers
+    depend on (handbook, people list, CSVs, model pickles). Their mtimes and
+    sizes form the data version; when it changes every entry is dropped.
+    The version is re-checked at most every check_interval seconds.
+    """
+    def __init__(self, max_entries=256, watch_files=None, check_interval=1.0):
+        self.max_entries = max_entries
+        self.watch_files = watch_files
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = self._data_version()
+        self._checked_at = time.monotonic()
+
+    def _data_version(self):
+        if self.watch_files is None:
+            return None
+        version = []
+        for path in sorted(self.watch_files()):
+            try:
+                st = os.stat(path)
+                version.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                version.append((path, None, None))
+        return tuple(version)
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        version = self._data_version()
+        if version != self._version:
+            self._version = version
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def get(self, key):
+        with self._lock:
+            self._check_version()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,146 @@
+import json
+import os
+import time
+
+from data_loader import PlacementAggregates, get_placement_files, hash_file, load_people_data
+
+# Prebuilt runtime state so startup skips CSV parsing.
+# (The knowledge base keeps its own hash-keyed cache, see vector_store.py.)
+# Layout of SNAPSHOT_DIR:
+#   manifest.json        version, source file hashes
+#   placement_aggregates.json   per-file (by name and content hash), per-branch placement partials
+#   people.json          role <-> name lookup
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "runtime_snapshot")
+SNAPSHOT_VERSION = 4
+MANIFEST_NAME = "manifest.json"
+
+
+def get_source_files(base_dir=BASE_DIR):
+    files = [os.path.join(base_dir, "people_data.txt")]
+    files.extend(sorted(get_placement_files(base_dir)))
+    return files
+
+
+def hash_sources(base_dir=BASE_DIR):
+    """Content hashes of every source file, keyed by file name."""
+    hashes = {}
+    for path in get_source_files(base_dir):
+        if os.path.exists(path):
+            hashes[os.path.basename(path)] = hash_file(path)
+    return hashes
+
+
+def _write_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _write_snapshot(snapshot_dir, hashes, placements, people):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    # Drop the manifest first so a crash mid-write never leaves a
+    # manifest pointing at half-written arrays.
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    _write_json(os.path.join(snapshot_dir, "placement_aggregates.json"), placements.to_dict())
+    _write_json(os.path.join(snapshot_dir, "people.json"), people)
+
+    _write_json(manifest_path, {
+        "version": SNAPSHOT_VERSION,
+        "sources": hashes,
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    })
+
+
+def build_snapshot(base_dir=BASE_DIR, snapshot_dir=SNAPSHOT_DIR, hashes=None, previous=None):
+    """
+    Parses the source files and writes the snapshot. With the placements of
+    a previous snapshot only the CSVs whose contents changed are parsed.
+    Returns the freshly built state (same shape as load_snapshot()).
+    """
+    start = time.perf_counter()
+    if hashes is None:
+        hashes = hash_sources(base_dir)
+
+    if previous is not None:
+        placements = previous
+        placements.refresh(get_placement_files(base_dir))
+    else:
+        placements = PlacementAggregates.from_files(get_placement_files(base_dir))
+    people = load_people_data(base_dir)
+
+    if placements.stale:
+        # No pandas here: the old summaries are served, but a snapshot
+        # recording the current sources would hide that they are old.
+        print(f"Runtime snapshot not written: could not re-read {', '.join(sorted(placements.stale))}.")
+        return {"placements": placements, "people": people}
+    try:
+        _write_snapshot(snapshot_dir, hashes, placements, people)
+        print(f"Runtime snapshot built in {time.perf_counter() - start:.3f}s -> {snapshot_dir}")
+    except OSError as e:
+        # A read-only SD card should not stop the robot from answering.
+        print(f"Could not write runtime snapshot: {e}")
+
+    return {"placements": placements, "people": people}
+
+
+def load_snapshot(base_dir=BASE_DIR, snapshot_dir=SNAPSHOT_DIR, hashes=None):
+    """
+    Loads the snapshot if it exists and was built from the current sources.
+    Returns None when it is missing, stale or from another snapshot version.
+    """
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if hashes is None:
+        hashes = hash_sources(base_dir)
+    if manifest.get("version") != SNAPSHOT_VERSION or manifest.get("sources") != hashes:
+        return None
+
+    with open(os.path.join(snapshot_dir, "people.json"), "r", encoding="utf-8") as f:
+        people = json.load(f)
+    return {"placements": load_placements(snapshot_dir), "people": people}
+
+
+def load_placements(snapshot_dir=SNAPSHOT_DIR):
+    """The snapshot's placement aggregates, whatever sources it was built from."""
+    with open(os.path.join(snapshot_dir, "placement_aggregates.json"), "r", encoding="utf-8") as f:
+        return PlacementAggregates.from_dict(json.load(f))
+
+
+def get_snapshot(base_dir=BASE_DIR, snapshot_dir=SNAPSHOT_DIR):
+    """Loads the snapshot, transparently rebuilding it when sources changed."""
+    start = time.perf_counter()
+    hashes = hash_sources(base_dir)
+    try:
+        state = load_snapshot(base_dir, snapshot_dir, hashes)
+    except Exception as e:
+        print(f"Runtime snapshot unreadable ({e}). Rebuilding...")
+        state = None
+
+    if state is not None:
+        print(f"Runtime snapshot loaded in {(time.perf_counter() - start) * 1000:.1f} ms.")
+        return state
+
+    print("Runtime snapshot missing or stale. Rebuilding...")
+    # Placement CSVs that did not change keep their summaries
+    try:
+        previous = load_placements(snapshot_dir)
+    except Exception:
+        previous = None
+    return build_snapshot(base_dir, snapshot_dir, hashes, previous)
+
+
+if __name__ == "__main__":
+    build_snapshot()
@@ -0,0 +1,105 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Knowledge-base results, shared by vector_store.CollegeKnowledgeBase and
+# the numpy-only numpy_runtime.RuntimeKnowledgeBase (no sklearn or scipy here).
+
+SearchHit = namedtuple("SearchHit", ["chunk_id", "score", "text", "metadata"])
+
+
+def score_terms(postings, terms, q_weights):
+    """
+    Scores for a query given as unit-length (term ids ascending, weights)
+    against term -> row postings (anything with CSC-style data, indices and
+    indptr arrays). Returns (row ids ascending, scores); rows sharing no
+    term are left out. Contributions are added term by term in column
+    order, the order a sparse product uses.
+    """
+    ids, weights = [], []
+    for term, q_weight in zip(terms, q_weights):
+        lo, hi = postings.indptr[term], postings.indptr[term + 1]
+        ids.append(postings.indices[lo:hi])
+        weights.append(postings.data[lo:hi] * q_weight)
+    if not ids:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    ids = np.concatenate(ids)
+    candidates, slot = np.unique(ids, return_inverse=True)
+    return candidates, np.bincount(slot, weights=np.concatenate(weights), minlength=len(candidates))
+
+
+def add_channel(ids, scores, extra_ids, extra_scores, weight):
+    """Adds weight * another channel's (ids, scores) to a candidate list."""
+    merged = np.union1d(ids, extra_ids)
+    total = np.zeros(len(merged))
+    total[np.searchsorted(merged, ids)] += scores
+    total[np.searchsorted(merged, extra_ids)] += weight * extra_scores
+    return merged, total
+
+
+def top_k(ids, scores, k):
+    """Top-k (id, score) pairs by score, ties broken by the lower id."""
+    if k < len(scores):
+        # Everything tied with the k-th best stays in, so ties resolve the same way.
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = np.flatnonzero(scores >= kth)
+        ids, scores = ids[keep], scores[keep]
+    order = np.lexsort((ids, -scores))[:k]
+    return ids[order], scores[order]
+
+
+class SearchResult:
+    """
+    Every chunk score for one query from one scoring pass over one build.
+    Callers threshold it themselves: best(0.1) and best(0.15) read the
+    same scores. threshold None means the knowledge base's default.
+    Inverted-path results list only chunks sharing a term; the rest score 0.
+    index is anything with chunks, metadata and is_empty().
+    """
+    def __init__(self, query, index, ids, scores, default_threshold):
+        self.query = query
+        self.index = index
+        self.ids = ids # ascending
+        self.scores = scores
+        self.default_threshold = default_threshold
+
+    def is_empty(self):
+        """True when the knowledge base had no chunks to score."""
+        return self.index.is_empty()
+
+    def _ranked(self, threshold):
+        if threshold is None:
+            threshold = self.default_threshold
+        if threshold <= 0 and len(self.ids) < len(self.index.chunks):
+            # Chunks sharing no term score 0, which passes a threshold <= 0
+            scores = np.zeros(len(self.index.chunks))
+            scores[self.ids] = self.scores
+            return threshold, np.arange(len(scores)), scores
+        return threshold, self.ids, self.scores
+
+    def _hit(self, chunk_id, score):
+        return SearchHit(int(chunk_id), float(score), self.index.chunks[chunk_id], self.index.metadata[chunk_id])
+
+    def best(self, threshold=None):
+        """The top SearchHit, or None when nothing reaches threshold."""
+        threshold, ids, scores = self._ranked(threshold)
+        if len(ids) == 0:
+            return None
+        # argmax keeps the first (lowest id) of equal scores
+        best = np.argmax(scores)
+        if scores[best] < threshold:
+            return None
+        return self._hit(ids[best], scores[best])
+
+    def top(self, k, threshold=None):
+        """Up to k SearchHits at or above threshold, best first (ties: lower id first)."""
+        threshold, ids, scores = self._ranked(threshold)
+        if len(ids) == 0:
+            return []
+        top_ids, top_scores = top_k(ids, scores, k)
+        return [self._hit(i, s) for i, s in zip(top_ids, top_scores) if s >= threshold]
+
+    def compact(self):
+        """The same result without its zero scores (cheap to keep around)."""
+        keep = self.scores > 0
+        return SearchResult(self.query, self.index, self.ids[keep], self.scores[keep], self.default_threshold)
@@ -0,0 +1,128 @@
+import threading
+import time
+
+
+class Subsystem:
+    """
+    A lazily initialized component (model, knowledge base, data table).
+    The loader runs at most once; callers that need the value before it is
+    ready block only on this subsystem, not on the whole startup.
+    """
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.value = None
+        self.error = None
+        self.started_at = None
+        self.ready_at = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def load(self):
+        # The lock makes concurrent callers wait for the warming thread
+        # instead of running the loader a second time.
+        with self._lock:
+            if self._ready.is_set():
+                return self.value
+
+            self.started_at = time.perf_counter()
+            try:
+                self.value = self.loader()
+            except Exception as e:
+                print(f"Failed to initialize {self.name}: {e}")
+                self.error = e
+                self.value = None
+            self.ready_at = time.perf_counter()
+            self._ready.set()
+            return self.value
+
+    def reload(self):
+        """
+        Runs the loader again and swaps the new value in; callers keep
+        getting the old value until then, and after a failure.
+        """
+        try:
+            value = self.loader()
+        except Exception as e:
+            print(f"Failed to reload {self.name}, keeping the previous value: {e}")
+            return False
+        if value is None:
+            return False
+        self.value = value
+        return True
+
+    def get(self):
+        if self._ready.is_set():
+            return self.value
+        return self.load()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+
+class SubsystemRegistry:
+    """Named subsystems warmed in background threads right after startup."""
+    def __init__(self):
+        self.created_at = time.perf_counter()
+        self._subsystems = {}
+        self._threads = []
+
+    def register(self, name, loader):
+        self._subsystems[name] = Subsystem(name, loader)
+        return self._subsystems[name]
+
+    def __contains__(self, name):
+        return name in self._subsystems
+
+    def subsystem(self, name):
+        return self._subsystems[name]
+
+    def get(self, name):
+        """Returns the subsystem value, blocking only until that one is ready."""
+        return self._subsystems[name].get()
+
+    def is_ready(self, name):
+        return self._subsystems[name].is_ready()
+
+    def reload(self, name):
+        return self._subsystems[name].reload()
+
+    def warm_all(self, report=True):
+        """Starts one daemon thread per subsystem that is not loaded yet."""
+        for sub in self._subsystems.values():
+            if sub.is_ready():
+                continue
+            t = threading.Thread(target=sub.load, name=f"warm-{sub.name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+        if report:
+            threading.Thread(target=self._report_when_ready, name="warm-report", daemon=True).start()
+
+    def wait_all(self, timeout=None):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for sub in self._subsystems.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not sub.wait(remaining):
+                return False
+        return True
+
+    def timing_report(self):
+        lines = ["--- Startup Timing Report ---"]
+        for sub in self._subsystems.values():
+            if not sub.is_ready():
+                state = "warming" if sub.started_at is not None else "pending"
+                lines.append(f"- {sub.name}: {state}")
+                continue
+            ready = sub.ready_at - self.created_at
+            took = sub.ready_at - sub.started_at
+            status = "FAILED" if sub.error else "ready"
+            lines.append(f"- {sub.name}: {status} at +{ready:.3f}s (load {took:.3f}s)")
+        return "\n".join(lines)
+
+    def _report_when_ready(self):
+        self.wait_all()
+        print(self.timing_report())
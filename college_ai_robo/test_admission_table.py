@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+import train_admission
+from admission_table import AdmissionTable
+
+# Float rounding only: the pipeline sums the one-hot dot product in BLAS
+# order, the table adds the same terms in a fixed order.
+TOLERANCE = 1e-12
+RANKS = [1, 2, 10, 500, 1000, 5000, 12345, 23456, 40000, 50000, 75000,
+         99999, 123457, 150000, 199999, 250000]
+
+
+def fit_pipeline():
+    raw_df = train_admission.parse_data()
+    full_df = train_admission.generate_synthetic_data(raw_df, seed=0)
+    model = train_admission.build_model()
+    model.fit(full_df[['Rank', 'Branch', 'Gender', 'Category']], full_df['Eligible'])
+    return model
+
+
+def all_rows(table):
+    # Every category combination the encoder knows, plus values it never
+    # saw (handle_unknown='ignore' -> contributes nothing).
+    branches = list(table.weights['Branch']) + ['XYZ']
+    genders = list(table.weights['Gender']) + ['X']
+    categories = list(table.weights['Category']) + ['NEW']
+    return [{'Rank': r, 'Branch': b, 'Gender': g, 'Category': c}
+            for b in branches for g in genders for c in categories for r in RANKS]
+
+
+def test_table_matches_pipeline():
+    model = fit_pipeline()
+    table = AdmissionTable.from_pipeline(model)
+    rows = all_rows(table)
+
+    expected = model.predict_proba(pd.DataFrame(rows))[:, 1]
+    single = np.array([table.predict_proba(r['Rank'], r['Branch'], r['Gender'], r['Category']) for r in rows])
+    batch = table.predict_many(rows)
+
+    assert np.abs(single - expected).max() <= TOLERANCE
+    assert np.abs(batch - expected).max() <= TOLERANCE
+    # What the user sees is identical.
+    assert [f"{p * 100:.1f}" for p in single] == [f"{p * 100:.1f}" for p in expected]
+
+
+def test_table_round_trip():
+    table = AdmissionTable.from_pipeline(fit_pipeline())
+    copy = AdmissionTable.from_dict(table.to_dict())
+    for r in all_rows(table):
+        assert copy.predict_proba(r['Rank'], r['Branch'], r['Gender'], r['Category']) == \
+            table.predict_proba(r['Rank'], r['Branch'], r['Gender'], r['Category'])
+
+
+def test_extreme_ranks_do_not_overflow():
+    table = AdmissionTable(1.5, -1e-4, {"Branch": {"CSE": 0.5}, "Gender": {"F": 0.1}, "Category": {"OC": -0.3}})
+    rows = [{'Rank': r, 'Branch': 'CSE', 'Gender': 'F', 'Category': 'OC'} for r in (-1e9, 1, 1e7, 1e9)]
+    with np.errstate(over='raise'):
+        batch = table.predict_many(rows)
+    assert np.all(np.isfinite(batch))
+    assert batch[0] == 1.0 and batch[-1] < 1e-200
+    for r, p in zip(rows, batch):
+        assert abs(table.predict_proba(r['Rank'], 'CSE', 'F', 'OC') - p) <= TOLERANCE
+
+
+if __name__ == "__main__":
+    test_table_matches_pipeline()
+    test_table_round_trip()
+    test_extreme_ranks_do_not_overflow()
+    print("Admission table matches the pipeline.")
@@ -0,0 +1,201 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import app
+import artifacts
+
+# One of each route respond() can take
+MIXED_BATCH = [
+    "hi",                                            # text (keyword)
+    "who is the principal",                          # people lookup
+    "tell me about data science",                    # kb (pinned branch query)
+    "is there a hostel facility for girls",          # kb (handbook search)
+    "rank 5000 female oc cse can i get a seat",      # admission
+    "highest package in it",                         # placements
+    "random noise words",                            # no intent evidence: unknown intent
+    "Chitti, who is the Principal??",                # duplicate after normalization
+    "hi",                                            # exact duplicate
+    "",                                              # empty
+]
+
+
+def setup_module(module):
+    app.INTENT_LOG_PATH = None
+    app.SUBSYSTEMS.wait_all()
+    # Answers given while a model trains are not final
+    deadline = time.monotonic() + 600
+    while app.is_training() and time.monotonic() < deadline:
+        time.sleep(0.5)
+    assert not app.is_training()
+
+
+def test_respond_many_matches_respond():
+    app.RESPONSE_CACHE.clear()
+    expected = [app.respond(q) for q in MIXED_BATCH]
+    assert expected[-1] == ""
+    assert expected[1] == expected[7] and expected[0] == expected[8]
+
+    # Cold cache: every route runs batched
+    app.RESPONSE_CACHE.clear()
+    assert app.respond_many(MIXED_BATCH) == expected
+    # Warm cache: everything is served from it
+    hits = app.cache_stats()["hits"]
+    assert app.respond_many(MIXED_BATCH) == expected
+    assert app.cache_stats()["hits"] > hits
+    # Partly warm: cached and computed answers mix in one batch
+    app.RESPONSE_CACHE.clear()
+    app.respond(MIXED_BATCH[4])
+    assert app.respond_many(list(reversed(MIXED_BATCH))) == list(reversed(expected))
+
+
+def test_unknown_intent_kb_threshold():
+    # "placement" best matches the handbook at ~0.148: enough for the KB's
+    # default threshold (0.1), not for an unknown intent's 0.15
+    kb = app.SUBSYSTEMS.get("kb")
+    assert 0.1 <= kb.score("placement").best(0.0).score < 0.15
+    routed = app.route_query("placement")
+    action = app._plan_intent("placement", routed, "UNKNOWN")
+    assert action[2] == 0.15
+    assert app._execute("placement", routed, action, {}) == "I'm not sure how to answer that."
+    assert app._execute_many(["placement"], [routed], [action], {}) == ["I'm not sure how to answer that."]
+
+
+def test_rejected_guesses_get_the_unknown_intent_answer():
+    # The intent model has no evidence for any of these: only a handbook
+    # chunk clearing the unknown-intent bar is offered
+    kb = app.SUBSYSTEMS.get("kb")
+    app.RESPONSE_CACHE.clear()
+    for query in ["data science", "manjula", "cyber security", "application form", "fee structure",
+                  "random noise words", "xyzzy plugh", "qwerty asdf zxcv"]:
+        guess = app.get_intent_guess(query)
+        assert app.route_intent(guess, app.route_query(query)) == (None, "rejected"), query
+        hit = kb.score(query).best(0.15)
+        expected = "I think this might help:\n" + hit.text if hit else "I'm not sure how to answer that."
+        assert app.respond(query) == expected, query
+    # Nonsense gets the fallback reply, not a weak handbook match
+    for query in ["random noise words", "xyzzy plugh", "qwerty asdf zxcv"]:
+        assert app.respond(query) == "I'm not sure how to answer that.", query
+    assert "Data Science" in app.respond("data science")
+
+
+def test_background_training_state():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "model.pkl")
+        app.RESPONSE_CACHE.clear()
+
+        # Running: answers are not cached
+        app._train_in_background(path, ["-c", "import time; time.sleep(60)"])
+        running = app._training[path]
+        assert app.is_training() and app.is_training(path)
+        app.respond("who is the principal")
+        assert app.cache_stats()["size"] == 0
+        running.kill()
+        running.wait(timeout=60)
+        assert not app.is_training(path)
+
+        # Exit 0 without writing a model: forgotten all the same
+        app._train_in_background(path, ["-c", "pass"])
+        app._training[path].wait(timeout=60)
+        app._last_model_refresh["admission_model"] = time.monotonic()
+        assert not app.is_training()
+        assert path not in app._training
+        # and the next model lookup re-checks the files straight away
+        assert "admission_model" not in app._last_model_refresh
+        app.respond("who is the principal")
+        assert app.cache_stats()["size"] == 1
+
+        # Failed: forgotten, a new training can start
+        app._train_in_background(path, ["-c", "import sys; sys.exit(3)"])
+        app._training[path].wait(timeout=60)
+        assert not app.is_training(path)
+        app._train_in_background(path, ["-c", "pass"])
+        app._training[path].wait(timeout=60)
+        assert not app.is_training()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_train_admission_fails_without_data():
+    # The training script in a directory with no approval list
+    tmp = tempfile.mkdtemp()
+    try:
+        for name in ["train_admission.py", "admission_table.py", "artifacts.py", "cutoff_index.py"]:
+            shutil.copy(os.path.join(app.BASE_DIR, name), tmp)
+        proc = subprocess.run([sys.executable, "train_admission.py"], cwd=tmp, capture_output=True, text=True)
+        assert proc.returncode == 1
+        assert "Failed to load data." in proc.stdout
+        assert not os.path.exists(os.path.join(tmp, "admission_model.pkl"))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_adopted_model_records_its_training_data():
+    path = app.INTENT_MODEL_PATH
+    saved = {}
+    for name in (artifacts.manifest_path(path), artifacts.table_path(path)):
+        with open(name, "rb") as f:
+            saved[name] = f.read()
+    try:
+        # Shipped without a manifest: unpickled and adopted
+        os.remove(artifacts.manifest_path(path))
+        assert app.SUBSYSTEMS.reload("intent_model") and app.SUBSYSTEMS.reload("intent_table")
+        manifest = artifacts.read_manifest(path)
+        assert manifest["adopted"] and manifest["data_hash"] == app.train_intent.examples_hash()
+        # so new examples retrain it
+        assert artifacts.check_artifact(path, "other examples", "intent")[1]
+    finally:
+        for name, data in saved.items():
+            with open(name, "wb") as f:
+                f.write(data)
+        app.SUBSYSTEMS.reload("intent_model")
+        app.SUBSYSTEMS.reload("intent_table")
+
+
+def test_cutoff_index_follows_the_approval_list():
+    current = app._admission_data_hash()
+    assert app.SUBSYSTEMS.get("cutoff_index").data_hash == current
+    ranks = app.SUBSYSTEMS.get("cutoff_index").ranks
+    cutoffs = app.SUBSYSTEMS.subsystem("cutoff_index")
+    query = "rank 5000 girl oc cse can i get a seat"
+    app.RESPONSE_CACHE.clear()
+    answer = app.respond(query)
+
+    # A file built from other approval lists is not rebuilt on the request
+    # thread: the admission training rebuilds it in the background...
+    app.CutoffIndex({("CSE", "M", "OC"): [1]}, "stale").save(app.CUTOFF_INDEX_PATH)
+    before = cutoffs.value
+    cutoffs.value = app._load_cutoff_index()
+    app.RESPONSE_CACHE.clear()
+    try:
+        assert cutoffs.value is None and app.is_training(app.ADMISSION_MODEL_PATH)
+        assert app.respond(query) == app.PREDICTION_WARMING_UP
+        assert app.respond_many([query]) == [app.PREDICTION_WARMING_UP]
+        app._training[app.ADMISSION_MODEL_PATH].wait(timeout=600)
+    finally:
+        if cutoffs.value is None:
+            cutoffs.value = before
+    assert app.CutoffIndex.load(app.CUTOFF_INDEX_PATH).data_hash == current
+
+    # ... and the new index is loaded together with the retrained model
+    assert app._get_admission_table() is not None
+    assert cutoffs.value is not before
+    assert cutoffs.value.data_hash == current and cutoffs.value.ranks == ranks
+    app.RESPONSE_CACHE.clear()
+    assert app.respond(query) == answer
+
+
+if __name__ == "__main__":
+    setup_module(None)
+    test_respond_many_matches_respond()
+    test_unknown_intent_kb_threshold()
+    test_rejected_guesses_get_the_unknown_intent_answer()
+    test_background_training_state()
+    test_train_admission_fails_without_data()
+    test_adopted_model_records_its_training_data()
+    test_cutoff_index_follows_the_approval_list()
+    print("respond_many() matches respond().")
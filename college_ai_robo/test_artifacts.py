@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import tempfile
+
+import artifacts
+from artifacts import ADOPT, CONVERT, LOAD, REBUILD, check_artifact
+
+DATA_HASH = "a" * 64
+
+
+def save(tmp, table=True):
+    path = os.path.join(tmp, "model.pkl")
+    artifacts.save_artifact(path, {"weights": [1, 2, 3]}, "intent", DATA_HASH, {"classes": ["A", "B"]},
+                            table={"weights": [1, 2, 3]} if table else None)
+    return path
+
+
+def edit_manifest(path, **changes):
+    with open(artifacts.manifest_path(path), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    for key, value in changes.items():
+        if key in artifacts.LIBRARIES:
+            manifest["libraries"][key] = value
+        else:
+            manifest[key] = value
+    with open(artifacts.manifest_path(path), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+def test_check_artifact_paths():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "model.pkl")
+        assert check_artifact(path, DATA_HASH, "intent")[:2] == (REBUILD, False)
+
+        path = save(tmp)
+        assert check_artifact(path, DATA_HASH, "intent")[:2] == (LOAD, False)
+        # Training data changed: served, rebuilt in the background
+        assert check_artifact(path, "b" * 64, "intent")[:2] == (LOAD, True)
+        # Deployed without the training data: cannot go stale
+        assert check_artifact(path, None, "intent")[:2] == (LOAD, False)
+        assert check_artifact(path, DATA_HASH, "admission")[0] == REBUILD
+
+        # Pickled by another sklearn (or numpy major): use the compiled table
+        edit_manifest(path, **{"scikit-learn": "0.24.2"})
+        assert check_artifact(path, DATA_HASH, "intent")[:2] == (CONVERT, False)
+        assert artifacts.load_table(path) == {"weights": [1, 2, 3]}
+        edit_manifest(path, **{"scikit-learn": artifacts.library_versions()["scikit-learn"], "numpy": "1.0.0"})
+        assert check_artifact(path, DATA_HASH, "intent")[0] == CONVERT
+        os.remove(artifacts.table_path(path))
+        assert check_artifact(path, DATA_HASH, "intent")[0] == REBUILD
+
+        # Replaced without its manifest: not unpickled unchecked
+        path = save(tmp)
+        edit_manifest(path, size=1)
+        assert check_artifact(path, DATA_HASH, "intent")[:2] == (REBUILD, False)
+        # Saved before there were manifests
+        os.remove(artifacts.manifest_path(path))
+        assert check_artifact(path, DATA_HASH, "intent")[0] == ADOPT
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_adopted_artifact_converts():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = save(tmp)
+        os.remove(artifacts.manifest_path(path))
+        artifacts.adopt_artifact(path, "intent", {"classes": ["A", "B"]}, {"weights": [1, 2, 3]}, DATA_HASH)
+        # Unknown versions: never unpickled blind again
+        assert check_artifact(path, DATA_HASH, "intent")[:2] == (CONVERT, False)
+        # Adopted as fitted on the current data: retrained once it changes
+        assert check_artifact(path, "b" * 64, "intent")[:2] == (CONVERT, True)
+
+        # Deployed without the training data: nothing to compare against
+        os.remove(artifacts.manifest_path(path))
+        artifacts.adopt_artifact(path, "intent", {"classes": ["A", "B"]}, {"weights": [1, 2, 3]})
+        assert check_artifact(path, "b" * 64, "intent")[:2] == (CONVERT, False)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_check_artifact_paths()
+    test_adopted_artifact_converts()
+    print("Artifact manifests pick the expected load paths.")
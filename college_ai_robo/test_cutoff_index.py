@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+
+from cutoff_index import CutoffIndex
+
+RANKS = {("CSE", "F", "OC"): [4500, 900, 120], ("ECE", "M", "BC_A"): [7000]}
+
+
+def test_lookups():
+    index = CutoffIndex(RANKS)
+    assert index.last_admitted("CSE", "F", "OC") == 4500
+    assert index.admitted_worse_than(900, "CSE", "F", "OC") == 1
+    assert index.last_admitted("XYZ", "F", "OC") is None
+    assert index.admitted_worse_than(1, "XYZ", "F", "OC") == 0
+
+
+def test_save_and_load():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "admission_cutoffs.json")
+        CutoffIndex(RANKS, "abc123").save(path)
+        index = CutoffIndex.load(path)
+        assert index.ranks == CutoffIndex(RANKS).ranks
+        assert index.data_hash == "abc123"
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_lookups()
+    test_save_and_load()
+    print("Cutoff index saves, loads and answers lookups.")
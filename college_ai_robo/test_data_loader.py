@@ -0,0 +1,125 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+from data_loader import ALL_BRANCHES, PlacementAggregates, get_placement_files
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def copy_placement_files(tmp):
+    for path in sorted(get_placement_files(BASE_DIR)):
+        shutil.copy(path, tmp)
+    return sorted(get_placement_files(tmp))
+
+
+def touch_later(path, seconds=10):
+    # mtime is what refresh() compares; make the edit visible whatever the clock resolution
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + seconds))
+
+
+def test_refresh_matches_full_recompute():
+    tmp = tempfile.mkdtemp()
+    try:
+        files = copy_placement_files(tmp)
+        agg = PlacementAggregates.from_files(files)
+        assert agg.overall()["count"] > 0
+
+        # Edit one file (drop its last rows), remove one and add a new one.
+        edited = [f for f in files if f.endswith("placement_IT.csv")][0]
+        with open(edited, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        with open(edited, "w", encoding="utf-8") as f:
+            f.writelines(lines[:-10])
+        touch_later(edited)
+        removed = [f for f in files if f.endswith("placement_civil.csv")][0]
+        os.remove(removed)
+        added = os.path.join(tmp, "placement_extra.csv")
+        with open(added, "w", encoding="utf-8") as f:
+            f.write("S.No,Branch,Roll Number,Full Name,Company,Package\n"
+                    "1,CIVIL,21A31A0101,A STUDENT,L&T,4.5 LPA\n"
+                    "2,IT,21A31A1299,B STUDENT,Infosys,40 LPA\n")
+
+        files = sorted(get_placement_files(tmp))
+        assert agg.refresh(files)
+        assert agg.table == PlacementAggregates.from_files(files).table
+        assert agg.get("IT")["highest"] == 4000000.0
+        # Nothing changed since: nothing to do
+        assert not agg.refresh(files)
+
+        # The snapshot form merges back to the same table
+        assert PlacementAggregates.from_dict(agg.to_dict()).table == agg.table
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_update_and_remove_file():
+    tmp = tempfile.mkdtemp()
+    try:
+        files = copy_placement_files(tmp)
+        full = PlacementAggregates.from_files(files)
+        agg = PlacementAggregates.from_files(files[:-1])
+        agg.update_file(files[-1])
+        assert agg.table == full.table
+
+        agg.remove_file(files[0])
+        assert agg.table == PlacementAggregates.from_files(files[1:]).table
+        # (a file without a usable header contributes no partials)
+        counts = [agg.files[os.path.basename(f)]["partials"].get(ALL_BRANCHES, {"count": 0})["count"]
+                  for f in files[1:]]
+        assert agg.overall()["count"] == sum(counts)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_concurrent_refreshes():
+    tmp = tempfile.mkdtemp()
+    try:
+        files = copy_placement_files(tmp)
+        agg = PlacementAggregates.from_files(files)
+        full = agg.table
+        errors = []
+
+        # A refresh waits for one already changing the files
+        with agg._lock:
+            waiting = threading.Thread(target=agg.refresh, args=(files[:-1],))
+            waiting.start()
+            waiting.join(timeout=0.2)
+            assert waiting.is_alive() and agg.table is full
+        waiting.join()
+        assert agg.table == PlacementAggregates.from_files(files[:-1]).table
+
+        def work(seen):
+            # Refreshes that disagree on the last file remove and re-add it
+            try:
+                for _ in range(50):
+                    agg.refresh(seen)
+                    assert agg.overall()["count"] > 0
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6) # switch threads as often as possible
+        try:
+            threads = [threading.Thread(target=work, args=(files if i % 2 else files[:-1],)) for i in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        assert not errors
+        agg.refresh(files)
+        assert agg.table == full
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_refresh_matches_full_recompute()
+    test_update_and_remove_file()
+    test_concurrent_refreshes()
+    print("Placement aggregates match a full recompute.")
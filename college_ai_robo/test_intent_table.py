@@ -0,0 +1,156 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import make_pipeline
+from sklearn.utils import murmurhash3_32 as sklearn_murmurhash3_32
+
+import train_intent
+from intent_table import HashedIntentTable, IntentTable, compile_pipeline, murmurhash3_32
+
+SEED = 0
+N_FUZZED = 2000
+# Float rounding only: the pipeline sums the sparse dot product term by term,
+# the table with one BLAS call over the same columns.
+TOLERANCE = 1e-12
+EXTRA_WORDS = ["Rank", "CSE!", "aiml?", "12345", "x", "b.tech", "m-tech", "ఇంజనీరింగ్",
+               "placment", "hod's", "   ", "", "e.g.", "cse_ai"]
+
+
+def fit_pipeline():
+    df = pd.DataFrame(train_intent.load_examples(), columns=['text', 'intent'])
+    model = make_pipeline(TfidfVectorizer(ngram_range=(1, 2)), MultinomialNB())
+    model.fit(df['text'], df['intent'])
+    return model
+
+
+def training_queries():
+    return [text for text, _ in train_intent.load_examples()]
+
+
+def fuzzed_queries(n=N_FUZZED, seed=SEED):
+    # Shuffled training words, case changes, punctuation, numbers, single
+    # letters, words the vectorizer never saw, and empty messages.
+    rng = random.Random(seed)
+    words = sorted({w for text in training_queries() for w in text.split()}) + EXTRA_WORDS
+    queries = ["", "?", "hi", "HELLO", "a b c"]
+    for _ in range(n):
+        picked = [rng.choice(words) for _ in range(rng.randint(1, 8))]
+        if rng.random() < 0.3:
+            picked = [w.upper() if rng.random() < 0.5 else w for w in picked]
+        sep = rng.choice([" ", "  ", ", ", "-", "\t"])
+        queries.append(sep.join(picked))
+    return queries
+
+
+def test_table_matches_pipeline():
+    model = fit_pipeline()
+    table = IntentTable.from_pipeline(model)
+    queries = training_queries() + fuzzed_queries()
+
+    expected = list(model.predict(queries))
+    assert [table.predict(q) for q in queries] == expected
+    assert table.predict_many(queries) == expected
+
+    nb = model.steps[-1][1]
+    jll = model.steps[0][1].transform(queries) @ nb.feature_log_prob_.T + nb.class_log_prior_
+    scores = np.array([table.scores(q) for q in queries])
+    assert np.abs(scores - jll).max() <= TOLERANCE
+
+
+def test_guess_matches_predict_proba():
+    model = fit_pipeline()
+    table = IntentTable.from_pipeline(model)
+    queries = training_queries() + fuzzed_queries(500)
+
+    expected = model.predict_proba(queries)
+    proba = np.array([table.predict_proba(q) for q in queries])
+    assert np.abs(proba - expected).max() <= TOLERANCE
+
+    analyzer = model.steps[0][1].build_analyzer()
+    vocabulary = model.steps[0][1].vocabulary_
+    for q, p, guess in zip(queries, expected, table.guess_many(queries)):
+        ranked = np.sort(p)[::-1]
+        assert guess.intent == table.predict(q)
+        assert abs(guess.confidence - ranked[0]) <= TOLERANCE
+        assert abs(guess.margin - (ranked[0] - ranked[1])) <= TOLERANCE
+        assert guess.runner_up != guess.intent
+        assert guess.evidence == sum(ngram in vocabulary for ngram in analyzer(q))
+
+
+def test_table_round_trip():
+    table = IntentTable.from_pipeline(fit_pipeline())
+    copy = IntentTable.from_dict(table.to_dict())
+    for q in training_queries() + fuzzed_queries(200):
+        assert copy.predict(q) == table.predict(q)
+        assert np.array_equal(copy.scores(q), table.scores(q))
+
+
+def test_hashed_table_matches_pipeline():
+    tmp = tempfile.mkdtemp()
+    try:
+        model = train_intent.train_online_model(log_path=os.path.join(tmp, "log.jsonl"),
+                                                path=os.path.join(tmp, "model.pkl"))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    table = compile_pipeline(model)
+    assert isinstance(table, HashedIntentTable)
+    queries = training_queries() + fuzzed_queries()
+
+    assert table.predict_many(queries) == list(model.predict(queries))
+    proba = np.array([table.predict_proba(q) for q in queries])
+    assert np.abs(proba - model.predict_proba(queries)).max() <= TOLERANCE
+
+    copy = HashedIntentTable.from_dict(json.loads(json.dumps(table.to_dict())))
+    for q in queries[:300]:
+        assert np.array_equal(copy.scores(q), table.scores(q))
+
+
+def test_murmurhash_matches_sklearn():
+    # Every tail length, multi-byte characters, and the n-grams the tables hash
+    keys = ["", "a", "ab", "abc", "abcd", "abcde", "\x00", "ఇంజనీరింగ్", "é"] + fuzzed_queries(500)
+    keys += [ngram for q in training_queries() for ngram in q.lower().split()]
+    for key in keys:
+        for seed in (0, 1, 2 ** 32 - 1):
+            assert murmurhash3_32(key, seed) == sklearn_murmurhash3_32(key, seed=seed)
+
+
+def test_fold_query_log():
+    tmp = tempfile.mkdtemp()
+    log_path, model_path = os.path.join(tmp, "log.jsonl"), os.path.join(tmp, "model.pkl")
+    try:
+        train_intent.train_online_model(log_path=log_path, path=model_path)
+        lines = [{"time": 1.0, "query": "library timings", "label": "COLLEGE_INFO"},
+                 {"time": 2.0, "query": "uh hmm"},
+                 {"time": 3.0, "query": "library timings", "label": "COLLEGE_INFO"}]
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(line) + "\n" for line in lines)
+
+        assert train_intent.fold_query_log(log_path, model_path) == 2
+        # Folded lines are remembered; only new labels count next time.
+        assert train_intent.fold_query_log(log_path, model_path) == 0
+        model, folded = train_intent.load_online_model(model_path)
+        assert folded == {"1.0|library timings", "3.0|library timings"}
+        assert model.predict(["library timings"])[0] == "COLLEGE_INFO"
+
+        # The same examples in one pass give the same model.
+        fresh = train_intent.train_online_model(log_path=log_path, path=model_path)
+        assert np.array_equal(fresh.steps[-1][1].feature_count_, model.steps[-1][1].feature_count_)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_table_matches_pipeline()
+    test_guess_matches_predict_proba()
+    test_table_round_trip()
+    test_hashed_table_matches_pipeline()
+    test_murmurhash_matches_sklearn()
+    test_fold_query_log()
+    print("Intent table matches the pipeline.")
@@ -0,0 +1,218 @@
+import glob
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+import numpy as np
+
+import numpy_runtime
+import runtime_snapshot
+from admission_table import AdmissionTable
+from cutoff_index import CutoffIndex
+from data_loader import PlacementAggregates, get_placement_files
+from intent_table import IntentTable
+from numpy_runtime import RuntimeKnowledgeBase
+from test_intent_table import fit_pipeline, fuzzed_queries
+from vector_store import CollegeKnowledgeBase
+
+SEED = 0
+# Float rounding only: the knowledge base normalizes the query inside
+# sklearn, the runtime with numpy, then both sum the same postings.
+TOLERANCE = 1e-12
+FUZZY_WEIGHT = 0.3 # as app.py
+KB_QUERIES = ["Admissions Process B.Tech M.Tech Eligibility", "available branches", "tell me about pragati",
+              "mechanicle labs", "secuirty", "aim department", "fee structure", "THE", "", "?", "hostel"]
+
+
+def build_kb():
+    return CollegeKnowledgeBase("college_data.txt", cache_dir=None, fuzzy_weight=FUZZY_WEIGHT)
+
+
+def kb_queries(kb, n=1000, seed=SEED):
+    # Handbook words, some with a letter dropped or swapped (misheard words
+    # go through the fuzzy channel), plus stop words and unknown words.
+    rng = random.Random(seed)
+    words = sorted({w for chunk in kb.chunks for w in chunk.split()}) + ["the", "and", "xyzzy", "q"]
+    queries = list(KB_QUERIES)
+    for _ in range(n):
+        picked = []
+        for w in (rng.choice(words) for _ in range(rng.randint(1, 6))):
+            if len(w) > 3 and rng.random() < 0.3:
+                i = rng.randrange(len(w) - 1)
+                w = w[:i] + w[i + 1:] if rng.random() < 0.5 else w[:i] + w[i + 1] + w[i] + w[i + 2:]
+            picked.append(w)
+        queries.append(" ".join(picked))
+    return queries
+
+
+def dense(result, n_chunks):
+    scores = np.zeros(n_chunks)
+    scores[result.ids] = result.scores
+    return scores
+
+
+def export_to(runtime_dir, kb):
+    intent_table = IntentTable.from_pipeline(fit_pipeline())
+    admission_table = AdmissionTable(1.5, -1e-4, {"Branch": {"CSE": 0.5, "ECE": -0.25},
+                                                  "Gender": {"F": 0.1, "M": 0.0},
+                                                  "Category": {"OC": -0.3, "BC_A": 0.2}})
+    cutoffs = CutoffIndex({("CSE", "F", "OC"): [900, 120, 4500], ("ECE", "M", "BC_A"): [7000]})
+    numpy_runtime.export_runtime(runtime_dir, intent_table, admission_table, kb, cutoffs, {"test": True})
+    return intent_table, admission_table, cutoffs
+
+
+def test_kb_matches_knowledge_base():
+    kb = build_kb()
+    runtime_kb = RuntimeKnowledgeBase(*kb.export_search_state())
+    queries = kb_queries(kb)
+    n_chunks = len(kb.chunks)
+
+    expected = kb.score_many(queries)
+    results = runtime_kb.score_many(queries)
+    for query, want, got in zip(queries, expected, results):
+        assert np.abs(dense(got, n_chunks) - dense(want, n_chunks)).max() <= TOLERANCE, query
+        for threshold in (None, 0.0, 0.3):
+            want_hit, got_hit = want.best(threshold), got.best(threshold)
+            assert (want_hit and want_hit.chunk_id) == (got_hit and got_hit.chunk_id), query
+        assert [h.chunk_id for h in got.top(3)] == [h.chunk_id for h in want.top(3)], query
+
+    # The fuzzy channel is what some of these match through
+    assert runtime_kb.score("mechanicle labs").best() is not None
+
+
+def test_empty_kb():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "empty.txt")
+        open(path, "w").close()
+        kb = CollegeKnowledgeBase(path, cache_dir=None, fuzzy_weight=FUZZY_WEIGHT)
+        runtime_kb = RuntimeKnowledgeBase(*kb.export_search_state())
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    assert runtime_kb.is_empty()
+    assert runtime_kb.score("admission").best() is None
+
+
+def test_export_round_trip():
+    kb = build_kb()
+    tmp = tempfile.mkdtemp()
+    try:
+        intent_table, admission_table, cutoffs = export_to(tmp, kb)
+        runtime = numpy_runtime.load_runtime(tmp)
+        assert runtime.manifest["sources"] == {"test": True}
+
+        for q in fuzzed_queries(300):
+            assert np.array_equal(runtime.intent_table.scores(q), intent_table.scores(q))
+            assert runtime.intent_table.guess(q) == intent_table.guess(q)
+        for branch in ("CSE", "ECE", "XYZ"):
+            for rank in (1, 5000, 90000):
+                assert runtime.admission_table.predict_proba(rank, branch, "F", "OC") == \
+                    admission_table.predict_proba(rank, branch, "F", "OC")
+        assert runtime.cutoff_index.ranks == cutoffs.ranks
+
+        in_memory = RuntimeKnowledgeBase(*kb.export_search_state())
+        for q in kb_queries(kb, 200):
+            got, want = runtime.kb.score(q), in_memory.score(q)
+            assert np.array_equal(got.ids, want.ids) and np.array_equal(got.scores, want.scores)
+
+        # No manifest, no runtime
+        os.remove(numpy_runtime.manifest_path(tmp))
+        assert numpy_runtime.load_runtime(tmp) is None
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_runtime_imports_no_sklearn():
+    tmp = tempfile.mkdtemp()
+    try:
+        export_to(tmp, build_kb())
+        code = ("import sys, numpy_runtime\n"
+                f"runtime = numpy_runtime.load_runtime({tmp!r})\n"
+                "runtime.intent_table.guess('hello'); runtime.kb.score('mechanicle labs').best()\n"
+                "heavy = ('sklearn', 'scipy', 'pandas', 'joblib')\n"
+                "print('imported:', ','.join(m for m in heavy if m in sys.modules))")
+        out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True).stdout
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    assert out.strip().splitlines()[-1] == "imported:"
+
+    # The app on a device without them, serving a snapshot built elsewhere
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    tmp = tempfile.mkdtemp()
+    try:
+        for path in glob.glob(os.path.join(base_dir, "*.py")) + get_placement_files(base_dir):
+            shutil.copy(path, tmp)
+        for name in ("college_data.txt", "people_data.txt"):
+            shutil.copy(os.path.join(base_dir, name), tmp)
+        export_to(os.path.join(tmp, "runtime_model"), build_kb())
+        runtime_snapshot.build_snapshot(tmp, os.path.join(tmp, "runtime_snapshot"))
+        highest = PlacementAggregates.from_files(get_placement_files(tmp)).get("IT")["highest"]
+        # Copied over: every CSV gets a new mtime
+        for path in get_placement_files(tmp):
+            os.utime(path, (os.path.getatime(path), os.path.getmtime(path) + 10))
+
+        code = ("import json, sys\n"
+                "for name in ('sklearn', 'scipy', 'pandas', 'joblib'):\n"
+                "    sys.modules[name] = None # import fails\n"
+                "import app, runtime_snapshot\n"
+                "app.SUBSYSTEMS.wait_all()\n"
+                "app.PLACEMENT_REFRESH_SECONDS = 0\n"
+                "answers = [app.respond('highest placement package in it')]\n"
+                "with open('placement_IT.csv', 'a', encoding='utf-8') as f:\n"
+                "    f.write('999,IT,21A31A1299,A STUDENT,Infosys,90 LPA\\n')\n"
+                "answers.append(app.respond('highest placement package in it'))\n"
+                "rebuilt = runtime_snapshot.get_snapshot()['placements']\n"
+                "print(json.dumps([app.INFERENCE_RUNTIME, answers, rebuilt.get('IT')['highest']]))")
+        out = subprocess.run([sys.executable, "-c", code], cwd=tmp, capture_output=True, text=True, check=True).stdout
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    runtime, answers, rebuilt_highest = json.loads(out.strip().splitlines()[-1])
+    assert runtime == "numpy"
+    # The changed CSV cannot be parsed there: its previous summary is served
+    assert answers == [f"The highest package for **IT** is **{highest / 100000:.2f} LPA**."] * 2
+    assert rebuilt_highest == highest
+
+
+def test_stale_handbooks_are_detected():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "college_data.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Hostel:\nSeparate hostels for boys and girls.\n")
+        kb = CollegeKnowledgeBase(path, cache_dir=None, fuzzy_weight=FUZZY_WEIGHT)
+        runtime_dir = os.path.join(tmp, "runtime")
+        export_to(runtime_dir, kb)
+        manifest = numpy_runtime.read_manifest(runtime_dir)
+        assert manifest["kb_cache_key"] == kb._index.cache_key
+        assert numpy_runtime.check_sources(manifest) is True
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\nLibrary:\nOpen 9am to 8pm.\n")
+        assert numpy_runtime.check_sources(manifest) is False
+        out = io.StringIO()
+        with redirect_stdout(out):
+            assert numpy_runtime.load_runtime(runtime_dir) is not None # still served
+        assert "handbooks changed" in out.getvalue()
+
+        # No handbooks here, or an export that did not record them: unknown
+        os.remove(path)
+        assert numpy_runtime.check_sources(manifest) is None
+        assert numpy_runtime.check_sources({"kb_cache_key": manifest["kb_cache_key"]}) is None
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_kb_matches_knowledge_base()
+    test_empty_kb()
+    test_export_round_trip()
+    test_runtime_imports_no_sklearn()
+    test_stale_handbooks_are_detected()
+    print("Numpy runtime matches the sklearn path.")
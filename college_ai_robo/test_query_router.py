@@ -0,0 +1,69 @@
+import random
+import re
+
+from query_router import QueryRouter
+
+SEED = 0
+# Overlapping keywords and shared prefixes, as respond() registers them
+CATEGORIES = {
+    "greeting": ["hi ", "hi", "hello", "hey"],
+    "kb_branch": ["data science", "ds", "cse", "cse(ai&ml)", "ai", "aiml", "aim", "it", "information technology"],
+    "about": ["about", "explain", "tell me"],
+    "admission_info": ["process", "how to", "join", "fee"],
+    "process": ["process", "procedure"],
+}
+PATTERN = r"bra[a]*nch|cours|program"
+FILLER = ["the", "of", "in", "this", "with", "pragati", "hid", "sit", "branch", "braanch", "courses", "x"]
+
+
+def build_router():
+    router = QueryRouter()
+    for category, keywords in CATEGORIES.items():
+        router.add(category, keywords)
+    router.add_pattern("branches", PATTERN)
+    return router.compile()
+
+
+def queries(n=2000, seed=SEED):
+    rng = random.Random(seed)
+    words = [k for ks in CATEGORIES.values() for k in ks] + FILLER
+    out = ["", "hi", "Tell me about CSE(AI&ML)", "aiml", "data sciences", "this is it", "hithere"]
+    for _ in range(n):
+        picked = [rng.choice(words) for _ in range(rng.randint(1, 5))]
+        # Glue some words together so keywords also occur inside other words
+        out.append("".join(w if rng.random() < 0.2 else w + " " for w in picked).strip())
+    return out
+
+
+def test_matches_naive_checks():
+    router = build_router()
+    for q in queries():
+        routed = router.route(q)
+        text = q.lower()
+        for category, keywords in CATEGORIES.items():
+            found = {k for k in keywords if k in text}
+            on_words = {k for k in keywords if re.search(r"\b" + re.escape(k) + r"\b", text)}
+            assert routed.keywords(category) == found, (q, category)
+            assert routed.keywords(category, word=True) == on_words, (q, category)
+            assert routed.has(category) == bool(found), (q, category)
+            # first(): registration order, as the old "for k in keys" loops
+            first = next((k for k in keywords if k in on_words), None)
+            assert routed.first(category, word=True) == first, (q, category)
+        assert routed.has("branches") == bool(re.search(PATTERN, text)), q
+
+
+def test_adding_keywords_recompiles():
+    router = build_router()
+    assert not router.route("hostel fee").has("facility")
+    router.add("facility", ["hostel"])
+    routed = router.route("Hostel fee")
+    assert routed.keywords("facility") == {"hostel"}
+    assert routed.keywords("admission_info") == {"fee"}
+    # A keyword registered under two categories is reported for both
+    assert router.route("process").get("process")[0].categories == ("admission_info", "process")
+
+
+if __name__ == "__main__":
+    test_matches_naive_checks()
+    test_adding_keywords_recompiles()
+    print("Query router matches the naive keyword checks.")
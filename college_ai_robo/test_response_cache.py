@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+
+from response_cache import ResponseCache, normalize_query
+
+
+def test_normalize_query():
+    key = normalize_query("who is the principal")
+    assert normalize_query("Chitti, who is the Principal??") == key
+    assert normalize_query("  WHO is   the principal. ") == key
+    assert normalize_query("hey chitti who is the principal") == key
+    # Only one leading wake word, and never one inside the query
+    assert normalize_query("chitti chitti hostel") == "chitti hostel"
+    assert normalize_query("is chitti a robot") == "is chitti a robot"
+    # Ordinary words are not wake words
+    assert normalize_query("city hostel") != normalize_query("hostel")
+    # Characters the handlers read are kept
+    assert normalize_query("M.Tech CSE(AI&ML) rank: 5000 bc-d") == "m.tech cse(ai&ml) rank: 5000 bc-d"
+    # A bare wake word stays a greeting
+    assert normalize_query("Hi Chitti!") == "hi chitti"
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1 # "a" is now the most recent
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 1, 3, 1)
+
+
+def test_invalidated_when_watched_files_change():
+    tmp = tempfile.mkdtemp()
+    try:
+        data = os.path.join(tmp, "college_data.txt")
+        with open(data, "w") as f:
+            f.write("old")
+        watched = [data]
+        cache = ResponseCache(watch_files=lambda: list(watched), check_interval=0)
+        cache.put("hostel", "old answer")
+        assert cache.get("hostel") == "old answer"
+
+        with open(data, "w") as f:
+            f.write("new text")
+        assert cache.get("hostel") is None
+        assert cache.stats()["invalidations"] == 1
+
+        # A file appearing in the watch list (a new handbook) is a change too
+        cache.put("hostel", "new answer")
+        extra = os.path.join(tmp, "hostel.md")
+        open(extra, "w").close()
+        watched.append(extra)
+        assert cache.get("hostel") is None
+
+        # ... and so is one being removed
+        cache.put("hostel", "newer answer")
+        os.remove(extra)
+        assert cache.get("hostel") is None
+        assert cache.stats()["invalidations"] == 3
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_version_checked_at_most_every_interval():
+    tmp = tempfile.mkdtemp()
+    try:
+        data = os.path.join(tmp, "people_data.txt")
+        open(data, "w").close()
+        cache = ResponseCache(watch_files=lambda: [data], check_interval=3600)
+        cache.put("hod", "answer")
+        with open(data, "w") as f:
+            f.write("changed")
+        assert cache.get("hod") == "answer"
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_normalize_query()
+    test_lru_eviction()
+    test_invalidated_when_watched_files_change()
+    test_version_checked_at_most_every_interval()
+    print("Response cache keys and invalidation behave.")
@@ -0,0 +1,73 @@
+from collections import namedtuple
+
+import numpy as np
+
+from search_results import SearchResult, add_channel, top_k
+
+SEED = 0
+
+
+class FakeIndex(namedtuple("FakeIndex", ["chunks", "metadata"])):
+    def is_empty(self):
+        return not self.chunks
+
+
+def make_index(n):
+    return FakeIndex([f"chunk {i}" for i in range(n)], [{"title": f"T{i}"} for i in range(n)])
+
+
+def make_result(index, ids, scores):
+    return SearchResult("q", index, np.array(ids, dtype=np.int64), np.array(scores, dtype=np.float64), 0.1)
+
+
+def test_best_and_top():
+    index = make_index(6)
+    # Inverted-path shape: only chunks 1, 2, 4 and 5 scored, 2 and 4 tied
+    result = SearchResult("q", index, np.array([1, 2, 4, 5]), np.array([0.05, 0.3, 0.3, 0.12]), 0.1)
+
+    hit = result.best()
+    assert (hit.chunk_id, hit.score, hit.text, hit.metadata) == (2, 0.3, "chunk 2", {"title": "T2"})
+    # One pass, any threshold
+    assert result.best(0.31) is None
+    assert [h.chunk_id for h in result.top(3)] == [2, 4, 5]
+    assert [h.chunk_id for h in result.top(3, threshold=0.2)] == [2, 4]
+    assert [h.chunk_id for h in result.top(10, threshold=0.0)] == [2, 4, 5, 1, 0, 3]
+    # Chunks sharing no term score 0, which a threshold <= 0 lets through
+    assert make_result(index, [], []).best(0.0).chunk_id == 0
+    assert make_result(index, [], []).best() is None
+
+    compact = SearchResult("q", index, np.arange(6), np.array([0, 0.05, 0.3, 0, 0.3, 0.12]), 0.1).compact()
+    assert compact.ids.tolist() == [1, 2, 4, 5]
+    assert [h.chunk_id for h in compact.top(10, 0.0)] == [h.chunk_id for h in result.top(10, 0.0)]
+
+
+def test_empty_index():
+    result = make_result(make_index(0), [], [])
+    assert result.is_empty()
+    assert result.best(0.0) is None and result.top(3, 0.0) == []
+
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(SEED)
+    for _ in range(200):
+        n = int(rng.integers(1, 40))
+        ids = np.sort(rng.choice(1000, size=n, replace=False))
+        scores = rng.integers(0, 5, size=n) / 4 # plenty of ties
+        k = int(rng.integers(1, n + 3))
+        expected = sorted(zip(ids.tolist(), scores.tolist()), key=lambda p: (-p[1], p[0]))[:k]
+        got_ids, got_scores = top_k(ids, scores, k)
+        assert list(zip(got_ids.tolist(), got_scores.tolist())) == expected
+
+
+def test_add_channel():
+    ids, scores = add_channel(np.array([1, 4]), np.array([0.5, 0.2]), np.array([2, 4]), np.array([1.0, 0.5]), 0.3)
+    assert ids.tolist() == [1, 2, 4]
+    assert np.allclose(scores, [0.5, 0.3, 0.2 + 0.15])
+
+
+if __name__ == "__main__":
+    test_best_and_top()
+    test_empty_index()
+    test_top_k_matches_full_sort()
+    test_add_channel()
+    print("Search results rank and threshold as expected.")
@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import train_admission
+
+# Ranks the line-by-line parser got wrong on the 2023 list (see the
+# [user-009] commit): wrapped NCC / CAP seats it kept, and a general seat it
+# dropped because the student's name contained "PH".
+LEGACY_ONLY_RANKS = {73004, 83395, 86436, 99612, 99731, 130840, 134607}
+STREAMING_ONLY_RANKS = {34931}
+
+
+def legacy_parse(path):
+    """The parser before streaming: every physical line on its own, files[0] only."""
+    rows = []
+    with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+        for line in f:
+            clean_line = line.strip().strip('"')
+            tokens = clean_line.split()
+            if len(tokens) < 8:
+                continue
+            branch = tokens[-1]
+            if not (len(branch) >= 2 and len(branch) <= 5 and branch.isalpha() and branch.isupper()):
+                continue
+            rank = -1
+            for i in range(2, 6):
+                if tokens[i].isdigit() and int(tokens[i]) > 1 and int(tokens[i]) < 200000:
+                    rank = int(tokens[i])
+                    break
+            if rank == -1:
+                continue
+            gender = next((t for t in tokens if t in ['M', 'F']), None)
+            if not gender:
+                continue
+            category = None
+            for token in tokens:
+                category = next((c for c in train_admission.CATEGORIES if token.startswith(c)), None)
+                if category:
+                    break
+            if not category:
+                category = 'OC'
+            if category == 'OC' and "EWS" in clean_line.upper():
+                category = 'OC_EWS'
+            if any(x in clean_line.upper() for x in ["NCC", "CAP", "PH", "SP"]):
+                continue
+            rows.append((rank, branch, gender, category))
+    return rows
+
+
+def approval_list():
+    return sorted(train_admission.get_admission_files())[0]
+
+
+def test_streaming_matches_legacy_parse():
+    path = approval_list()
+    legacy = {row[0]: row for row in legacy_parse(path)}
+    streamed = {row[0]: row for row in train_admission.parse_file(path)}
+
+    assert set(legacy) - set(streamed) == LEGACY_ONLY_RANKS
+    assert set(streamed) - set(legacy) == STREAMING_ONLY_RANKS
+    # Every record both parsers kept is read the same way
+    for rank in set(legacy) & set(streamed):
+        assert legacy[rank] == streamed[rank], rank
+
+
+def test_wrapped_record():
+    lines = [
+        "S.NO HT.NO RANK NAME",
+        "265   50850020004   73004    KODA MOUNIKA KODA    BC_A_CA F       BC_A   AU   Y   CSD",
+        "GOVINDU P_GIRLS_",
+        "UR",
+        "",
+        "108   50764020114   34931   NITTALA PHANI   NITTALA   OC_GEN_ M    OC     AU   Y   CAI",
+        "RAGHAWENDR      SRI       AU",
+        "footer line",
+    ]
+    records = list(train_admission.iter_records(lines))
+    assert [r[0].split()[2] for r in records] == ["73004", "34931"]
+    # "BC_A_CA" + "P_GIRLS_" is a CAP seat; "PH" in a name is not a quota
+    assert train_admission.parse_record(*records[0]) is None
+    assert train_admission.parse_record(*records[1]) == (34931, "CAI", "M", "OC")
+
+
+def test_parallel_parse_matches_serial():
+    tmp = tempfile.mkdtemp()
+    try:
+        files = []
+        for i in range(3):
+            files.append(os.path.join(tmp, f"approval-list-{i}.csv"))
+            shutil.copy(approval_list(), files[-1])
+        serial = train_admission.parse_data(files, workers=1)
+        pooled = train_admission.parse_data(files, workers=3)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    assert len(serial) == 3 * len(train_admission.parse_file(approval_list()))
+    assert serial.equals(pooled)
+
+
+def test_synthetic_data_is_deterministic():
+    raw_df = train_admission.parse_data()
+    out = train_admission.generate_synthetic_data(raw_df, seed=0)
+    assert out.equals(train_admission.generate_synthetic_data(raw_df, seed=0))
+    assert not out.equals(train_admission.generate_synthetic_data(raw_df, seed=1))
+
+    # Same rows as the old per-group loop: the kept positives exactly, and
+    # len(positives) + 5 negatives per group drawn past the group's cutoff
+    for (branch, gender, category), group in raw_df.groupby(['Branch', 'Gender', 'Category']):
+        cutoff = sorted(group['Rank'])[int(len(group) * 0.85)]
+        rows = out[(out['Branch'] == branch) & (out['Gender'] == gender) & (out['Category'] == category)]
+        positives = rows[rows['Eligible'] == 1]
+        negatives = rows[rows['Eligible'] == 0]
+        assert positives['Rank'].tolist() == group[group['Rank'] <= cutoff]['Rank'].tolist()
+        assert len(negatives) == len(positives) + 5
+        assert np.all(negatives['Rank'].to_numpy() > cutoff)
+
+
+if __name__ == "__main__":
+    test_streaming_matches_legacy_parse()
+    test_wrapped_record()
+    test_parallel_parse_matches_serial()
+    test_synthetic_data_is_deterministic()
+    print("Streaming parser matches the legacy parse.")
@@ -0,0 +1,226 @@
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from bench_kb_search import QUERIES, build_corpus, load_kb
+from test_numpy_runtime import FUZZY_WEIGHT, kb_queries
+from test_numpy_runtime import dense as dense_scores
+from vector_store import FUZZY_MIN_SIMILARITY, CollegeKnowledgeBase, split_sections
+
+SEED = 0
+
+
+def assert_same_scores(dense, inverted, queries):
+    for q in queries:
+        want, got = dense.score(q), inverted.score(q)
+        # Dense mode scores every chunk, inverted mode only those sharing a term
+        nonzero = want.scores > 0
+        assert np.array_equal(got.ids, want.ids[nonzero]), q
+        assert np.array_equal(got.scores, want.scores[nonzero]), q
+        assert (got.best() and got.best().chunk_id) == (want.best() and want.best().chunk_id), q
+        assert [h.chunk_id for h in got.top(5)] == [h.chunk_id for h in want.top(5)], q
+
+
+def test_inverted_matches_dense_on_handbook():
+    for fuzzy_weight in (0.0, FUZZY_WEIGHT):
+        dense = CollegeKnowledgeBase("college_data.txt", search_mode="dense", cache_dir=None, fuzzy_weight=fuzzy_weight)
+        inverted = CollegeKnowledgeBase("college_data.txt", search_mode="inverted", cache_dir=None, fuzzy_weight=fuzzy_weight)
+        assert_same_scores(dense, inverted, kb_queries(dense, 500))
+
+
+def test_inverted_matches_dense_on_large_corpus():
+    dense = load_kb(build_corpus(2000, np.random.default_rng(SEED)), "dense")
+    inverted = CollegeKnowledgeBase.from_arrays(*dense.export_arrays())
+    inverted.set_search_mode("inverted")
+    assert_same_scores(dense, inverted, QUERIES + kb_queries(dense, 200))
+
+
+def write_handbook(path, text, bump=0):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if bump:
+        st = os.stat(path)
+        os.utime(path, (st.st_atime, st.st_mtime + bump))
+
+
+def test_reload_swaps_index_and_counts_failures():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "college_data.txt")
+        write_handbook(path, "Hostel:\nSeparate hostels for boys and girls.\n\nLibrary:\nOpen 9am to 8pm.\n")
+        kb = CollegeKnowledgeBase(path, cache_dir=None)
+        swapped = []
+        kb._on_reload = swapped.append
+        old_index = kb._index
+        old_result = kb.score("library timings")
+
+        write_handbook(path, "Hostel:\nSeparate hostels for boys and girls.\n\nTransport:\nBuses on 40 routes.\n", bump=10)
+        # The change must hold for one more check before it is read
+        assert not kb.check_for_changes()
+        assert kb.check_for_changes()
+        assert swapped == [kb] and kb.reload_stats()["reloads"] == 1
+        assert "Buses" in kb.score("transport buses").best().text
+        # The old build is untouched; a search that started on it finishes on it
+        assert old_index.chunks != kb._index.chunks
+        assert "Open 9am" in old_result.best().text
+
+        # Touched, not changed: no rebuild
+        with open(path, encoding="utf-8") as f:
+            write_handbook(path, f.read(), bump=20)
+        kb.check_for_changes()
+        assert not kb.check_for_changes()
+        live = kb._index
+
+        # An emptied handbook and a failing build are rejected, the index stays live
+        write_handbook(path, "", bump=30)
+        kb.check_for_changes()
+        assert not kb.check_for_changes()
+        kb._build_index = lambda texts: 1 / 0
+        write_handbook(path, "Canteen:\nOpen all day.\n", bump=40)
+        kb.check_for_changes()
+        assert not kb.check_for_changes()
+        stats = kb.reload_stats()
+        assert (stats["reloads"], stats["failures"]) == (1, 2)
+        assert "division by zero" in stats["last_error"]
+        assert kb._index is live and swapped == [kb]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_searches_during_reloads():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "college_data.txt")
+        write_handbook(path, "Version 0:\nedition zero of the handbook.\n")
+        kb = CollegeKnowledgeBase(path, cache_dir=None)
+        stop, errors = threading.Event(), []
+
+        def search():
+            while not stop.is_set():
+                try:
+                    for result in kb.score_many(["edition handbook", "version"]):
+                        best = result.best()
+                        assert best is None or best.text.startswith("Version")
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=search) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for i in range(1, 6):
+            write_handbook(path, f"Version {i}:\nedition {'x' * i} of the handbook.\n", bump=10 * i)
+            assert kb.reload()
+        stop.set()
+        for t in threads:
+            t.join()
+        assert not errors
+        assert kb.score("edition").best().text.startswith("Version 5")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_split_sections():
+    text = ("Pragati Engineering College, Surampalem.\n\n"
+            "Available Branches:\nUndergraduate (B.Tech) Programs:\n- CSE\n- ECE\n\n"
+            "A paragraph without a heading.\n\n"
+            "Hostel:\n- Note: separate blocks:\nfor boys and girls.\n")
+    sections = split_sections(text)
+    assert [title for title, _, _ in sections] == ["", "Available Branches", "Hostel"]
+    # Stacked headings and a headless paragraph stay with their section
+    assert text[sections[1][1]:sections[1][2]] == ("Available Branches:\nUndergraduate (B.Tech) Programs:\n"
+                                                   "- CSE\n- ECE\n\nA paragraph without a heading.")
+    # A list item ending in ':' is not a heading
+    assert text[sections[2][1]:sections[2][2]].endswith("for boys and girls.")
+
+    # Long sections are cut at paragraph breaks first, each piece keeps the title
+    long_text = "Rules:\n" + "\n\n".join(f"Rule {i} " + "word " * 30 for i in range(10))
+    pieces = split_sections(long_text, max_chars=400)
+    assert len(pieces) > 1 and all(title == "Rules" for title, _, _ in pieces)
+    assert all(e - s <= 400 for _, s, e in pieces)
+    assert all(long_text[s:e].startswith(("Rules:", "Rule ")) for _, s, e in pieces)
+
+
+def test_multi_document_ingestion():
+    tmp = tempfile.mkdtemp()
+    try:
+        handbooks = os.path.join(tmp, "handbooks")
+        os.mkdir(handbooks)
+        main = os.path.join(tmp, "college_data.txt")
+        write_handbook(main, "Hostel:\nSeparate hostels for boys and girls.\n")
+        write_handbook(os.path.join(handbooks, "b_sports.md"), "Sports:\nCricket ground and indoor stadium.\n")
+        write_handbook(os.path.join(handbooks, "a_library.txt"), "Library:\nOpen 9am to 8pm.\n\nReading Room:\nSilent.\n")
+        write_handbook(os.path.join(handbooks, "marks.csv"), "not,a,handbook\n")
+
+        kb = CollegeKnowledgeBase([main, handbooks], cache_dir=None)
+        # Sources in load order, files of a directory sorted, non-handbook files skipped
+        assert [(os.path.basename(m["source"]), m["title"]) for m in kb.metadata] == [
+            ("college_data.txt", "Hostel"), ("a_library.txt", "Library"),
+            ("a_library.txt", "Reading Room"), ("b_sports.md", "Sports")]
+        for chunk, meta in zip(kb.chunks, kb.metadata):
+            with open(meta["source"], encoding="utf-8") as f:
+                assert f.read()[meta["start"]:meta["end"]] == chunk
+
+        hit = kb.score("cricket stadium").best()
+        assert hit.metadata["title"] == "Sports" and hit.text.startswith("Sports:")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_pinned_queries():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "college_data.txt")
+        write_handbook(path, "Hostel:\nSeparate hostels for boys and girls.\n\nLibrary:\nOpen 9am to 8pm.\n")
+        kb = CollegeKnowledgeBase(path, cache_dir=None)
+        fresh = kb.score("library timings")
+        assert kb.pin(["library timings", "xyzzy"]) == [("xyzzy", 0.0, 0.1)]
+
+        # Pinned answers come from the table and equal a fresh scoring pass
+        pinned = kb.score("library timings")
+        assert pinned is kb.score("library timings")
+        # (kept compact: only the chunks that score)
+        assert np.array_equal(dense_scores(pinned, 2), dense_scores(fresh, 2))
+        # A per-request memo takes precedence over the pinned table
+        memo = {"library timings": fresh}
+        assert kb.score("library timings", memo) is fresh
+        # Other queries are still scored
+        assert kb.score("library hours") is not kb.score("library hours")
+
+        # A reload resolves the pins against the new build
+        write_handbook(path, "Hostel:\nSeparate hostels.\n\nLibrary:\nOpen 24 hours, timings posted.\n", bump=10)
+        assert kb.reload()
+        assert "24 hours" in kb.score("library timings").best().text
+        assert kb.score("library timings") is not pinned
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_fuzzy_channel():
+    plain = CollegeKnowledgeBase("college_data.txt", cache_dir=None)
+    fuzzy = CollegeKnowledgeBase("college_data.txt", cache_dir=None, fuzzy_weight=FUZZY_WEIGHT)
+    # A misheard word is matched through its closest handbook term
+    assert plain.score("secuirty").best() is None
+    assert fuzzy.score("secuirty").best().metadata["title"] == "B.Tech CSE (Cyber Security)"
+    term_ids, similarity = fuzzy._fuzzy_vectors(fuzzy._index, ["mechanicle labs"])[0]
+    assert [fuzzy.vectorizer.get_feature_names_out()[t] for t in term_ids] == ["mechanical"]
+    assert similarity[0] >= FUZZY_MIN_SIMILARITY
+    # Known words and noise leave the scores as they were
+    for q in ["placement", "hostel facility", "qzxv", "the", ""]:
+        assert fuzzy._fuzzy_vectors(fuzzy._index, [q])[0] is None, q
+        assert np.array_equal(dense_scores(fuzzy.score(q), len(fuzzy.chunks)),
+                              dense_scores(plain.score(q), len(plain.chunks))), q
+
+
+if __name__ == "__main__":
+    test_inverted_matches_dense_on_handbook()
+    test_inverted_matches_dense_on_large_corpus()
+    test_reload_swaps_index_and_counts_failures()
+    test_searches_during_reloads()
+    test_split_sections()
+    test_multi_document_ingestion()
+    test_pinned_queries()
+    test_fuzzy_channel()
+    print("Inverted search matches dense search; reloads swap atomically.")
@@ -9,11 +9,19 @@ from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
 import glob
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from admission_table import AdmissionTable
+from artifacts import hash_files, save_artifact
+from cutoff_index import CUTOFF_INDEX_PATH, CutoffIndex
 
 # Setup paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CSV_PATTERN = os.path.join(BASE_DIR, "*.csv")
 MODEL_PATH = os.path.join(BASE_DIR, "admission_model.pkl")
+# Seed for the synthetic negatives, so retraining on the same lists is reproducible
+SYNTHETIC_SEED = 42
 
 def get_admission_files():
     csv_files = glob.glob(CSV_PATTERN)
@@ -24,130 +32,210 @@ def get_admission_files():
     ]
     return admission_files
 
-def parse_data():
-    files = get_admission_files()
+# A record starts with "S.NO  HT.NO  RANK ..."; long names, father names and
+# the allotted category wrap onto the quoted lines that follow it.
+RECORD_START_RE = re.compile(r'^\d+\s+\d{10,}\s')
+# Enough for the longest wrapped name; anything past it is not part of the record.
+MAX_CONTINUATION_LINES = 8
+CATEGORIES = ['OC', 'BC_A', 'BC_B', 'BC_C', 'BC_D', 'BC_E', 'SC', 'ST']
+# Special-quota seats (NCC, CAP, PH*, sports) are not general cutoffs.
+QUOTA_MARKERS = ["NCC", "CAP", "PH", "SP"]
+REGION_SUFFIXES = ("_AU", "_UR", "_SVU")
+ALLOTMENT_FRAGMENT_RE = re.compile(r'^[A-Z_]*(?:_[A-Z]*|AU|UR|SVU)$')
+
+def iter_lines(path):
+    """Yields the cleaned text of each quoted line, one at a time."""
+    with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+        for line in f:
+            # Page breaks show up as a form feed in front of the first record.
+            yield line.strip().strip('"').strip().lstrip('\x0c')
+
+def iter_records(lines):
+    """
+    Groups lines into records: (start_line, continuation_lines).
+
+    A small state machine: outside a record everything is skipped (page
+    headers, column titles, footer); a record-start line opens a record;
+    until a blank line or the next record start, lines are continuations.
+    Only one record is held at a time.
+    """
+    record = None
+    for line in lines:
+        if RECORD_START_RE.match(line):
+            if record is not None:
+                yield record
+            record = (line, [])
+        elif record is not None:
+            if not line:
+                yield record
+                record = None
+            elif len(record[1]) < MAX_CONTINUATION_LINES:
+                record[1].append(line)
+    if record is not None:
+        yield record
+
+def parse_record(start_line, continuation):
+    """Returns (rank, branch, gender, category) or None for one record."""
+    tokens = start_line.split()
+    if len(tokens) < 8:
+        return None
+
+    # 1. Branch
+    branch = tokens[-1]
+    if not (len(branch) >= 2 and len(branch) <= 5 and branch.isalpha() and branch.isupper()):
+        return None
+
+    # 2. Rank
+    rank = -1
+    for i in range(2, 6):
+        if tokens[i].isdigit() and int(tokens[i]) > 1 and int(tokens[i]) < 200000:
+            rank = int(tokens[i])
+            break
+    if rank == -1:
+        return None
+
+    # 3. Gender: the right-most M/F, so names like "MUMMIDI M" don't shift it
+    gender_idx = None
+    for i in range(len(tokens) - 2, 2, -1):
+        if tokens[i] in ['M', 'F']:
+            gender_idx = i
+            break
+    if gender_idx is None:
+        return None
+    gender = tokens[gender_idx]
+
+    # 4. Allotted category, rejoined with the part that wrapped ("BC_A_NC" + "C_GEN_A")
+    allotment = tokens[gender_idx - 1].upper()
+    if continuation and not allotment.endswith(REGION_SUFFIXES):
+        fragment = continuation[0].split()[-1]
+        if ALLOTMENT_FRAGMENT_RE.match(fragment):
+            allotment += fragment
+    if any(x in allotment for x in QUOTA_MARKERS):
+        return None
+
+    # 5. Category: the seat's category, else the caste column
+    category = None
+    for c in CATEGORIES:
+        if allotment.startswith(c):
+            category = c
+            break
+    if not category:
+        caste = tokens[gender_idx + 1] if gender_idx + 1 < len(tokens) else ''
+        category = next((c for c in CATEGORIES if caste.startswith(c)), 'OC')
+    if category == 'OC' and allotment.startswith("EWS"):
+        category = 'OC_EWS'
+
+    return (rank, branch, gender, category)
+
+def parse_file(path):
+    """Parses one approval list in a single streaming pass."""
+    rows = []
+    for start_line, continuation in iter_records(iter_lines(path)):
+        row = parse_record(start_line, continuation)
+        if row is not None:
+            rows.append(row)
+    print(f"Parsed {len(rows)} admissions from: {path}")
+    return rows
+
+def parse_data(files=None, workers=None):
+    """
+    Parses every approval list (get_admission_files() by default) into one
+    DataFrame. With several files each is parsed in its own process.
+    """
+    if files is None:
+        files = sorted(get_admission_files())
     if not files:
         print("No Admission CSV files found!")
         return None
 
-    csv_path = files[0]
-    print(f"Parsing Admission Data from: {csv_path}")
-    
-    data = []
-    
-    with open(csv_path, "r", encoding="utf-8-sig", errors="ignore") as f:
-        for line in f:
-            clean_line = line.strip().strip('"')
-            tokens = clean_line.split()
-            if len(tokens) < 8: continue
-                
-            try:
-                # 1. Branch
-                branch = tokens[-1]
-                if not (len(branch) >= 2 and len(branch) <= 5 and branch.isalpha() and branch.isupper()):
-                    continue
-                
-                # 2. Rank
-                rank = -1
-                for i in range(2, 6): 
-                    if tokens[i].isdigit() and int(tokens[i]) > 1 and int(tokens[i]) < 200000:
-                         rank = int(tokens[i])
-                         break
-                if rank == -1: continue
-
-                # 3. Gender
-                gender = None
-                for token in tokens:
-                    if token in ['M', 'F']:
-                        gender = token
-                        break
-                if not gender: continue
-
-                # 4. Category
-                category = None
-                cats = ['OC', 'BC_A', 'BC_B', 'BC_C', 'BC_D', 'BC_E', 'SC', 'ST']
-                for token in tokens:
-                    for c in cats:
-                        if token.startswith(c):
-                            category = c
-                            break
-                    if category: break
-                if not category: category = 'OC'
-                
-                if category == 'OC' and "EWS" in clean_line.upper():
-                    category = 'OC_EWS'
-
-                upper_line = clean_line.upper()
-                if any(x in upper_line for x in ["NCC", "CAP", "PH", "SP"]):
-                    continue
-
-                data.append({
-                    'Rank': rank,
-                    'Branch': branch,
-                    'Gender': gender,
-                    'Category': category,
-                    'Eligible': 1
-                })
-
-            except Exception:
-                continue
-                
-    return pd.DataFrame(data)
-
-def generate_synthetic_data(df):
+    print(f"Parsing Admission Data from {len(files)} file(s)...")
+    if len(files) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() keeps file order, so the result does not depend on timing
+            per_file = list(pool.map(parse_file, files))
+    else:
+        per_file = [parse_file(f) for f in files]
+
+    columns = ['Rank', 'Branch', 'Gender', 'Category']
+    rows = [row for file_rows in per_file for row in file_rows]
+    df = pd.DataFrame(rows, columns=columns)
+    df['Rank'] = df['Rank'].astype(np.int64)
+    df['Eligible'] = 1
+    return df
+
+def generate_synthetic_data(df, seed=None):
+    """
+    Keeps each group's positives up to its 85th-percentile rank and adds
+    len(positives) + 5 negative ranks drawn just past that cutoff.
+
+    Works on whole columns: one sort, per-group offsets and one Generator
+    call for every negative, so the same seed gives the same data.
+    Output order matches the old per-group loop: groups in sorted order,
+    positives in input order, then that group's negatives.
+    """
     print("Generating synthetic samples with Outlier Filtering...")
-    final_data = []
-    
-    # Ensure all key categories are present to avoid OHE errors later?
-    # OneHotEncoder handle_unknown='ignore' will help, but better to have data.
-    
-    groups = df.groupby(['Branch', 'Gender', 'Category'])
-    
-    for (branch, gender, category), group in groups:
-        ranks = sorted(group['Rank'])
-        
-        # 1. POSITIVE SAMPLES CLEANUP (85th Percentile)
-        percentile_idx = int(len(ranks) * 0.85)
-        cutoff_rank = ranks[percentile_idx] if ranks else 0
-        
-        valid_positives = group[group['Rank'] <= cutoff_rank]
-        for _, row in valid_positives.iterrows():
-            final_data.append(row.to_dict())
-            
-        # 2. NEGATIVE SAMPLES
-        # Generate enough negatives to balance
-        n_neg = len(valid_positives) + 5
-        
-        start_rank = cutoff_rank + 100
-        end_rank = min(start_rank + 40000, 250000) 
-        
-        if start_rank >= end_rank:
-             start_rank = cutoff_rank + 50
-             end_rank = start_rank + 10000
-             
-        fake_ranks = np.random.randint(start_rank, end_rank, size=n_neg)
-        
-        for r in fake_ranks:
-            final_data.append({
-                'Rank': r,
-                'Branch': branch,
-                'Gender': gender,
-                'Category': category,
-                'Eligible': 0
-            })
-            
-    return pd.DataFrame(final_data)
+    columns = ['Rank', 'Branch', 'Gender', 'Category', 'Eligible']
+    if df is None or df.empty:
+        return pd.DataFrame(columns=columns)
+    rng = np.random.default_rng(seed)
 
-def train_and_save():
-    raw_df = parse_data()
+    keys = ['Branch', 'Gender', 'Category']
+    # Group id per row, numbered in sorted key order (as groupby would)
+    group_ids, group_keys = pd.MultiIndex.from_frame(df[keys]).factorize(sort=True)
+    ranks = df['Rank'].to_numpy(dtype=np.int64)
+    n_groups = len(group_keys)
+
+    # 1. POSITIVE SAMPLES CLEANUP (85th Percentile)
+    # Same element the loop picked: sorted(ranks)[int(len * 0.85)]
+    order = np.lexsort((ranks, group_ids))
+    counts = np.bincount(group_ids, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    cutoff_rank = ranks[order][starts + (counts * 0.85).astype(np.int64)]
+
+    keep = ranks <= cutoff_rank[group_ids]
+    n_pos = np.bincount(group_ids[keep], minlength=n_groups)
+
+    # 2. NEGATIVE SAMPLES
+    # Generate enough negatives to balance
+    n_neg = n_pos + 5
+    start_rank = cutoff_rank + 100
+    end_rank = np.minimum(start_rank + 40000, 250000)
+    narrow = start_rank >= end_rank
+    start_rank = np.where(narrow, cutoff_rank + 50, start_rank)
+    end_rank = np.where(narrow, start_rank + 10000, end_rank)
+
+    neg_group = np.repeat(np.arange(n_groups), n_neg)
+    fake_ranks = rng.integers(start_rank[neg_group], end_rank[neg_group])
+
+    # 3. Stitch together per group: positives (input order), then negatives
+    pos_group = group_ids[keep]
+    all_group = np.concatenate((pos_group, neg_group))
+    all_label = np.concatenate((np.ones(len(pos_group), dtype=np.int64), np.zeros(len(neg_group), dtype=np.int64)))
+    layout = np.lexsort((1 - all_label, all_group)) # stable: keeps input order within a block
+
+    key_frame = group_keys.to_frame(index=False, name=keys)
+    out = key_frame.iloc[all_group[layout]].reset_index(drop=True)
+    out.insert(0, 'Rank', np.concatenate((ranks[keep], fake_ranks))[layout])
+    out['Eligible'] = all_label[layout]
+    return out[columns]
+
+def save_cutoff_index(raw_df, files_hash=None):
+    """Persists the sorted admitted ranks per (Branch, Gender, Category)."""
+    index = CutoffIndex.from_frame(raw_df, files_hash)
+    index.save(CUTOFF_INDEX_PATH)
+    print(f"Cutoff index saved to {CUTOFF_INDEX_PATH}")
+    return index
+
+def build_cutoff_index():
+    files = sorted(get_admission_files())
+    raw_df = parse_data(files)
     if raw_df is None or raw_df.empty:
         print("Failed to load data.")
-        return
+        return None
+    return save_cutoff_index(raw_df, data_hash(files))
 
-    print(f"Loaded {len(raw_df)} raw samples.")
-    full_df = generate_synthetic_data(raw_df)
-    print(f"Refined dataset size: {len(full_df)} samples.")
-    
+def build_model():
+    """Unfitted admission pipeline: one-hot categoricals + LogisticRegression."""
     # USE ONE-HOT ENCODING via ColumnTransformer
     # This ensures "CSE" is not just "1", but [1, 0, 0...] (Linear Independence)
     
@@ -160,15 +248,38 @@ def train_and_save():
         remainder='passthrough' # Keep Rank (which is the only numeric)
     )
     
+    # Pipeline: Transform -> LogisticRegression
+    # Increased max_iter for convergence
+    return make_pipeline(column_trans, LogisticRegression(max_iter=1000))
+
+def data_hash(files):
+    """Training-data hash recorded in the admission model manifest."""
+    return hash_files(sorted(files), extra={"seed": SYNTHETIC_SEED})
+
+def model_schema(table):
+    return {"inputs": ['Rank', 'Branch', 'Gender', 'Category'],
+            "categories": {feature: sorted(values) for feature, values in table.weights.items()}}
+
+def train_and_save():
+    """Trains and saves the admission model; False when there is no data to train on."""
+    files = sorted(get_admission_files())
+    raw_df = parse_data(files)
+    if raw_df is None or raw_df.empty:
+        print("Failed to load data.")
+        return False
+
+    print(f"Loaded {len(raw_df)} raw samples.")
+    save_cutoff_index(raw_df, data_hash(files))
+    full_df = generate_synthetic_data(raw_df, seed=SYNTHETIC_SEED)
+    print(f"Refined dataset size: {len(full_df)} samples.")
+    
     # Re-order DF to match [Rank, Branch, Gender, Category] passed ???
     # No, ColumnTransformer selects by name.
     
     X = full_df[['Rank', 'Branch', 'Gender', 'Category']]
     y = full_df['Eligible']
     
-    # Pipeline: Transform -> LogisticRegression
-    # Increased max_iter for convergence
-    model = make_pipeline(column_trans, LogisticRegression(max_iter=1000))
+    model = build_model()
     
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
@@ -217,9 +328,14 @@ def train_and_save():
     except Exception as e:
         print(f"Sanity check failed: {e}")
 
-    # Save the entire pipeline (includes encoding)
-    joblib.dump(model, MODEL_PATH)
+    # Save the entire pipeline (includes encoding), its compiled table and
+    # the manifest; all renamed into place, so app.py never loads a partial file.
+    table = AdmissionTable.from_pipeline(model)
+    save_artifact(MODEL_PATH, model, "admission", data_hash(files), model_schema(table), table=table.to_dict())
     print(f"Model pipeline saved to {MODEL_PATH}")
+    return True
 
 if __name__ == "__main__":
-    train_and_save()
+    # A non-zero exit tells app.py's background training that nothing was saved
+    if not train_and_save():
+        sys.exit(1)
@@ -1,112 +1,72 @@
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import make_pipeline
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
+import json
+from artifacts import hash_files, save_artifact
+from intent_table import compile_pipeline
 import os
+import sys
 
 # Setup paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "intent_model.pkl")
 
-# Labeled Dataset
-# Classes: PEOPLE, PLACEMENT, ADMISSION, RANK_PREDICTION, COLLEGE_INFO, UNKNOWN
-# Added more examples based on feedback
-data = [
-    # RANK_PREDICTION
-    ("can i get a seat with rank 30000", "RANK_PREDICTION"),
-    ("my rank is 45000 will i get cse", "RANK_PREDICTION"),
-    ("chances for rank 10000 in ece", "RANK_PREDICTION"),
-    ("predict my admission probability", "RANK_PREDICTION"),
-    ("is my rank good enough for aiml", "RANK_PREDICTION"),
-    ("rank 5000 oc male", "RANK_PREDICTION"),
-    ("i got 20000 rank in eapcet", "RANK_PREDICTION"),
-    ("cutoff rank for cse", "RANK_PREDICTION"),
-    ("last year cutoff for it", "RANK_PREDICTION"),
-    ("am i eligible for mechanical", "RANK_PREDICTION"),
-    ("rank predictor", "RANK_PREDICTION"),
-    ("can i get seat", "RANK_PREDICTION"),
-    ("rank 40000 in cse", "RANK_PREDICTION"),
-    ("rank 100000 in cse", "RANK_PREDICTION"),
-    ("seat with rank", "RANK_PREDICTION"),
-
-    # ADMISSION (Stats/Intake)
-    ("what is the intake of cse", "ADMISSION"),
-    ("how many seats in aiml", "ADMISSION"),
-    ("total seats availabe", "ADMISSION"),
-    ("number of students in ece", "ADMISSION"),
-    ("admission process", "ADMISSION"),
-    ("how many join civil", "ADMISSION"),
-    ("seat matrix", "ADMISSION"),
-    ("intake capacity", "ADMISSION"),
-    ("what is intake of aiml", "ADMISSION"),
-    ("intake of it", "ADMISSION"),
-    ("seats in cse", "ADMISSION"),
-    
-    # PLACEMENT (Specific & General)
-    ("how are placements here", "PLACEMENT"),
-    ("highest package this year", "PLACEMENT"),
-    ("average salary for cse", "PLACEMENT"),
-    ("top recruiters", "PLACEMENT"),
-    ("companies visiting college", "PLACEMENT"),
-    ("job opportunities", "PLACEMENT"),
-    ("placement statistics", "PLACEMENT"),
-    ("did tcs come", "PLACEMENT"),
-    ("what is the lowest package", "PLACEMENT"),
-    ("placement percentage", "PLACEMENT"),
-    ("jobs after aiml", "PLACEMENT"),
-    ("what are the placements of aiml", "PLACEMENT"),
-    ("what are the placements of cse", "PLACEMENT"),
-    ("placements info", "PLACEMENT"),
-    ("placements for ece", "PLACEMENT"),
-    ("how many verified placements", "PLACEMENT"),
-    ("count of placed students", "PLACEMENT"),
-    ("salary pacakge", "PLACEMENT"),
-
-    # PEOPLE
-    ("who is the principal", "PEOPLE"),
-    ("name of the chairman", "PEOPLE"),
-    ("who is hod of cse", "PEOPLE"),
-    ("director name", "PEOPLE"),
-    ("dean of academics", "PEOPLE"),
-    ("tell me about dr naresh", "PEOPLE"),
-    ("placement officer info", "PEOPLE"),
-    ("who is krishna rao", "PEOPLE"),
-    ("faculty list", "PEOPLE"),
-    ("who is hod of aiml", "PEOPLE"),
-    ("who is hod of it", "PEOPLE"),
-    ("who created you", "PEOPLE"),
-    ("creator name", "PEOPLE"),
-    ("hod name", "PEOPLE"),
-
-    # COLLEGE_INFO
-    ("tell me about the college", "COLLEGE_INFO"),
-    ("where is the college located", "COLLEGE_INFO"),
-    ("college address", "COLLEGE_INFO"),
-    ("history of pragati", "COLLEGE_INFO"),
-    ("vision and mission", "COLLEGE_INFO"),
-    ("is there hostel facility", "COLLEGE_INFO"),
-    ("bus transport availability", "COLLEGE_INFO"),
-    ("contact details", "COLLEGE_INFO"),
-    ("phone number of office", "COLLEGE_INFO"),
-    ("facilities in college", "COLLEGE_INFO"),
-    ("explain about pragati engineering college", "COLLEGE_INFO"),
-    ("available branches", "COLLEGE_INFO"), # "what branches are there"
-
-    # GREETING
-    ("hi", "GREETING"),
-    ("hello", "GREETING"),
-    ("good morning", "GREETING"),
-    ("thank you", "GREETING"),
-    ("bye", "GREETING"),
-]
+EXAMPLES_PATH = os.path.join(BASE_DIR, "intent_examples.jsonl")
+# Incrementally updated model (HashingVectorizer + MultinomialNB.partial_fit)
+ONLINE_MODEL_PATH = os.path.join(BASE_DIR, "intent_model_online.pkl")
+QUERY_LOG_PATH = os.path.join(BASE_DIR, "intent_log.jsonl")
+
+# Classes: PEOPLE, PLACEMENT, ADMISSION, RANK_PREDICTION, COLLEGE_INFO, GREETING.
+# partial_fit needs every class up front; labels outside this list are skipped.
+INTENT_CLASSES = ["ADMISSION", "COLLEGE_INFO", "GREETING", "PEOPLE", "PLACEMENT", "RANK_PREDICTION"]
+
+# Hashed features need no vocabulary, so new examples never change the
+# feature space. 2**16 buckets keep the NB tables small (6 x 65536 floats)
+# with few collisions for a vocabulary of a few thousand n-grams.
+HASH_FEATURES = 2 ** 16
+ONLINE_BATCH_SIZE = 256
+
+
+def load_examples(path=EXAMPLES_PATH):
+    """
+    Labeled examples, one JSON object per line: {"text": ..., "intent": ...}.
+    Blank lines are skipped.
+    """
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["text"], row["intent"]))
+    return examples
+
+def examples_hash(path=EXAMPLES_PATH):
+    """Training-data hash recorded in the intent model manifests."""
+    return hash_files([path])
+
+
+def model_schema(model):
+    vectorizer, nb = model.steps[0][1], model.steps[-1][1]
+    params = vectorizer.get_params()
+    n_features = params["n_features"] if "n_features" in params else len(vectorizer.vocabulary_)
+    return {"vectorizer": type(vectorizer).__name__, "ngram_range": list(params["ngram_range"]),
+            "n_features": n_features, "classes": [str(c) for c in nb.classes_]}
+
+
+def save_model(model, path=MODEL_PATH, examples_path=EXAMPLES_PATH):
+    """Pickle, compiled table and manifest (see artifacts.py)."""
+    save_artifact(path, model, "intent", examples_hash(examples_path), model_schema(model),
+                  table=compile_pipeline(model).to_dict())
+
 
 def train_intent_model():
     print("Training Intent Detection Model (Naive Bayes)...")
     
-    df = pd.DataFrame(data, columns=['text', 'intent'])
+    df = pd.DataFrame(load_examples(), columns=['text', 'intent'])
     
     # Preprocessing
     X = df['text']
@@ -136,8 +96,105 @@ def train_intent_model():
         print(f"'{phrase}' -> {pred}")
 
     # Save
-    joblib.dump(model, MODEL_PATH)
+    save_model(model)
     print(f"Intent Model saved to {MODEL_PATH}")
 
+def build_online_model():
+    # alternate_sign=False: MultinomialNB needs non-negative features.
+    return make_pipeline(
+        HashingVectorizer(ngram_range=(1, 2), n_features=HASH_FEATURES, alternate_sign=False),
+        MultinomialNB())
+
+
+def partial_fit_examples(model, examples):
+    """Folds (text, intent) pairs into the hashed model; returns how many were used."""
+    examples = [(text, intent) for text, intent in examples if intent in INTENT_CLASSES]
+    vectorizer, nb = model.steps[0][1], model.steps[-1][1]
+    for start in range(0, len(examples), ONLINE_BATCH_SIZE):
+        batch = examples[start:start + ONLINE_BATCH_SIZE]
+        X = vectorizer.transform([text for text, _ in batch])
+        nb.partial_fit(X, [intent for _, intent in batch], classes=INTENT_CLASSES)
+    return len(examples)
+
+
+def read_labeled_log(path=QUERY_LOG_PATH, seen=()):
+    """
+    Query-log lines (app.py's intent_log.jsonl) someone has labeled by adding
+    the right intent as "label". Lines whose key is in seen were folded in
+    before. Returns [(key, text, intent)]; a missing log is empty.
+    """
+    if not os.path.exists(path):
+        return []
+    labeled = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break # still being written
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            label = row.get("label")
+            if not label:
+                continue
+            key = f"{row.get('time')}|{row.get('query')}"
+            if key not in seen:
+                labeled.append((key, row["query"], label))
+    return labeled
+
+
+def save_online_model(model, folded, path=ONLINE_MODEL_PATH, examples_path=EXAMPLES_PATH):
+    """Writes the model with the keys of the folded log lines; readers never see a partial file."""
+    save_artifact(path, {"model": model, "folded": sorted(folded)}, "intent-online",
+                  examples_hash(examples_path), model_schema(model),
+                  table=compile_pipeline(model).to_dict(), folded=len(folded))
+
+
+def load_online_model(path=ONLINE_MODEL_PATH):
+    """(pipeline, keys of the query-log lines already folded in)."""
+    bundle = joblib.load(path)
+    return bundle["model"], set(bundle["folded"])
+
+
+def train_online_model(examples_path=EXAMPLES_PATH, log_path=QUERY_LOG_PATH, path=ONLINE_MODEL_PATH):
+    """Builds the hashed model from scratch: labeled examples, then every labeled log line."""
+    print("Training online Intent Model (hashed features, partial_fit)...")
+    model = build_online_model()
+    used = partial_fit_examples(model, load_examples(examples_path))
+    labeled = read_labeled_log(log_path)
+    used += partial_fit_examples(model, [(text, intent) for _, text, intent in labeled])
+    save_online_model(model, {key for key, _, _ in labeled}, path, examples_path)
+    print(f"Online Intent Model trained on {used} examples, saved to {path}")
+    return model
+
+
+def fold_query_log(log_path=QUERY_LOG_PATH, path=ONLINE_MODEL_PATH):
+    """
+    Folds query-log lines labeled since the last fold into the saved hashed
+    model (trained first if there is none). A running app.py picks the new
+    file up without a restart. Returns how many lines were folded in.
+    """
+    if not os.path.exists(path):
+        train_online_model(log_path=log_path, path=path)
+        return 0
+    model, folded = load_online_model(path)
+    labeled = read_labeled_log(log_path, folded)
+    used = partial_fit_examples(model, [(text, intent) for _, text, intent in labeled])
+    if labeled:
+        folded.update(key for key, _, _ in labeled)
+        save_online_model(model, folded, path)
+    print(f"Folded {used} labeled query-log lines into {path}")
+    return used
+
+
+# python train_intent.py          TF-IDF model from intent_examples.jsonl
+# python train_intent.py online   hashed model from the examples and the labeled query log
+# python train_intent.py fold     fold newly labeled query-log lines into the hashed model
 if __name__ == "__main__":
-    train_intent_model()
+    command = sys.argv[1] if len(sys.argv) > 1 else "tfidf"
+    if command == "online":
+        train_online_model()
+    elif command == "fold":
+        fold_query_log()
+    else:
+        train_intent_model()
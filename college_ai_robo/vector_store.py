@@ -1,68 +1,1104 @@
+import json
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
+import re
+import shutil
+import threading
+import time
+from artifacts import library_versions
+import kb_sources
+from kb_sources import resolve_sources
+from search_results import SearchResult, add_channel, score_terms
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfTransformer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 import numpy as np
 
+# "auto" uses the inverted index once the corpus is this big; below it the
+# dense product over every chunk is just as fast.
+INVERTED_MIN_CHUNKS = 1000
+SEARCH_MODES = ("auto", "dense", "inverted")
+
+# Sections longer than this are cut at paragraph, then line, then word breaks.
+MAX_CHUNK_CHARS = 1200
+HEADING_MAX_CHARS = 80
+
+# Fitted state, per handbook file and per corpus (KB_CACHE_VERSION is part
+# of every key; bump it when chunking or the layout changes):
+#   file-<key>/     one handbook: chunks.json (text + metadata), terms.json,
+#                   counts_data/indices/indptr.npy  raw term counts per chunk
+#   corpus-<key>/   the combined corpus: chunks.json, vocabulary.json, idf.npy,
+#                   data.npy / indices.npy / indptr.npy  TF-IDF matrix, and
+#                   counts_data/indices/indptr.npy  raw counts (both memory-mapped on load)
+#   lsa-<key>/      the corpus' latent space: term_vectors.npy (SVD components, one
+#                   row per term) and vectors.npy (unit chunk rows), both float16
+#                   and memory-mapped; fitted on the first "lsa" search
+#   meta.json in each entry is written last; it is the entry's manifest
+#   (shape, library versions, build time). The vectorizer's feature schema,
+#   including the stop-word list of the installed sklearn, is part of every
+#   key, so an upgrade that changes tokenization rebuilds instead of loading.
+# Editing one handbook only re-tokenizes that file; the corpus is then
+# reassembled from the cached counts. One knowledge base per cache_dir.
+KB_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_cache")
+KB_CACHE_VERSION = 3
+
+# How often the watcher thread stats the handbooks (see start_watching()).
+WATCH_INTERVAL_SECONDS = 2.0
+
+VECTORIZER_SETTINGS = {"stop_words": "english"}
+
+# Scoring backends. "tfidf" is cosine similarity of TF-IDF vectors; "bm25"
+# is Okapi BM25 over raw term counts, divided by the most the query's terms
+# could score, so both give 0..1 and one threshold per backend serves every
+# kind of question. "lsa" is cosine similarity in a latent space fitted by
+# TruncatedSVD on the TF-IDF matrix, so chunks sharing no word with the
+# query but using related words still score.
+SCORING_BACKENDS = ("tfidf", "bm25", "lsa")
+DEFAULT_THRESHOLDS = {"tfidf": 0.1, "bm25": 0.15, "lsa": 0.3}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Latent dimensions (fewer when the corpus has fewer chunks or terms). Chunk
+# vectors are kept unit-length in float16 and scored in blocks of this many
+# rows, each block one float32 matrix-vector product.
+LSA_COMPONENTS = 100
+LSA_BLOCK_ROWS = 16384
+
+# Fuzzy channel (see fuzzy_weight): a query word the vocabulary does not
+# know is matched to its closest vocabulary term by character n-grams
+# inside word boundaries ("mechanicle" -> "mechanical", "aim" -> "aiml"),
+# if the two are at least FUZZY_MIN_SIMILARITY alike (cosine).
+CHAR_NGRAM_SETTINGS = {"analyzer": "char_wb", "ngram_range": (2, 4)}
+FUZZY_MIN_SIMILARITY = 0.55
+
+def make_char_vectorizer():
+    return TfidfVectorizer(**CHAR_NGRAM_SETTINGS)
+
+def make_vectorizer():
+    return TfidfVectorizer(**VECTORIZER_SETTINGS)
+
+def _check_export_params(vectorizer, extra):
+    # numpy_runtime re-implements only this tokenization and weighting.
+    params = vectorizer.get_params()
+    expected = {"lowercase": True, "preprocessor": None, "tokenizer": None, "strip_accents": None,
+                "binary": False, "norm": "l2", "use_idf": True, "sublinear_tf": False, **extra}
+    unsupported = {k: params[k] for k, v in expected.items() if params[k] != v}
+    if unsupported:
+        raise ValueError(f"Unsupported vectorizer settings for export: {unsupported}")
+    return params
+
+# ==========================
+# CHUNKING
+# ==========================
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t\r\f\v]*\n")
+_LINE_BREAK_RE = re.compile(r"\n")
+_WORD_BREAK_RE = re.compile(r"\s+")
+
+def is_heading(line):
+    """A short line ending in ':' that is not a list item, e.g. "Available Branches:"."""
+    return (line.endswith(":") and len(line) <= HEADING_MAX_CHARS
+            and not line.startswith(("-", "*", "•")))
+
+def _split_spans(text, start, end, pattern):
+    """Non-blank (start, end) spans of text[start:end] between pattern matches."""
+    spans = []
+    pos = start
+    for m in pattern.finditer(text, start, end):
+        spans.append((pos, m.start()))
+        pos = m.end()
+    spans.append((pos, end))
+    result = []
+    for s, e in spans:
+        piece = text[s:e]
+        if piece.strip():
+            s += len(piece) - len(piece.lstrip())
+            e -= len(piece) - len(piece.rstrip())
+            result.append((s, e))
+    return result
+
+def _cap_length(text, start, end, max_chars, patterns=(_PARAGRAPH_BREAK_RE, _LINE_BREAK_RE, _WORD_BREAK_RE)):
+    if end - start <= max_chars or not patterns:
+        return [(start, end)]
+    units = []
+    for s, e in _split_spans(text, start, end, patterns[0]):
+        units.extend(_cap_length(text, s, e, max_chars, patterns[1:]))
+    # Pack the units back together greedily.
+    pieces = []
+    for s, e in units:
+        if pieces and e - pieces[-1][0] <= max_chars:
+            pieces[-1] = (pieces[-1][0], e)
+        else:
+            pieces.append((s, e))
+    return pieces
+
+def split_sections(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Splits handbook text into (title, start, end) chunks, text[start:end]
+    being the chunk. A heading starts a new section once the current one
+    has body text, so stacked headings stay together ("Available Branches:"
+    then "Undergraduate (B.Tech) Programs:") and a paragraph without a
+    heading stays with the section above it.
+    """
+    sections = [] # [title, start, end, has_body]
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        start = pos + len(line) - len(line.lstrip())
+        end = pos + len(line.rstrip())
+        pos += len(line)
+        if not stripped:
+            continue
+        if is_heading(stripped) and (not sections or sections[-1][3]):
+            sections.append([stripped[:-1].strip(), start, end, False])
+        elif not sections:
+            sections.append(["", start, end, True])
+        else:
+            sections[-1][2] = end
+            sections[-1][3] = sections[-1][3] or not is_heading(stripped)
+
+    chunks = []
+    for title, start, end, _ in sections:
+        for s, e in _cap_length(text, start, end, max_chars):
+            chunks.append((title, s, e))
+    return chunks
+
+class IngestedFile:
+    """
+    One handbook file, chunked and tokenized: chunk texts, their metadata
+    (source, section title, character offsets) and raw term counts over
+    the file's own terms (in first-seen order).
+    """
+    def __init__(self, key, chunks, metadata, terms, counts):
+        self.key = key
+        self.chunks = chunks
+        self.metadata = metadata
+        self.terms = terms
+        self.counts = counts
+
+    @classmethod
+    def from_text(cls, key, source, text):
+        chunks, metadata = [], []
+        for title, start, end in split_sections(text):
+            chunks.append(text[start:end])
+            metadata.append({"source": source, "title": title, "start": start, "end": end})
+
+        # Count tokens the way TfidfVectorizer does. Terms are numbered in the
+        # order they are first seen, which is the order each row keeps.
+        analyzer = make_vectorizer().build_analyzer()
+        vocabulary = {}
+        indices, data, indptr = [], [], [0]
+        for chunk in chunks:
+            counter = {}
+            for token in analyzer(chunk):
+                term = vocabulary.setdefault(token, len(vocabulary))
+                counter[term] = counter.get(term, 0) + 1
+            for term in sorted(counter):
+                indices.append(term)
+                data.append(counter[term])
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=(len(chunks), len(vocabulary)))
+        terms = list(vocabulary)
+        return cls(key, chunks, metadata, terms, counts)
+
+class KnowledgeIndex:
+    """
+    One complete build of the knowledge base: chunks and their metadata,
+    fitted vectorizer, TF-IDF matrix and raw term counts, plus inverted
+    postings, BM25 weights and title vectors built on first use.
+    Never modified after construction except for those lazy caches and
+    the pinned-answer table (replaced whole), so a search holding a
+    reference always sees one consistent build.
+    """
+    def __init__(self, chunks, vectorizer, tfidf_matrix, cache_key=None, metadata=None, counts=None):
+        self.chunks = chunks
+        self.vectorizer = vectorizer
+        self.tfidf_matrix = tfidf_matrix
+        self.counts = counts # None when rebuilt from exported arrays (no BM25)
+        self.cache_key = cache_key
+        if metadata is None:
+            metadata = [{"source": None, "title": "", "start": None, "end": None} for _ in chunks]
+        self.metadata = metadata
+        self.pinned = {} # pinned query -> SearchResult (see CollegeKnowledgeBase.pin())
+        self.lsa = None # (term vectors, chunk vectors), see CollegeKnowledgeBase._lsa()
+        self._postings = None
+        self._bm25 = None
+        self._titles = None
+        self._title_postings = None
+        self._char = None
+
+    def is_empty(self):
+        return self.tfidf_matrix is None or not self.chunks
+
+    def postings(self):
+        """Term -> (chunk ids, weights) postings, built on first use."""
+        if self._postings is None:
+            # Same row normalization cosine_similarity applies.
+            postings = normalize(self.tfidf_matrix).tocsc()
+            postings.sort_indices()
+            self._postings = postings
+        return self._postings
+
+    def bm25(self):
+        """
+        (BM25 idf per term, postings of idf * tf(k1+1)/(tf+k1*(1-b+b*len/avglen))
+        / (k1+1) per chunk), built on first use from the raw counts.
+        """
+        if self._bm25 is None:
+            if self.counts is None:
+                raise ValueError("BM25 scoring needs the raw term counts of the index")
+            counts = sparse.csr_matrix(self.counts, dtype=np.float64)
+            counts.sort_indices()
+            n_chunks = counts.shape[0]
+            lengths = np.asarray(counts.sum(axis=1)).ravel()
+            doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+            idf = np.log1p((n_chunks - doc_freq + 0.5) / (doc_freq + 0.5))
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / lengths.mean())
+            rows = np.repeat(np.arange(n_chunks), np.diff(counts.indptr))
+            tf = counts.data
+            counts.data = idf[counts.indices] * tf / (tf + length_norm[rows])
+            postings = counts.tocsc()
+            postings.sort_indices()
+            self._bm25 = (idf, postings)
+        return self._bm25
+
+    def title_matrix(self):
+        """TF-IDF vectors of each chunk's section title."""
+        if self._titles is None:
+            self._titles = self.vectorizer.transform([m["title"] for m in self.metadata])
+        return self._titles
+
+    def title_postings(self):
+        if self._title_postings is None:
+            postings = normalize(self.title_matrix()).tocsc()
+            postings.sort_indices()
+            self._title_postings = postings
+        return self._title_postings
+
+    def char_channel(self):
+        """
+        (word analyzer, fitted character n-gram vectorizer, its analyzer,
+        n-gram -> vocabulary term postings) for the fuzzy channel, built on
+        first use.
+        """
+        if self._char is None:
+            vocabulary = self.vectorizer.vocabulary_
+            terms = sorted(vocabulary, key=vocabulary.get)
+            char_vectorizer = make_char_vectorizer()
+            # Rows are unit length already (norm="l2"), one per term id
+            term_postings = char_vectorizer.fit_transform(terms).tocsc()
+            term_postings.sort_indices()
+            self._char = (self.vectorizer.build_analyzer(), char_vectorizer,
+                          char_vectorizer.build_analyzer(), term_postings)
+        return self._char
+
 class CollegeKnowledgeBase:
-    def __init__(self, data_file="college_data.txt"):
+    def __init__(self, data_file="college_data.txt", search_mode="auto", cache_dir=KB_CACHE_DIR, title_weight=0.0,
+                 fuzzy_weight=0.0, scoring="tfidf"):
+        """
+        data_file is a handbook file, a directory of handbooks, or a list of
+        either (relative to this directory). title_weight adds that share of
+        the query's similarity to a chunk's section title to its score.
+        fuzzy_weight does the same for the query with its unknown words
+        replaced by their closest terms (see FUZZY_MIN_SIMILARITY), so words
+        speech recognition got slightly wrong still match.
+        scoring picks the backend (SCORING_BACKENDS); searches without an
+        explicit threshold use that backend's DEFAULT_THRESHOLDS entry.
+        """
+        self._setup(data_file, search_mode, cache_dir, title_weight, fuzzy_weight, scoring)
+        self._index = self._build_index()
+
+    def _setup(self, data_file, search_mode, cache_dir, title_weight=0.0, fuzzy_weight=0.0, scoring="tfidf"):
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
-        self.file_path = os.path.join(self.base_dir, data_file)
-        self.vectorizer = TfidfVectorizer(stop_words='english')
-        self.chunks = []
-        self.tfidf_matrix = None
-        self._load_and_vectorize()
-
-    def _load_and_vectorize(self):
-        if not os.path.exists(self.file_path):
-            print(f"Warning: Knowledge base file not found at {self.file_path}")
-            return
+        self.sources = data_file
+        self.file_path = os.path.join(self.base_dir, data_file) if isinstance(data_file, str) else None
+        self.cache_dir = cache_dir # None disables the on-disk cache
+        self.title_weight = title_weight
+        self.fuzzy_weight = fuzzy_weight
+        self.set_search_mode(search_mode)
+        if scoring not in SCORING_BACKENDS:
+            raise ValueError(f"Unknown scoring backend: {scoring}")
+        self.scoring = scoring
+        self._files = {} # file key -> IngestedFile of the current build
+        self._pins = {} # pinned query -> threshold (see pin())
+        # Hot reload state (see start_watching())
+        self._source_version = self._stat_source()
+        self._pending_version = None
+        self._reload_lock = threading.Lock()
+        self._watch_stop = None
+        self._on_reload = None
+        self.reloads = 0
+        self.reload_failures = 0
+        self.last_reload_at = None
+        self.last_reload_seconds = None
+        self.last_reload_error = None
+
+    @classmethod
+    def from_arrays(cls, chunks, vocabulary, idf, tfidf_matrix, data_file="college_data.txt", metadata=None,
+                    counts=None):
+        """
+        Rebuilds a knowledge base from previously exported state without
+        re-reading or re-fitting anything (see export_arrays()).
+        """
+        kb = cls.__new__(cls)
+        kb._setup(data_file, "auto", None)
+        kb._index = cls._index_from_arrays(chunks, vocabulary, idf, tfidf_matrix, metadata=metadata, counts=counts)
+        return kb
+
+    @staticmethod
+    def _index_from_arrays(chunks, vocabulary, idf, tfidf_matrix, cache_key=None, metadata=None, counts=None):
+        vectorizer = make_vectorizer()
+        chunks = list(chunks)
+        if not chunks:
+            return KnowledgeIndex(chunks, vectorizer, None, cache_key, metadata)
+        vectorizer.vocabulary_ = dict(vocabulary)
+        vectorizer.idf_ = np.asarray(idf, dtype=np.float64)
+        return KnowledgeIndex(chunks, vectorizer, tfidf_matrix, cache_key, metadata, counts)
+
+    # The current build, read through one reference (see reload()).
+    @property
+    def chunks(self):
+        return self._index.chunks
+
+    @property
+    def metadata(self):
+        """Per chunk: source file, section title and character offsets in the file."""
+        return self._index.metadata
+
+    @property
+    def vectorizer(self):
+        return self._index.vectorizer
+
+    @property
+    def tfidf_matrix(self):
+        return self._index.tfidf_matrix
+
+    @property
+    def cache_key(self):
+        return self._index.cache_key
+
+    def export_arrays(self):
+        """Returns (chunks, vocabulary, idf, tfidf_matrix) for persisting."""
+        return self._export(self._index)
+
+    def export_search_state(self):
+        """
+        Everything a search of the current build needs, as (settings, arrays):
+        JSON-able settings and plain numpy arrays, no sklearn or scipy
+        objects (see numpy_runtime.RuntimeKnowledgeBase). Only the "tfidf"
+        backend without title weighting is exported.
+        """
+        if self.scoring != "tfidf" or self.title_weight:
+            raise ValueError(f"Only tfidf scoring without title_weight can be exported (scoring={self.scoring}, "
+                             f"title_weight={self.title_weight})")
+        index = self._index
+        # sources and settings_digest let a reader recompute cache_key from
+        # the handbooks on disk (kb_sources.cache_key) without sklearn
+        settings = {"cache_key": index.cache_key, "sources": self.sources,
+                    "settings_digest": self._settings_digest(), "chunks": index.chunks, "metadata": index.metadata,
+                    "threshold": self.threshold, "fuzzy_weight": self.fuzzy_weight,
+                    "fuzzy_min_similarity": FUZZY_MIN_SIMILARITY}
+        if index.is_empty():
+            return settings, {}
+
+        vectorizer = index.vectorizer
+        params = _check_export_params(vectorizer, {"analyzer": "word", "ngram_range": (1, 1)})
+        postings = index.postings()
+        settings.update({"token_pattern": params["token_pattern"],
+                         "stop_words": sorted(vectorizer.get_stop_words() or []),
+                         "vocabulary": {term: int(col) for term, col in vectorizer.vocabulary_.items()}})
+        arrays = {"idf": vectorizer.idf_, "postings_data": postings.data,
+                  "postings_indices": postings.indices, "postings_indptr": postings.indptr}
+        if self.fuzzy_weight:
+            _, char_vectorizer, _, term_postings = index.char_channel()
+            params = _check_export_params(char_vectorizer, {"analyzer": "char_wb"})
+            settings.update({"char_ngram_range": list(params["ngram_range"]),
+                             "char_vocabulary": {g: int(col) for g, col in char_vectorizer.vocabulary_.items()}})
+            arrays.update({"char_idf": char_vectorizer.idf_, "term_postings_data": term_postings.data,
+                           "term_postings_indices": term_postings.indices,
+                           "term_postings_indptr": term_postings.indptr})
+        return settings, arrays
+
+    @staticmethod
+    def _export(index):
+        if index.tfidf_matrix is None:
+            return index.chunks, {}, np.zeros(0), None
+        vocabulary = {term: int(col) for term, col in index.vectorizer.vocabulary_.items()}
+        return index.chunks, vocabulary, index.vectorizer.idf_, index.tfidf_matrix.tocsr()
+
+    # ==========================
+    # INGESTION
+    # ==========================
+    def _read_sources(self):
+        """[(source name, text)] for every handbook file, in load order."""
+        return kb_sources.read_sources(self.base_dir, self.sources)
+
+    def _settings_digest(self):
+        vectorizer = make_vectorizer()
+        settings = sorted((k, repr(v)) for k, v in vectorizer.get_params().items())
+        stop_words = sorted(vectorizer.get_stop_words() or [])
+        return json.dumps([KB_CACHE_VERSION, MAX_CHUNK_CHARS, HEADING_MAX_CHARS, settings, stop_words])
 
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            full_text = f.read()
-            
-        # Split into chunks (paragraphs)
-        # Assuming paragraphs are separated by double newlines
-        raw_chunks = full_text.split('\n\n')
-        self.chunks = [chunk.strip() for chunk in raw_chunks if chunk.strip()]
-        
-        if not self.chunks:
+    def _file_key(self, source, text):
+        return kb_sources.file_key(self._settings_digest(), source, text)
+
+    def _corpus_key(self, file_keys):
+        return kb_sources.corpus_key(self._settings_digest(), file_keys)
+
+    def _build_index(self, texts=None):
+        """Builds a new index from the handbooks (or the cache). Does not swap it in."""
+        if texts is None:
+            texts = self._read_sources()
+        file_keys = [self._file_key(source, text) for source, text in texts]
+        corpus_key = self._corpus_key(file_keys)
+        if not texts:
+            return KnowledgeIndex([], make_vectorizer(), None, corpus_key)
+
+        if self.cache_dir is not None:
+            try:
+                index = self._load_corpus(corpus_key)
+                if index is not None:
+                    print(f"Loaded {len(index.chunks)} knowledge chunks (cached vectors).")
+                    return index
+            except Exception as e:
+                print(f"Knowledge base cache unreadable ({e}). Refitting...")
+
+        # Only files whose content changed are chunked and tokenized again.
+        files = []
+        for (source, text), key in zip(texts, file_keys):
+            part = self._files.get(key) or self._load_file(key)
+            if part is None:
+                part = IngestedFile.from_text(key, source, text)
+                self._save_file(part)
+            files.append(part)
+        self._files = {part.key: part for part in files}
+
+        index = self._assemble(files, corpus_key)
+        if index.is_empty():
             print("Warning: No text chunks found in knowledge base.")
-            return
-            
-        print(f"Loaded {len(self.chunks)} knowledge chunks.")
-        
-        # Vectorize
-        self.tfidf_matrix = self.vectorizer.fit_transform(self.chunks)
+            return index
+
+        print(f"Loaded {len(index.chunks)} knowledge chunks from {len(files)} file(s).")
         print("Knowledge Base Vectorized.")
+        if self.cache_dir is not None:
+            try:
+                self._save_corpus(index)
+                self._prune_cache(corpus_key, self._files)
+            except OSError as e:
+                # A read-only SD card should not stop the robot from answering.
+                print(f"Could not write knowledge base cache: {e}")
+        return index
+
+    def _assemble(self, files, corpus_key):
+        """
+        Merges per-file term counts into one TF-IDF index. Only counts are
+        combined (no tokenizing), and the result equals fitting a
+        TfidfVectorizer on all chunks at once.
+        """
+        chunks, metadata = [], []
+        for part in files:
+            chunks.extend(part.chunks)
+            metadata.extend(part.metadata)
+        vectorizer = make_vectorizer()
+        terms = sorted(set().union(*(part.terms for part in files)))
+        if not chunks or not terms:
+            return KnowledgeIndex([], vectorizer, None, corpus_key, [])
+
+        column = {term: i for i, term in enumerate(terms)}
+        # TfidfVectorizer keeps each row's entries ordered by when a term was
+        # first seen in the whole corpus; the l2 norms are summed in that
+        # order, so rows are re-sorted the same way before mapping to columns.
+        first_seen = {}
+        for part in files:
+            for term in part.terms:
+                first_seen.setdefault(term, len(first_seen))
+        seen_to_column = np.empty(len(first_seen), dtype=np.int64)
+        for term, seen in first_seen.items():
+            seen_to_column[seen] = column[term]
+
+        blocks = []
+        for part in files:
+            counts = part.counts
+            remap = np.array([first_seen[t] for t in part.terms], dtype=np.int64)
+            block = sparse.csr_matrix((counts.data, remap[counts.indices], counts.indptr),
+                                      shape=(counts.shape[0], len(terms)))
+            block.sort_indices()
+            block.indices = seen_to_column[block.indices].astype(block.indices.dtype)
+            block.has_sorted_indices = False
+            blocks.append(block)
+        counts = sparse.vstack(blocks, format="csr")
+
+        transformer = TfidfTransformer(norm=vectorizer.norm, use_idf=vectorizer.use_idf,
+                                       smooth_idf=vectorizer.smooth_idf, sublinear_tf=vectorizer.sublinear_tf)
+        tfidf_matrix = transformer.fit_transform(counts)
+        tfidf_matrix.sort_indices()
+        vectorizer.vocabulary_ = column
+        vectorizer.idf_ = transformer.idf_
+        return KnowledgeIndex(chunks, vectorizer, tfidf_matrix, corpus_key, metadata, counts)
+
+    # ==========================
+    # ON-DISK CACHE
+    # ==========================
+    def _entry(self, kind, key):
+        return os.path.join(self.cache_dir, f"{kind}-{key}")
+
+    @staticmethod
+    def _write_entry(entry, json_files, arrays, meta):
+        """Writes one cache entry into a temp directory and renames it into place."""
+        tmp = entry + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, obj in json_files.items():
+            with open(os.path.join(tmp, name), "w", encoding="utf-8") as f:
+                json.dump(obj, f, ensure_ascii=False)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, name), array)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(dict(meta, version=KB_CACHE_VERSION, libraries=library_versions(),
+                           built_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())), f)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+
+    @staticmethod
+    def _read_entry(entry):
+        meta_path = os.path.join(entry, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _read_json(entry, name):
+        with open(os.path.join(entry, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _read_csr(entry, prefix, shape, mmap_mode=None):
+        return sparse.csr_matrix(
+            (np.load(os.path.join(entry, prefix + "data.npy"), mmap_mode=mmap_mode),
+             np.load(os.path.join(entry, prefix + "indices.npy"), mmap_mode=mmap_mode),
+             np.load(os.path.join(entry, prefix + "indptr.npy"), mmap_mode=mmap_mode)),
+            shape=tuple(shape),
+            copy=False,
+        )
+
+    def _load_corpus(self, corpus_key):
+        entry = self._entry("corpus", corpus_key)
+        meta = self._read_entry(entry)
+        if meta is None:
+            return None
+        chunks = self._read_json(entry, "chunks.json")
+        # Memory-mapped: the OS pages the matrix in on first use.
+        matrix = self._read_csr(entry, "", meta["shape"], mmap_mode="r")
+        counts = self._read_csr(entry, "counts_", meta["shape"], mmap_mode="r")
+        return self._index_from_arrays([c["text"] for c in chunks],
+                                       self._read_json(entry, "vocabulary.json"),
+                                       np.load(os.path.join(entry, "idf.npy")), matrix, corpus_key,
+                                       [c["meta"] for c in chunks], counts)
+
+    def _save_corpus(self, index):
+        chunks, vocabulary, idf, matrix = self._export(index)
+        matrix.sort_indices()
+        counts = sparse.csr_matrix(index.counts)
+        counts.sort_indices()
+        self._write_entry(
+            self._entry("corpus", index.cache_key),
+            {"chunks.json": [{"text": c, "meta": m} for c, m in zip(chunks, index.metadata)],
+             "vocabulary.json": vocabulary},
+            {"idf.npy": np.asarray(idf, dtype=np.float64),
+             "data.npy": matrix.data, "indices.npy": matrix.indices, "indptr.npy": matrix.indptr,
+             "counts_data.npy": counts.data, "counts_indices.npy": counts.indices, "counts_indptr.npy": counts.indptr},
+            {"shape": list(matrix.shape)})
+        print(f"Knowledge base cache saved -> {self._entry('corpus', index.cache_key)}")
+
+    def _load_file(self, key):
+        if self.cache_dir is None:
+            return None
+        entry = self._entry("file", key)
+        try:
+            meta = self._read_entry(entry)
+            if meta is None:
+                return None
+            chunks = self._read_json(entry, "chunks.json")
+            counts = self._read_csr(entry, "counts_", meta["shape"])
+            return IngestedFile(key, [c["text"] for c in chunks], [c["meta"] for c in chunks],
+                                self._read_json(entry, "terms.json"), counts)
+        except Exception as e:
+            print(f"Knowledge base file cache unreadable ({e}). Re-reading...")
+            return None
+
+    def _save_file(self, part):
+        if self.cache_dir is None:
+            return
+        try:
+            self._write_entry(
+                self._entry("file", part.key),
+                {"chunks.json": [{"text": c, "meta": m} for c, m in zip(part.chunks, part.metadata)],
+                 "terms.json": part.terms},
+                {"counts_data.npy": part.counts.data, "counts_indices.npy": part.counts.indices,
+                 "counts_indptr.npy": part.counts.indptr},
+                {"shape": list(part.counts.shape)})
+        except OSError as e:
+            print(f"Could not write knowledge base cache: {e}")
+
+    def _lsa(self, index):
+        """(term vectors, unit-length chunk vectors) of a build, float16, loaded or fitted on first use."""
+        if index.lsa is None:
+            lsa = self._load_lsa(index)
+            if lsa is None:
+                lsa = self._fit_lsa(index)
+                self._save_lsa(index, lsa)
+            index.lsa = lsa
+        return index.lsa
+
+    @staticmethod
+    def _lsa_components(index):
+        n_chunks, n_terms = index.tfidf_matrix.shape
+        return max(1, min(LSA_COMPONENTS, n_chunks - 1, n_terms - 1))
+
+    def _fit_lsa(self, index):
+        start = time.perf_counter()
+        svd = TruncatedSVD(n_components=self._lsa_components(index), random_state=0)
+        vectors = normalize(svd.fit_transform(index.tfidf_matrix)).astype(np.float16)
+        print(f"Knowledge base LSA fitted ({svd.n_components} dimensions) in {time.perf_counter() - start:.2f}s.")
+        return svd.components_.T.astype(np.float16), vectors
+
+    def _load_lsa(self, index):
+        if self.cache_dir is None or index.cache_key is None:
+            return None
+        entry = self._entry("lsa", index.cache_key)
+        try:
+            meta = self._read_entry(entry)
+            if meta is None or meta.get("components") != self._lsa_components(index):
+                return None
+            return (np.load(os.path.join(entry, "term_vectors.npy"), mmap_mode="r"),
+                    np.load(os.path.join(entry, "vectors.npy"), mmap_mode="r"))
+        except Exception as e:
+            print(f"Knowledge base LSA cache unreadable ({e}). Refitting...")
+            return None
+
+    def _save_lsa(self, index, lsa):
+        if self.cache_dir is None or index.cache_key is None:
+            return
+        term_vectors, vectors = lsa
+        try:
+            self._write_entry(self._entry("lsa", index.cache_key), {},
+                              {"term_vectors.npy": term_vectors, "vectors.npy": vectors},
+                              {"components": int(vectors.shape[1])})
+        except OSError as e:
+            print(f"Could not write knowledge base LSA cache: {e}")
+
+    def _prune_cache(self, corpus_key, files):
+        """Only the current corpus and its files are worth keeping."""
+        keep = {os.path.basename(self._entry("corpus", corpus_key)),
+                os.path.basename(self._entry("lsa", corpus_key))}
+        keep.update(os.path.basename(self._entry("file", key)) for key in files)
+        for name in os.listdir(self.cache_dir):
+            if name not in keep:
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    # ==========================
+    # HOT RELOAD
+    # ==========================
+    def _stat_source(self):
+        """mtime/size of every handbook file (directories are re-listed)."""
+        version = []
+        for path in resolve_sources(self.base_dir, self.sources, warn=False):
+            try:
+                st = os.stat(path)
+                version.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                version.append((path, None, None))
+        return tuple(version)
+
+    def reload(self, force=False):
+        """
+        Rebuilds the index if a handbook's content changed and swaps it in
+        with a single reference assignment. Searches already running finish
+        on the build they started with. Returns True if a new build was
+        swapped in.
+        """
+        with self._reload_lock:
+            start = time.perf_counter()
+            self._source_version = self._stat_source()
+            try:
+                texts = self._read_sources()
+                corpus_key = self._corpus_key([self._file_key(source, text) for source, text in texts])
+                if not force and corpus_key == self._index.cache_key:
+                    return False # touched, not changed
+                index = self._build_index(texts)
+                if index.is_empty() and not self._index.is_empty():
+                    raise ValueError("handbooks have no text chunks")
+                # The new build goes live with its pinned answers already resolved
+                index.pinned = self._resolve_pins(index)
+            except Exception as e:
+                self.reload_failures += 1
+                self.last_reload_error = str(e)
+                print(f"Knowledge base reload failed, keeping the previous index: {e}")
+                return False
+
+            self._index = index
+            self.reloads += 1
+            self.last_reload_at = time.time()
+            self.last_reload_seconds = time.perf_counter() - start
+            self.last_reload_error = None
+            print(f"Knowledge base reloaded in {self.last_reload_seconds:.3f}s ({len(index.chunks)} chunks).")
+
+        if self._on_reload is not None:
+            self._on_reload(self)
+        return True
+
+    def check_for_changes(self):
+        """
+        Reloads when a handbook's mtime or size moved (or one was added or
+        removed) and then stayed put for one more check, so a file caught
+        mid-save is not indexed.
+        """
+        current = self._stat_source()
+        if current == self._source_version:
+            self._pending_version = None
+            return False
+        if current != self._pending_version:
+            self._pending_version = current # still being written, look again next time
+            return False
+        self._pending_version = None
+        return self.reload()
+
+    def start_watching(self, interval=WATCH_INTERVAL_SECONDS, on_reload=None):
+        """
+        Polls the handbooks from a daemon thread and reloads them off the
+        request path. on_reload(kb) runs after each swap (e.g. to drop
+        cached answers).
+        """
+        if self._watch_stop is not None:
+            return
+        self._on_reload = on_reload
+        self._watch_stop = threading.Event()
+        stop = self._watch_stop
+
+        def watch():
+            while not stop.wait(interval):
+                try:
+                    self.check_for_changes()
+                except Exception as e:
+                    print(f"Knowledge base watcher error: {e}")
+
+        threading.Thread(target=watch, name="kb-watch", daemon=True).start()
+
+    def stop_watching(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watch_stop = None
+
+    def reload_stats(self):
+        """Reload counters plus the duration and wall-clock time of the last swap."""
+        return {
+            "watching": self._watch_stop is not None,
+            "chunks": len(self._index.chunks),
+            "reloads": self.reloads,
+            "failures": self.reload_failures,
+            "last_reload_at": self.last_reload_at,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_error": self.last_reload_error,
+        }
+
+    # ==========================
+    # PINNED QUERIES
+    # ==========================
+    def pin(self, queries, threshold=None):
+        """
+        Registers fixed queries (the ones respond() always asks). Their
+        results are scored now and again on every reload, and score() /
+        search() answer them from that table. threshold is what check_pins()
+        holds them to. Returns the pins that find nothing (see check_pins()).
+        """
+        with self._reload_lock:
+            for query in queries:
+                self._pins[query] = threshold # None follows the backend default
+            index = self._index
+            index.pinned = self._resolve_pins(index)
+        return self.check_pins()
+
+    def _resolve_pins(self, index):
+        if index.is_empty() or not self._pins:
+            return {}
+        table = {result.query: result.compact() for result in self._score_index(index, list(self._pins))}
+        for query, score, threshold in self._weak_pins(table):
+            print(f"Warning: pinned KB query '{query}' best match scores {score:.3f} (< {threshold}).")
+        return table
+
+    def _weak_pins(self, table):
+        weak = []
+        for query, threshold in self._pins.items():
+            result = table.get(query)
+            threshold = self._threshold(threshold)
+            if result is not None and result.best(threshold) is None:
+                top = result.best(0.0)
+                weak.append((query, top.score if top else 0.0, threshold))
+        return weak
+
+    def check_pins(self):
+        """(query, best score, threshold) for every pinned query that finds nothing."""
+        return self._weak_pins(self._index.pinned)
+
+    # ==========================
+    # SEARCH
+    # ==========================
+    def set_search_mode(self, mode):
+        """'dense' scores every chunk, 'inverted' only chunks sharing a query term."""
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        self.search_mode = mode
+
+    def set_scoring(self, scoring):
+        """Switches the scoring backend; pinned answers are resolved again."""
+        if scoring not in SCORING_BACKENDS:
+            raise ValueError(f"Unknown scoring backend: {scoring}")
+        with self._reload_lock:
+            self.scoring = scoring
+            index = self._index
+            index.pinned = self._resolve_pins(index)
+
+    @property
+    def threshold(self):
+        """Minimum score for an answer when a search does not give one."""
+        return DEFAULT_THRESHOLDS[self.scoring]
+
+    def _threshold(self, threshold):
+        return self.threshold if threshold is None else threshold
+
+    def _use_inverted(self, index, threshold):
+        # A chunk with no query term scores 0; the dense path can still
+        # return it when the threshold is <= 0, so keep those on dense.
+        if threshold <= 0 or self.search_mode == "dense":
+            return False
+        return self.search_mode == "inverted" or len(index.chunks) >= INVERTED_MIN_CHUNKS
+
+    @staticmethod
+    def _score_candidates(postings, query_vec):
+        """
+        Cosine scores for the rows that share a term with one query row.
+        Returns (row ids ascending, scores). Contributions are added term
+        by term in the query's column order, the order the sparse product in
+        cosine_similarity uses, so the scores are bit-identical to it.
+        """
+        query_vec = normalize(query_vec)
+        query_vec.sort_indices()
+        return score_terms(postings, query_vec.indices, query_vec.data)
+
+    def _fuzzy_vectors(self, index, queries):
+        """
+        One query for the fuzzy channel per query: each word the vocabulary
+        does not know, replaced by its closest term, as (term ids ascending,
+        how alike word and term are). None for a query with nothing to
+        correct, and for every query while the channel is off.
+        """
+        rows = [None] * len(queries)
+        if not self.fuzzy_weight or index.is_empty():
+            return rows
+        analyzer, char_vectorizer, char_analyzer, term_postings = index.char_channel()
+        vocabulary = index.vectorizer.vocabulary_
+        unknown = [[word for word in analyzer(q) if word not in vocabulary] for q in queries]
+        if not any(unknown):
+            return rows # the common case costs one analyzer pass
+
+        # Same weighting as char_vectorizer.transform(), without its per-call overhead
+        grams_vocabulary, grams_idf = char_vectorizer.vocabulary_, char_vectorizer.idf_
+        nearest = {}
+        for word in {word for query_words in unknown for word in query_words}:
+            counts = {}
+            for gram in char_analyzer(word):
+                col = grams_vocabulary.get(gram)
+                if col is not None:
+                    counts[col] = counts.get(col, 0) + 1
+            if not counts:
+                continue
+            cols = np.array(sorted(counts))
+            weights = np.array([counts[c] for c in cols]) * grams_idf[cols]
+            terms, similarity = score_terms(term_postings, cols, weights / np.linalg.norm(weights))
+            best = np.argmax(similarity)
+            if similarity[best] >= FUZZY_MIN_SIMILARITY:
+                nearest[word] = (terms[best], similarity[best])
+
+        for i, query_words in enumerate(unknown):
+            weights = {}
+            for word in query_words:
+                if word in nearest:
+                    term, similarity = nearest[word]
+                    weights[term] = weights.get(term, 0.0) + similarity
+            if weights:
+                terms = np.array(sorted(weights))
+                rows[i] = (terms, np.array([weights[t] for t in terms]))
+        return rows
+
+    def _fuzzy_scores(self, index, fuzzy_vec):
+        """(chunk ids, scores) of a fuzzy query under the current backend."""
+        terms, weights = fuzzy_vec
+        if self.scoring == "bm25":
+            return self._bm25_scores(index, terms, weights)
+        weights = weights * index.vectorizer.idf_[terms] # as if each match were a query word
+        return score_terms(index.postings(), terms, weights / np.linalg.norm(weights))
+
+    def _bm25_scores(self, index, terms, weights):
+        """
+        BM25 (chunk ids, scores) for query terms with weights (1 per word),
+        divided by the most those terms could score, so scores are in 0..1.
+        """
+        idf, postings = index.bm25()
+        best_possible = np.dot(weights, idf[terms])
+        if best_possible <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return score_terms(postings, terms, weights / best_possible)
+
+    def _lsa_scores(self, index, query_vec):
+        """Cosine of every chunk with the query in the latent space (float16 rows, float32 products)."""
+        term_vectors, vectors = self._lsa(index)
+        query_vec = query_vec.tocsr()
+        # Projection only reads the rows of the query's terms
+        latent = query_vec.data.astype(np.float32) @ term_vectors[query_vec.indices].astype(np.float32)
+        scores = np.zeros(len(vectors))
+        norm = np.linalg.norm(latent)
+        if norm == 0:
+            return scores # no known term: no direction to compare
+        latent /= norm
+        for start in range(0, len(vectors), LSA_BLOCK_ROWS):
+            block = vectors[start:start + LSA_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ latent
+        return scores
+
+    def _scores(self, index, query_vec, threshold, fuzzy_vec=None):
+        """
+        (chunk ids, scores) for one query row: body similarity plus weighted
+        title similarity plus weighted similarity of the fuzzy query, if any.
+        """
+        if self.scoring == "lsa":
+            scores = self._lsa_scores(index, query_vec)
+            if self.title_weight:
+                scores = scores + self.title_weight * cosine_similarity(query_vec, index.title_matrix()).flatten()
+            if fuzzy_vec is not None:
+                fuzzy_ids, fuzzy_scores = self._fuzzy_scores(index, fuzzy_vec)
+                scores[fuzzy_ids] += self.fuzzy_weight * fuzzy_scores
+            return np.arange(len(scores)), scores
+
+        if self.scoring == "bm25":
+            # BM25 is sparse by nature: only chunks sharing a term score at all
+            query_vec = query_vec.tocsr()
+            query_vec.sort_indices()
+            terms = query_vec.indices
+            ids, scores = self._bm25_scores(index, terms, np.ones(len(terms)))
+            if self.title_weight:
+                title_ids, title_scores = self._score_candidates(index.title_postings(), query_vec)
+                ids, scores = add_channel(ids, scores, title_ids, title_scores, self.title_weight)
+            if fuzzy_vec is not None:
+                fuzzy_ids, fuzzy_scores = self._fuzzy_scores(index, fuzzy_vec)
+                ids, scores = add_channel(ids, scores, fuzzy_ids, fuzzy_scores, self.fuzzy_weight)
+            if self._use_inverted(index, threshold):
+                return ids, scores
+            full = np.zeros(len(index.chunks))
+            full[ids] = scores
+            return np.arange(len(full)), full
+
+        if self._use_inverted(index, threshold):
+            # Only chunks sharing a term can reach a positive threshold
+            ids, scores = self._score_candidates(index.postings(), query_vec)
+            if self.title_weight:
+                title_ids, title_scores = self._score_candidates(index.title_postings(), query_vec)
+                ids, scores = add_channel(ids, scores, title_ids, title_scores, self.title_weight)
+            if fuzzy_vec is not None:
+                fuzzy_ids, fuzzy_scores = self._fuzzy_scores(index, fuzzy_vec)
+                ids, scores = add_channel(ids, scores, fuzzy_ids, fuzzy_scores, self.fuzzy_weight)
+            return ids, scores
 
-    def search(self, query, top_k=1, threshold=0.1):
-        if self.tfidf_matrix is None or not self.chunks:
-            return "Knowledge base is empty."
-            
-        # Vectorize query
-        query_vec = self.vectorizer.transform([query])
-        
         # Calculate Cosine Similarity
-        cosine_similarities = cosine_similarity(query_vec, self.tfidf_matrix).flatten()
-        
-        # Get Top-K matches
-        # argsort returns indices of sorted array (ascending), so we take last k and reverse
-        if top_k == 1:
-            best_idx = np.argmax(cosine_similarities)
-            best_score = cosine_similarities[best_idx]
-            
-            if best_score < threshold:
-                return None # No relevant information found
-            
-            return self.chunks[best_idx]
-        else:
-            top_indices = cosine_similarities.argsort()[-top_k:][::-1]
+        scores = cosine_similarity(query_vec, index.tfidf_matrix).flatten()
+        if self.title_weight:
+            scores = scores + self.title_weight * cosine_similarity(query_vec, index.title_matrix()).flatten()
+        if fuzzy_vec is not None:
+            fuzzy_ids, fuzzy_scores = self._fuzzy_scores(index, fuzzy_vec)
+            scores[fuzzy_ids] += self.fuzzy_weight * fuzzy_scores
+        return np.arange(len(scores)), scores
+
+    def _score_index(self, index, queries):
+        """One SearchResult per query against one build, in one batch."""
+        threshold = self.threshold
+        if index.is_empty() or not queries:
+            none = np.zeros(0, dtype=np.int64)
+            return [SearchResult(q, index, none, np.zeros(0), threshold) for q in queries]
+
+        query_vecs = index.vectorizer.transform(queries)
+        fuzzy_vecs = self._fuzzy_vectors(index, queries)
+        if self.scoring != "tfidf" or self._use_inverted(index, threshold):
             results = []
-            for idx in top_indices:
-                if cosine_similarities[idx] >= threshold:
-                    results.append(self.chunks[idx])
+            for row, query in enumerate(queries):
+                ids, scores = self._scores(index, query_vecs[row], threshold, fuzzy_vecs[row])
+                results.append(SearchResult(query, index, ids, scores, threshold))
             return results
 
+        # Dense: one sparse product for the whole batch
+        similarities = cosine_similarity(query_vecs, index.tfidf_matrix)
+        if self.title_weight:
+            similarities = similarities + self.title_weight * cosine_similarity(query_vecs, index.title_matrix())
+        for row, fuzzy_vec in enumerate(fuzzy_vecs):
+            if fuzzy_vec is not None:
+                fuzzy_ids, fuzzy_scores = self._fuzzy_scores(index, fuzzy_vec)
+                similarities[row, fuzzy_ids] += self.fuzzy_weight * fuzzy_scores
+        ids = np.arange(len(index.chunks))
+        return [SearchResult(query, index, ids, row, threshold) for query, row in zip(queries, similarities)]
+
+    def score(self, query, memo=None):
+        """
+        SearchResult for the query: chunk ids, scores and metadata from one
+        scoring pass, thresholded by the caller. memo is an optional dict
+        (one per request) that makes repeating the same query free.
+        """
+        return self.score_many([query], memo)[0]
+
+    def score_many(self, queries, memo=None):
+        """score() for a batch, with one vectorizer call (and one sparse product on the dense path)."""
+        index = self._index # one build for the whole call, even if a reload swaps
+        results = [None] * len(queries)
+        todo = {} # query -> positions still to score
+        for i, query in enumerate(queries):
+            if memo is not None and query in memo:
+                results[i] = memo[query]
+            elif query in index.pinned:
+                results[i] = index.pinned[query]
+            else:
+                todo.setdefault(query, []).append(i)
+
+        for result in self._score_index(index, list(todo)):
+            for i in todo[result.query]:
+                results[i] = result
+        if memo is not None:
+            for query, result in zip(queries, results):
+                memo[query] = result
+        return results
+
+    def search(self, query, top_k=1, threshold=None):
+        """Text of the best chunk (None below threshold), or a list of the top_k."""
+        result = self.score(query)
+        if result.is_empty():
+            return "Knowledge base is empty."
+        if top_k == 1:
+            hit = result.best(threshold)
+            return hit.text if hit else None # None: no relevant information found
+        return [hit.text for hit in result.top(top_k, threshold)]
+
+    def search_many(self, queries, threshold=None, thresholds=None):
+        """
+        Best chunk text (or None) for each query, like search(q, top_k=1),
+        scored as one batch (see score_many()).
+        thresholds optionally gives a per-query threshold (None: the default).
+        """
+        if thresholds is None:
+            thresholds = [threshold] * len(queries)
+        results = self.score_many(queries)
+        if results and results[0].is_empty():
+            return ["Knowledge base is empty."] * len(queries)
+        hits = [result.best(t) for result, t in zip(results, thresholds)]
+        return [hit.text if hit else None for hit in hits]
+
 if __name__ == "__main__":
     # Test
     kb = CollegeKnowledgeBase()